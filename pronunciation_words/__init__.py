@@ -0,0 +1,27 @@
+"""Произношение слов: синтез речи, кэш аудио и прослушивание списков слов
+
+Пакет можно использовать как библиотеку:
+
+    from pronunciation_words import SettingsManager, generate_audio
+
+Здесь импортируются только легкие модули; воспроизведение (pygame, NumPy)
+находится в pronunciation_words.playback и загружается по требованию.
+"""
+
+from .cache import AudioCache, PcmCache, make_cache_key
+from .generation import AdaptiveConcurrency, GenerationStats, generate_audio, generate_single_audio
+from .settings import SettingsManager
+from .synthesis import (
+    FakeSynthesizer, GTTSSynthesizer, ResilientSynthesizer, Synthesizer, create_synthesizer
+)
+from .tracing import TRACER, Tracer
+from .words import deduplicate_words, read_words_from_file
+
+__all__ = [
+    'AudioCache', 'PcmCache', 'make_cache_key',
+    'AdaptiveConcurrency', 'GenerationStats', 'generate_audio', 'generate_single_audio',
+    'SettingsManager',
+    'FakeSynthesizer', 'GTTSSynthesizer', 'ResilientSynthesizer', 'Synthesizer', 'create_synthesizer',
+    'TRACER', 'Tracer',
+    'deduplicate_words', 'read_words_from_file',
+]
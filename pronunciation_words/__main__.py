@@ -0,0 +1,11 @@
+"""python -m pronunciation_words [команда]"""
+
+import time
+
+STARTED = time.perf_counter()
+
+import sys
+
+from .cli import main
+
+sys.exit(main(sys.argv[1:], STARTED))
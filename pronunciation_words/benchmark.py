@@ -0,0 +1,236 @@
+"""Тест скорости режимов генерации на имитации TTS"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from .cache import AudioCache
+from .generation import GenerationStats, generate_audio, generate_audio_parallel
+from .synthesis import FakeSynthesizer
+
+class RssSampler:
+    """Фоновый замер пикового RSS процесса во время участка кода"""
+    
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+    
+    @staticmethod
+    def current_rss():
+        """Текущий RSS в байтах (None, если платформа не поддерживается)"""
+        try:
+            with open('/proc/self/statm', 'r') as f:
+                resident_pages = int(f.read().split()[1])
+            return resident_pages * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, AttributeError):
+            pass
+        try:
+            import resource
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # В macOS ru_maxrss в байтах, в Linux - в килобайтах
+            return peak if sys.platform == 'darwin' else peak * 1024
+        except ImportError:
+            return None
+    
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.current_rss() or 0)
+    
+    def __enter__(self):
+        self.peak = self.current_rss() or 0
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current_rss() or 0)
+
+def make_benchmark_words(base_words, count):
+    """Строит список из count уникальных слов на основе base_words"""
+    base_words = base_words or ['word']
+    words = []
+    for i in range(count):
+        word = base_words[i % len(base_words)]
+        round_num = i // len(base_words)
+        words.append(word if round_num == 0 else f"{word} {round_num}")
+    return words
+
+def latency_summary(stats):
+    """Перцентили задержки из GenerationStats в миллисекундах"""
+    return {
+        'p50': round(stats.percentile(50) * 1000, 3),
+        'p95': round(stats.percentile(95) * 1000, 3),
+        'p99': round(stats.percentile(99) * 1000, 3),
+    }
+
+def benchmark_generation(words, generation_mode, max_workers, batch_size, cache, synthesizer,
+                         max_concurrency=32):
+    """Один прогон генерации с замером задержек, пропускной способности и памяти"""
+    stats = GenerationStats()
+    with RssSampler() as sampler, contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        generate_audio(
+            words,
+            generation_mode,
+            max_workers=max_workers,
+            batch_size=batch_size,
+            cache=cache,
+            synthesizer=synthesizer,
+            stats=stats,
+            max_concurrency=max_concurrency,
+            requests_per_second=0
+        )
+        wall_time = time.perf_counter() - start
+    
+    return {
+        'wall_time_s': round(wall_time, 4),
+        'throughput_wps': round(len(words) / wall_time, 2) if wall_time else None,
+        'latency_ms': latency_summary(stats),
+        'hit_ratio': round(stats.hit_ratio(), 4),
+        'failed': stats.failed,
+        'peak_rss_mb': round(sampler.peak / 2**20, 2) if sampler.peak else None,
+    }
+
+def benchmark_playback_prep(audio_data):
+    """Замер подготовки звуков к воспроизведению (без самого воспроизведения)"""
+    import pygame
+    from .playback import decode_sound, load_sound
+    
+    previous_driver = os.environ.get('SDL_AUDIODRIVER')
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    temp_dir = tempfile.mkdtemp()
+    try:
+        pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
+        methods = {
+            'temp_file': lambda index, audio_buffer: load_sound(audio_buffer, temp_dir, index),
+            'in_memory': lambda index, audio_buffer: decode_sound(audio_buffer),
+        }
+        report = {}
+        for method_name, prepare in methods.items():
+            stats = GenerationStats()
+            for index, audio_buffer in enumerate(audio_data):
+                if audio_buffer is None:
+                    continue
+                start = time.perf_counter()
+                prepare(index, audio_buffer)
+                stats.record(time.perf_counter() - start)
+            report[method_name] = {
+                'words': len(stats.latencies),
+                'total_s': round(sum(stats.latencies), 4),
+                'latency_ms': latency_summary(stats),
+            }
+        return report
+    except pygame.error as e:
+        print(f"⚠️ Замер подготовки воспроизведения пропущен: {e}")
+        return None
+    finally:
+        pygame.mixer.quit()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        if previous_driver is None:
+            os.environ.pop('SDL_AUDIODRIVER', None)
+        else:
+            os.environ['SDL_AUDIODRIVER'] = previous_driver
+
+def run_benchmark(base_words, sizes=None, worker_options=(2, 4, 8), batch_sizes=(3, 6),
+                  modes=(1, 2, 3, 4, 5), concurrency_options=(16, 64), latency=0.05, jitter=0.02,
+                  output_file='benchmark_results.json'):
+    """Бенчмарк режимов генерации на имитации TTS с записью результатов в JSON
+
+    Перебирает размер списка, max_workers (max_concurrency для асинхронного
+    режима), batch_size и режим генерации, каждую конфигурацию прогоняет
+    с холодным и теплым кэшем. Фразовый режим получает WAV с тоном: беззвучный
+    MP3 имитации не на чем делить, и фразы распались бы на отдельные запросы.
+    """
+    sizes = sizes or sorted({len(base_words), 100})
+    results = []
+    
+    print(f"🏁 Бенчмарк: размеры {list(sizes)}, режимы {list(modes)}, "
+          f"задержка TTS {latency * 1000:.0f}±{jitter * 1000:.0f} мс")
+    print(f"{'режим':>5} {'слов':>5} {'потоки':>6} {'батч':>4} {'кэш':>5} "
+          f"{'слов/с':>8} {'p50 мс':>8} {'p95 мс':>8} {'p99 мс':>8} {'RSS МБ':>7}")
+    
+    configurations = []
+    for mode in modes:
+        for size in sizes:
+            if mode == 1:
+                configurations += [(mode, size, workers, None) for workers in worker_options]
+            elif mode == 2:
+                configurations += [(mode, size, None, batch) for batch in batch_sizes]
+            elif mode == 4:
+                configurations += [(mode, size, limit, None) for limit in concurrency_options]
+            else:
+                configurations.append((mode, size, max(worker_options), min(batch_sizes)))
+    
+    for mode, size, workers, batch in configurations:
+        words = make_benchmark_words(base_words, size)
+        cache_dir = tempfile.mkdtemp()
+        cache_file = os.path.join(cache_dir, 'audio_cache.seg')
+        try:
+            for cache_state in ('cold', 'warm'):
+                synthesizer = FakeSynthesizer(latency=latency, jitter=jitter,
+                                              audio_format='wav' if mode == 5 else 'mp3')
+                with contextlib.redirect_stdout(io.StringIO()):
+                    cache = AudioCache(cache_file, legacy_file=os.path.join(cache_dir, 'none.pkl'))
+                result = benchmark_generation(
+                    words, mode, workers or 4, batch or 3, cache, synthesizer,
+                    max_concurrency=workers or 32
+                )
+                with contextlib.redirect_stdout(io.StringIO()):
+                    cache.save_cache()
+                
+                result.update({
+                    'generation_mode': mode,
+                    'words': size,
+                    'max_workers': workers if mode != 4 else None,
+                    'max_concurrency': workers if mode == 4 else None,
+                    'batch_size': batch,
+                    'cache': cache_state,
+                })
+                results.append(result)
+                print(f"{mode:>5} {size:>5} {workers or '-':>6} {batch or '-':>4} {cache_state:>5} "
+                      f"{result['throughput_wps']:>8} {result['latency_ms']['p50']:>8} "
+                      f"{result['latency_ms']['p95']:>8} {result['latency_ms']['p99']:>8} "
+                      f"{result['peak_rss_mb'] or '-':>7}")
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+    
+    # Подготовка к воспроизведению на сгенерированных данных
+    prep_words = make_benchmark_words(base_words, min(sizes))
+    with contextlib.redirect_stdout(io.StringIO()):
+        prep_audio = generate_audio_parallel(
+            prep_words, max_workers=max(worker_options),
+            synthesizer=FakeSynthesizer(latency=0)
+        )
+    playback_prep = benchmark_playback_prep(prep_audio)
+    for method_name, prep in (playback_prep or {}).items():
+        print(f"🎵 Подготовка воспроизведения ({method_name}): p50 {prep['latency_ms']['p50']} мс, "
+              f"p95 {prep['latency_ms']['p95']} мс на слово")
+    
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': sys.version.split()[0],
+            'platform': sys.platform,
+            'simulated_latency_s': latency,
+            'simulated_jitter_s': jitter,
+        },
+        'generation': results,
+        'playback_prep': playback_prep,
+    }
+    try:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"💾 Результаты бенчмарка сохранены в {output_file}")
+    except Exception as e:
+        print(f"❌ Ошибка сохранения результатов бенчмарка: {e}")
+    return report
@@ -0,0 +1,862 @@
+"""Кэш аудио (сегмент + индекс, адресация по содержимому) и кэш декодированного PCM"""
+
+import hashlib
+import io
+import json
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+
+from .synthesis import GTTSSynthesizer
+from .tracing import TRACER
+
+# Откуда получено аудио слова
+SOURCE_CACHE = 'cache'
+SOURCE_COALESCED = 'coalesced'
+SOURCE_GENERATED = 'generated'
+SOURCE_FAILED = 'failed'
+
+def make_cache_key(word, language='ru', slow=False):
+    """Создает уникальный ключ для кэширования"""
+    content = f"{word}_{language}_{slow}"
+    return hashlib.md5(content.encode('utf-8')).hexdigest()
+
+# Отпечаток записей, происхождение которых неизвестно
+UNKNOWN_PROVENANCE = b'\x00' * 8
+
+def make_provenance_id(provenance):
+    """Короткий отпечаток описания синтезатора для индекса кэша"""
+    if provenance is None:
+        return UNKNOWN_PROVENANCE
+    return hashlib.md5(provenance.encode('utf-8')).digest()[:8]
+
+def legacy_provenance_id(audio_data):
+    """Отпечаток записи из кэша без отпечатков (pickle или версия 1)
+
+    Старые кэши заполнял gTTS, поэтому записи получают его отпечаток, а не
+    отпечаток синтезатора, запущенного во время перевода. gTTS не отдает WAV:
+    такие записи сделаны имитацией, и их происхождение остается неизвестным.
+    """
+    if bytes(audio_data[:4]) == b'RIFF':
+        return UNKNOWN_PROVENANCE
+    return make_provenance_id(GTTSSynthesizer().fingerprint())
+
+def make_cache_label(word, language='ru', slow=False):
+    """Подпись записи кэша для статистики"""
+    return f"{word} ({language}{', медленно' if slow else ''})"
+
+class AudioCache:
+    """Кэш аудио между запусками: сегментный файл (append-only) + компактный индекс
+
+    Аудио хранится подряд в сегментном файле, индекс связывает ключ слова с
+    блобом в сегменте. При старте загружается только индекс, данные читаются
+    через mmap без копирования, а сохранение дописывает только новые записи.
+    
+    Формат версии 2 адресуется по содержимому: блоб определяется своим SHA-256
+    и хранится один раз, даже если одинаковое аудио у нескольких ключей
+    (например, одно слово на разных языках). Контрольная сумма блоба
+    проверяется при первом чтении; поврежденные записи попадают в карантин
+    (удаляются из индекса) и синтезируются заново. Блобы, которые заметно
+    сжимаются (WAV), хранятся сжатыми zlib, MP3 - как есть.
+    
+    Каждая запись помнит отпечаток синтезатора (provenance), который ее создал.
+    Записи с другим отпечатком считаются промахом, поэтому смена голоса или
+    движка инвалидирует только затронутые записи. Кэш версии 1 переводится в
+    новый формат автоматически, записям присваивается отпечаток gTTS.
+    
+    Кэш потокобезопасен. Генерация через get_or_generate() объединяет запросы:
+    пока слово синтезируется, остальные потоки ждут тот же результат.
+    
+    Размер можно ограничить (max_bytes, max_entries, 0 - без ограничения). При
+    превышении лимита вытесняются давно (LRU) или редко (LFU) используемые
+    записи, а сегментный файл перезаписывается без них. Число обращений и
+    время последнего доступа к каждой записи хранятся рядом в .usage.json.
+    """
+    
+    SEGMENT_MAGIC = b'PWSEG2\x00\x00'
+    INDEX_MAGIC = b'PWIDX2\x00\x00'
+    # Запись индекса: md5-ключ (16 байт), SHA-256 блоба (32), отпечаток
+    # синтезатора (8), смещение (8), длина на диске (4), флаги (1).
+    # Запись с нулевой длиной удаляет ключ (карантин)
+    INDEX_RECORD = struct.Struct('<16s32s8sQIB')
+    V1_SEGMENT_MAGIC = b'PWSEG1\x00\x00'
+    V1_INDEX_MAGIC = b'PWIDX1\x00\x00'
+    V1_INDEX_RECORD = struct.Struct('<16sQI')
+    FLAG_ZLIB = 1
+    # Сжатый блоб хранится, только если он хотя бы на 10% меньше исходного
+    MIN_COMPRESSION_GAIN = 0.1
+    EVICTION_POLICIES = ('lru', 'lfu')
+    # После вытеснения кэш занимает не более этой доли лимита, чтобы не
+    # перезаписывать сегмент при каждом сохранении
+    EVICTION_TARGET = 0.9
+    
+    def __init__(self, cache_file='audio_cache.seg', legacy_file='audio_cache.pkl',
+                 max_bytes=0, max_entries=0, eviction='lru', provenance=None):
+        if eviction not in self.EVICTION_POLICIES:
+            raise ValueError(f"неизвестная политика вытеснения: {eviction}")
+        self.cache_file = cache_file
+        self.index_file = os.path.splitext(cache_file)[0] + '.idx'
+        self.usage_file = os.path.splitext(cache_file)[0] + '.usage.json'
+        self.legacy_file = legacy_file
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.eviction = eviction
+        # Описание синтезатора; None - принимать записи любого происхождения
+        self.provenance = provenance
+        self.provenance_id = make_provenance_id(provenance)
+        self.provenance_names = {}  # отпечаток -> описание синтезатора
+        if provenance is not None:
+            self.provenance_names[self.provenance_id] = provenance
+        self.index = {}      # ключ (16 байт) -> (SHA-256 блоба, отпечаток)
+        self.blobs = {}      # SHA-256 -> (смещение, длина на диске, флаги)
+        self.pending = {}    # ключ -> (аудио, отпечаток), еще не записанные на диск
+        self.verified = set()  # блобы, контрольная сумма которых уже проверена
+        self.in_flight = {}  # ключ -> Future синтеза, который уже выполняется
+        self.usage = {}      # ключ -> [обращений, время последнего доступа, слово]
+        self.hits = 0
+        self.misses = 0
+        self.quarantined = 0
+        self.lock = threading.RLock()
+        self.save_lock = threading.RLock()  # берется до self.lock, не наоборот
+        self._mmap = None
+        self._view = None
+        self.load_cache()
+    
+    def get_cache_key(self, word, language='ru', slow=False):
+        """Создает уникальный ключ для кэширования"""
+        return make_cache_key(word, language, slow)
+    
+    def load_cache(self):
+        """Загружает индекс кэша (сами данные остаются на диске)"""
+        v1_index_file = self.index_file + '.v1'
+        try:
+            if os.path.exists(v1_index_file):
+                # Перевод из версии 1 был прерван - начинаем его заново
+                self.migrate_from_v1()
+                return
+            
+            if not os.path.exists(self.index_file) and os.path.exists(self.legacy_file):
+                self.migrate_from_pickle()
+                return
+            
+            if os.path.exists(self.index_file) and os.path.exists(self.cache_file):
+                with open(self.index_file, 'rb') as f:
+                    if f.read(len(self.V1_INDEX_MAGIC)) == self.V1_INDEX_MAGIC:
+                        os.replace(self.cache_file, self.cache_file + '.v1')
+                        os.replace(self.index_file, v1_index_file)
+                        self.migrate_from_v1()
+                        return
+                self._read_index()
+                self._map_segment()
+                self.load_usage()
+                print(f"✅ Загружен кэш: {len(self.index)} записей")
+            else:
+                if os.path.exists(self.cache_file):
+                    # Сегмент без индекса остается после прерванного сжатия
+                    os.remove(self.cache_file)
+                print("✅ Кэш не найден, создается новый")
+        except Exception as e:
+            print(f"❌ Ошибка загрузки кэша: {e}, создается новый кэш")
+            self.index = {}
+            self.blobs = {}
+            self._mmap = None
+            self._view = None
+    
+    def _read_index(self):
+        """Читает индекс, отбрасывая неполные и выходящие за сегмент записи"""
+        segment_size = os.path.getsize(self.cache_file)
+        with open(self.index_file, 'rb') as f:
+            data = f.read()
+        
+        if not data.startswith(self.INDEX_MAGIC):
+            raise ValueError("неизвестный формат индекса")
+        
+        record_size = self.INDEX_RECORD.size
+        body = memoryview(data)[len(self.INDEX_MAGIC):]
+        # Неполная последняя запись (прерванное сохранение) игнорируется
+        usable = len(body) - len(body) % record_size
+        for key, digest, provenance, offset, length, flags in self.INDEX_RECORD.iter_unpack(body[:usable]):
+            if length == 0:
+                # Карантин: ключ удален, поврежденный блоб больше не используется
+                self.index.pop(key, None)
+                self.blobs.pop(digest, None)
+            elif offset + length <= segment_size:
+                self.index[key] = (digest, provenance)
+                self.blobs[digest] = (offset, length, flags)
+        for key, (digest, _) in list(self.index.items()):
+            if digest not in self.blobs:
+                del self.index[key]
+    
+    def load_usage(self):
+        """Загружает статистику обращений (при ошибке статистика начинается заново)"""
+        try:
+            if not os.path.exists(self.usage_file):
+                return
+            with open(self.usage_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.hits = data.get('hits', 0)
+            self.misses = data.get('misses', 0)
+            self.quarantined = data.get('quarantined', 0)
+            for provenance_id, description in data.get('provenance', {}).items():
+                self.provenance_names.setdefault(bytes.fromhex(provenance_id), description)
+            for key, entry in data.get('entries', {}).items():
+                key = bytes.fromhex(key)
+                if key in self.index:
+                    self.usage[key] = entry
+        except Exception as e:
+            print(f"❌ Ошибка загрузки статистики кэша: {e}")
+    
+    def save_usage(self):
+        """Сохраняет статистику обращений к записям"""
+        try:
+            with self.lock:
+                data = json.dumps({
+                    'hits': self.hits,
+                    'misses': self.misses,
+                    'quarantined': self.quarantined,
+                    'provenance': {
+                        provenance_id.hex(): description
+                        for provenance_id, description in self.provenance_names.items()
+                    },
+                    'entries': {
+                        key.hex(): entry for key, entry in self.usage.items()
+                        if key in self.index
+                    }
+                }, ensure_ascii=False)
+            temp_file = self.usage_file + '.tmp'
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(temp_file, self.usage_file)
+        except Exception as e:
+            print(f"❌ Ошибка сохранения статистики кэша: {e}")
+    
+    def _map_segment(self):
+        """Отображает сегментный файл в память только для чтения"""
+        with open(self.cache_file, 'rb') as f:
+            if f.read(len(self.SEGMENT_MAGIC)) != self.SEGMENT_MAGIC:
+                raise ValueError("неизвестный формат сегментного файла")
+            # Старое отображение не закрываем явно: на него могут ссылаться
+            # выданные ранее memoryview, оно освободится вместе с ними
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+    
+    def migrate_from_pickle(self):
+        """Однократная миграция из старого pickle-кэша"""
+        with open(self.legacy_file, 'rb') as f:
+            legacy_cache = pickle.load(f)
+        
+        print(f"🔄 Миграция кэша из {self.legacy_file}: {len(legacy_cache)} записей")
+        self._register_legacy_provenance()
+        for key, audio_data in legacy_cache.items():
+            self.pending[bytes.fromhex(key)] = (bytes(audio_data), legacy_provenance_id(audio_data))
+        self.save_cache()
+        print(f"✅ Миграция завершена, файл {self.legacy_file} больше не используется")
+    
+    def _register_legacy_provenance(self):
+        legacy = GTTSSynthesizer().fingerprint()
+        self.provenance_names.setdefault(make_provenance_id(legacy), legacy)
+    
+    def migrate_from_v1(self):
+        """Однократный перевод кэша версии 1 (без хешей и отпечатков) в текущий формат
+
+        Файлы версии 1 к этому моменту переименованы в *.v1 и удаляются только
+        после записи нового кэша, поэтому прерванный перевод повторяется.
+        """
+        v1_segment_file = self.cache_file + '.v1'
+        v1_index_file = self.index_file + '.v1'
+        with open(v1_index_file, 'rb') as f:
+            data = f.read()
+        with open(v1_segment_file, 'rb') as f:
+            segment = f.read()
+        if not data.startswith(self.V1_INDEX_MAGIC) or not segment.startswith(self.V1_SEGMENT_MAGIC):
+            raise ValueError("неизвестный формат кэша версии 1")
+        
+        record_size = self.V1_INDEX_RECORD.size
+        body = memoryview(data)[len(self.V1_INDEX_MAGIC):]
+        usable = len(body) - len(body) % record_size
+        for key, offset, length in self.V1_INDEX_RECORD.iter_unpack(body[:usable]):
+            if offset + length <= len(segment):
+                audio_data = segment[offset:offset + length]
+                self.pending[key] = (audio_data, legacy_provenance_id(audio_data))
+        
+        print(f"🔄 Перевод кэша в формат версии 2: {len(self.pending)} записей")
+        self._register_legacy_provenance()
+        for path in (self.cache_file, self.index_file):
+            if os.path.exists(path):
+                os.remove(path)
+        self._save_pending()
+        if self.pending:
+            raise OSError("не удалось записать кэш версии 2")
+        os.remove(v1_segment_file)
+        os.remove(v1_index_file)
+        print("✅ Перевод кэша завершен")
+    
+    def save_cache(self, enforce_limits=True):
+        """Дописывает в кэш только новые записи и соблюдает лимит размера
+
+        Данные пишутся на диск без основной блокировки, поэтому чтение и
+        добавление записей во время сохранения не ждут. Вытеснение
+        перезаписывает весь сегмент под блокировкой; частые фоновые
+        сохранения пропускают его (enforce_limits=False).
+        """
+        with self.save_lock:
+            self._save_pending()
+            if enforce_limits:
+                with self.lock:
+                    try:
+                        self._enforce_limits()
+                    except Exception as e:
+                        print(f"❌ Ошибка вытеснения из кэша: {e}")
+        if self.index:
+            self.save_usage()
+    
+    def _encode_blob(self, audio_data):
+        """Возвращает (данные для записи, флаги): сжатые, если это выгодно"""
+        compressed = zlib.compress(audio_data)
+        if len(compressed) <= len(audio_data) * (1 - self.MIN_COMPRESSION_GAIN):
+            return compressed, self.FLAG_ZLIB
+        return audio_data, 0
+    
+    def _save_pending(self):
+        """Записывает накопленные записи (сохранения выполняются по одному)"""
+        with self.save_lock:
+            with self.lock:
+                if not self.pending:
+                    return
+                batch = dict(self.pending)
+                new_segment = not os.path.exists(self.cache_file)
+                known = {} if new_segment else dict(self.blobs)
+            
+            try:
+                # Данные дописываются и сбрасываются на диск без блокировки
+                records = []
+                written = {}  # SHA-256 -> размещение блобов, записанных в этот раз
+                with open(self.cache_file, 'ab') as f:
+                    if new_segment:
+                        f.write(self.SEGMENT_MAGIC)
+                    offset = f.tell()
+                    for key, (audio_data, provenance) in batch.items():
+                        if not audio_data:
+                            continue
+                        digest = hashlib.sha256(audio_data).digest()
+                        location = written.get(digest) or known.get(digest)
+                        if location is None:
+                            stored, flags = self._encode_blob(audio_data)
+                            f.write(stored)
+                            location = (offset, len(stored), flags)
+                            written[digest] = location
+                            offset += len(stored)
+                        records.append((key, digest, provenance) + location)
+                    f.flush()
+                    os.fsync(f.fileno())
+                
+                with self.lock:
+                    if new_segment:
+                        self.blobs = {}
+                    # Блоб, помещенный в карантин во время записи, не используется:
+                    # такие записи остаются в pending до следующего сохранения
+                    new_records = [record for record in records
+                                   if record[1] in written or self.blobs.get(record[1]) == record[3:]]
+                    # Индекс пишется после данных: при сбое теряются только новые записи
+                    new_index = new_segment or not os.path.exists(self.index_file)
+                    with open(self.index_file, 'wb' if new_index else 'ab') as f:
+                        if new_index:
+                            f.write(self.INDEX_MAGIC)
+                        for record in new_records:
+                            f.write(self.INDEX_RECORD.pack(*record))
+                    
+                    for key, digest, provenance, offset, length, flags in new_records:
+                        self.index[key] = (digest, provenance)
+                        self.blobs[digest] = (offset, length, flags)
+                    # Только что записанные блобы посчитаны из исходных данных
+                    self.verified.update(written)
+                    saved = {record[0] for record in new_records}
+                    for key, entry in batch.items():
+                        # Запись, замененная во время сохранения, ждет следующего
+                        if (key in saved or not entry[0]) and self.pending.get(key) is entry:
+                            del self.pending[key]
+                    self._map_segment()
+                    print(f"💾 Кэш сохранен: +{len(new_records)} новых "
+                          f"({len(written)} новых блобов), всего {len(self.index)} записей")
+            except Exception as e:
+                print(f"❌ Ошибка сохранения кэша: {e}")
+    
+    def _blob_references(self):
+        """Число ключей, ссылающихся на каждый блоб"""
+        references = {}
+        for digest, _ in self.index.values():
+            references[digest] = references.get(digest, 0) + 1
+        return references
+    
+    def total_bytes(self):
+        """Объем аудио в кэше (без учета заголовков и индекса)"""
+        with self.lock:
+            return (sum(self.blobs[digest][1] for digest in self._blob_references())
+                    + sum(len(audio_data) for audio_data, _ in self.pending.values()))
+    
+    def _eviction_order(self):
+        """Ключи записей на диске: первыми идут самые холодные"""
+        def coldness(key):
+            hits, last_access = self.usage.get(key, (0, 0.0))[:2]
+            return (hits, last_access) if self.eviction == 'lfu' else (last_access, hits)
+        return sorted(self.index, key=coldness)
+    
+    def _enforce_limits(self):
+        """Вытесняет записи сверх лимита и сжимает сегментный файл"""
+        references = self._blob_references()
+        total = sum(self.blobs[digest][1] for digest in references)
+        over_bytes = self.max_bytes and total > self.max_bytes
+        over_entries = self.max_entries and len(self.index) > self.max_entries
+        if not (over_bytes or over_entries):
+            return
+        
+        target_bytes = self.max_bytes * self.EVICTION_TARGET
+        target_entries = int(self.max_entries * self.EVICTION_TARGET)
+        remaining = len(self.index)
+        victims = []
+        for key in self._eviction_order():
+            if ((not self.max_bytes or total <= target_bytes)
+                    and (not self.max_entries or remaining <= target_entries)):
+                break
+            victims.append(key)
+            # Место блоба освобождается вместе с последним ключом, который на него ссылается
+            digest = self.index[key][0]
+            references[digest] -= 1
+            if not references[digest]:
+                total -= self.blobs[digest][1]
+            remaining -= 1
+        
+        self._compact(set(victims))
+        print(f"🧹 Вытеснено из кэша ({self.eviction.upper()}): {len(victims)} записей, "
+              f"осталось {len(self.index)} ({total / 2**20:.1f} МБ)")
+    
+    def _compact(self, removed):
+        """Перезаписывает сегментный файл без удаленных записей"""
+        temp_segment = self.cache_file + '.tmp'
+        temp_index = self.index_file + '.tmp'
+        new_index = {key: entry for key, entry in self.index.items() if key not in removed}
+        new_blobs = {}
+        with open(temp_segment, 'wb') as f:
+            f.write(self.SEGMENT_MAGIC)
+            offset = len(self.SEGMENT_MAGIC)
+            for digest in sorted({digest for digest, _ in new_index.values()},
+                                 key=lambda digest: self.blobs[digest][0]):
+                old_offset, length, flags = self.blobs[digest]
+                f.write(self._view[old_offset:old_offset + length])
+                new_blobs[digest] = (offset, length, flags)
+                offset += length
+            f.flush()
+            os.fsync(f.fileno())
+        with open(temp_index, 'wb') as f:
+            f.write(self.INDEX_MAGIC)
+            for key, (digest, provenance) in new_index.items():
+                f.write(self.INDEX_RECORD.pack(key, digest, provenance, *new_blobs[digest]))
+            f.flush()
+            os.fsync(f.fileno())
+        
+        # Сначала удаляется индекс: сбой между заменами оставит пустой кэш,
+        # а не индекс со смещениями от другого сегмента
+        os.remove(self.index_file)
+        os.replace(temp_segment, self.cache_file)
+        os.replace(temp_index, self.index_file)
+        
+        self.index = new_index
+        self.blobs = new_blobs
+        for key in removed:
+            self.usage.pop(key, None)
+        self._map_segment()
+    
+    def _quarantine(self, digest):
+        """Убирает из кэша все ключи поврежденного блоба, чтобы они синтезировались заново"""
+        keys = [key for key, (key_digest, _) in self.index.items() if key_digest == digest]
+        for key in keys:
+            del self.index[key]
+        self.blobs.pop(digest, None)
+        self.quarantined += len(keys)
+        try:
+            with open(self.index_file, 'ab') as f:
+                for key in keys:
+                    f.write(self.INDEX_RECORD.pack(key, digest, UNKNOWN_PROVENANCE, 0, 0, 0))
+        except OSError as e:
+            print(f"❌ Ошибка записи карантина в индекс: {e}")
+        print(f"⚠️ Поврежденная запись кэша ({len(keys)} ключей) помещена в карантин и будет создана заново")
+    
+    def _record_access(self, key, label, hit):
+        """Учитывает обращение к ключу (вызывается под блокировкой)"""
+        entry = self.usage.setdefault(key, [0, 0.0, label])
+        entry[1] = time.time()
+        if hit:
+            entry[0] += 1
+            self.hits += 1
+        else:
+            self.misses += 1
+    
+    def print_stats(self, top=5):
+        """Показывает статистику кэша: попадания, объем, крупные и холодные записи"""
+        with self.lock:
+            entries = len(self.index) + len(self.pending)
+            total = self.total_bytes()
+            references = self._blob_references()
+            undeduplicated = sum(self.blobs[digest][1] * count for digest, count in references.items())
+            compressed = sum(1 for digest in references if self.blobs[digest][2] & self.FLAG_ZLIB)
+            by_provenance = {}
+            for _, provenance in self.index.values():
+                by_provenance[provenance] = by_provenance.get(provenance, 0) + 1
+            lookups = self.hits + self.misses
+            sizes = sorted(
+                ((self.blobs[digest][1], key) for key, (digest, _) in self.index.items()),
+                reverse=True
+            )[:top]
+            coldest = self._eviction_order()[:top]
+            usage = {key: list(self.usage.get(key, (0, 0.0, None))) for key in coldest}
+            usage.update({key: list(self.usage.get(key, (0, 0.0, None))) for _, key in sizes})
+        
+        def describe(key):
+            label = usage[key][2] if len(usage[key]) > 2 else None
+            return label or key.hex()[:12]
+        
+        disk_bytes = sum(
+            os.path.getsize(path) for path in (self.cache_file, self.index_file, self.usage_file)
+            if os.path.exists(path)
+        )
+        print(f"\n📊 СТАТИСТИКА КЭША ({self.cache_file}):")
+        print(f"   📦 Записей: {entries}" + (f" (лимит {self.max_entries})" if self.max_entries else ""))
+        print(f"   💾 Объем аудио: {total / 2**20:.2f} МБ"
+              + (f" (лимит {self.max_bytes / 2**20:.2f} МБ)" if self.max_bytes else "")
+              + f", на диске {disk_bytes / 2**20:.2f} МБ")
+        print(f"   🧬 Уникальных блобов: {len(references)}, сжатых: {compressed}, "
+              f"дедупликация сэкономила {(undeduplicated - total) / 2**20:.2f} МБ")
+        for provenance, count in sorted(by_provenance.items(), key=lambda item: -item[1]):
+            description = self.provenance_names.get(provenance, "неизвестный синтезатор")
+            marker = "" if self.provenance is None or provenance == self.provenance_id else " (устарели)"
+            print(f"   🏷️ {description}: {count} записей{marker}")
+        if self.quarantined:
+            print(f"   ⚠️ Помещено в карантин: {self.quarantined}")
+        if lookups:
+            print(f"   🎯 Попаданий: {self.hits} из {lookups} ({self.hits / lookups:.0%})")
+        else:
+            print("   🎯 Попаданий: обращений еще не было")
+        print(f"   🧹 Политика вытеснения: {self.eviction.upper()}")
+        if sizes:
+            print("   📏 Самые большие записи:")
+            for length, key in sizes:
+                print(f"      {length / 1024:7.1f} КБ  {describe(key)}")
+        if coldest:
+            print("   🧊 Самые холодные записи (первые кандидаты на вытеснение):")
+            for key in coldest:
+                hits, last_access = usage[key][:2]
+                when = time.strftime('%Y-%m-%d %H:%M', time.localtime(last_access)) if last_access else "никогда"
+                print(f"      {hits:5d} обращ.  {when}  {describe(key)}")
+    
+    def get(self, word, language='ru', slow=False):
+        """Получает аудио из кэша как memoryview (без копирования данных)"""
+        key = bytes.fromhex(self.get_cache_key(word, language, slow))
+        with TRACER.span('cache_lookup', word=word), self.lock:
+            audio_data = self._get_by_key(key)
+            self._record_access(key, make_cache_label(word, language, slow), audio_data is not None)
+            return audio_data
+    
+    def _accepts(self, provenance):
+        return self.provenance is None or provenance == self.provenance_id
+    
+    def _get_by_key(self, key):
+        audio_data, provenance = self._load_entry(key)
+        if audio_data is None or not self._accepts(provenance):
+            return None
+        return audio_data
+    
+    def _load_entry(self, key):
+        """Возвращает (аудио, отпечаток) записи с проверкой контрольной суммы"""
+        if key in self.pending:
+            audio_data, provenance = self.pending[key]
+            return memoryview(audio_data), provenance
+        entry = self.index.get(key)
+        if entry is None or self._view is None:
+            return None, None
+        digest, provenance = entry
+        offset, length, flags = self.blobs[digest]
+        audio_data = self._view[offset:offset + length]
+        try:
+            if flags & self.FLAG_ZLIB:
+                audio_data = memoryview(zlib.decompress(audio_data))
+            intact = digest in self.verified or hashlib.sha256(audio_data).digest() == digest
+        except zlib.error:
+            intact = False
+        if not intact:
+            self._quarantine(digest)
+            return None, None
+        self.verified.add(digest)
+        return audio_data, provenance
+    
+    def _provenance_of(self, key):
+        if key in self.pending:
+            return self.pending[key][1]
+        entry = self.index.get(key)
+        return entry[1] if entry else None
+    
+    def put(self, word, audio_data, language='ru', slow=False):
+        """Добавляет аудио в кэш (запись на диск происходит в save_cache)"""
+        try:
+            key = bytes.fromhex(self.get_cache_key(word, language, slow))
+            if isinstance(audio_data, io.BytesIO):
+                audio_data = audio_data.getvalue()
+            with self.lock:
+                self.pending[key] = (bytes(audio_data), self.provenance_id)
+                self.usage.setdefault(key, [0, 0.0, make_cache_label(word, language, slow)])[1] = time.time()
+        except Exception as e:
+            print(f"❌ Ошибка добавления в кэш: {e}")
+    
+    def content_digest(self, key):
+        """SHA-256 содержимого записи; для сохраненных записей берется из индекса"""
+        with self.lock:
+            if key in self.pending:
+                return hashlib.sha256(self.pending[key][0]).digest()
+            entry = self.index.get(key)
+            return entry[0] if entry else None
+    
+    def locate(self, word, language='ru', slow=False, record=True):
+        """Место записи в сегменте: (ключ, смещение, длина, флаги) без чтения данных
+
+        None - если слова нет в кэше или оно еще не сохранено на диск.
+        Данные читаются позже через read_range(). С record=False обращение
+        не учитывается в статистике (как у contains()).
+        """
+        key = bytes.fromhex(self.get_cache_key(word, language, slow))
+        with self.lock:
+            entry = self.index.get(key)
+            located = key not in self.pending and entry is not None and self._accepts(entry[1])
+            if record:
+                self._record_access(key, make_cache_label(word, language, slow), located)
+            if not located:
+                return None
+            return (key,) + self.blobs[entry[0]]
+    
+    def read_range(self, key, offset, length, flags, label=None):
+        """Аудио по месту из locate(); None, если сегмент с тех пор перезаписан
+
+        С label (make_cache_label) прочитанная запись учитывается как попадание.
+        """
+        with self.lock:
+            entry = self.index.get(key)
+            if entry is None or self.blobs.get(entry[0]) != (offset, length, flags):
+                return None
+            audio_data = self._get_by_key(key)
+            if audio_data is not None and label is not None:
+                self._record_access(key, label, True)
+            return audio_data
+    
+    def contains(self, word, language='ru', slow=False):
+        """Проверяет наличие слова в кэше без чтения данных"""
+        key = bytes.fromhex(self.get_cache_key(word, language, slow))
+        with self.lock:
+            provenance = self._provenance_of(key)
+            return provenance is not None and self._accepts(provenance)
+    
+    def merge_from(self, other, batch_size=500):
+        """Переносит в кэш записи другого кэша, которых здесь нет
+
+        Запись с другим отпечатком синтезатора заменяется записью из other.
+        Сохраняет порциями по batch_size записей, чтобы не держать в памяти
+        весь шард. Возвращает число добавленных записей.
+        """
+        added = 0
+        with other.lock:
+            other_keys = list(other.index) + list(other.pending)
+            self.provenance_names.update(other.provenance_names)
+        for key in other_keys:
+            with other.lock:
+                audio_data, provenance = other._load_entry(key)
+            if audio_data is None:
+                continue
+            with self.lock:
+                if self._provenance_of(key) == provenance:
+                    continue
+                self.pending[key] = (bytes(audio_data), provenance)
+                self.usage[key] = list(other.usage.get(key, (0, time.time(), None)))
+                added += 1
+                save = len(self.pending) >= batch_size
+            if save:
+                self._save_pending()
+        self.save_cache()
+        return added
+    
+    def claim(self, word, language='ru', slow=False):
+        """Начинает получение слова с объединением одинаковых запросов
+
+        Возвращает (key, cached_audio, future, owner): если аудио уже в кэше,
+        cached_audio не None; иначе owner=True означает, что синтез должен
+        выполнить вызывающий (и затем вызвать complete), а owner=False - что
+        синтез уже идет и результат нужно ждать на future.
+        """
+        key = bytes.fromhex(self.get_cache_key(word, language, slow))
+        with TRACER.span('cache_lookup', word=word), self.lock:
+            cached_audio = self._get_by_key(key)
+            if cached_audio is not None:
+                self._record_access(key, make_cache_label(word, language, slow), True)
+                return key, cached_audio, None, False
+            future = self.in_flight.get(key)
+            if future is not None:
+                return key, None, future, False
+            self._record_access(key, make_cache_label(word, language, slow), False)
+            future = Future()
+            self.in_flight[key] = future
+            return key, None, future, True
+    
+    def complete(self, key, future, audio_data=None, error=None):
+        """Завершает синтез, начатый claim(), и будит ожидающих"""
+        with self.lock:
+            if error is None:
+                self.pending[key] = (bytes(audio_data), self.provenance_id)
+            self.in_flight.pop(key, None)
+        if error is None:
+            future.set_result(audio_data)
+        else:
+            future.set_exception(error)
+    
+    def get_or_generate(self, word, generate, language='ru', slow=False):
+        """Возвращает (аудио, источник): из кэша, общий результат или новый синтез"""
+        key, cached_audio, future, owner = self.claim(word, language, slow)
+        if cached_audio is not None:
+            return cached_audio, SOURCE_CACHE
+        if not owner:
+            return memoryview(future.result()), SOURCE_COALESCED
+        
+        try:
+            audio_bytes = generate()
+        except Exception as e:
+            self.complete(key, future, error=e)
+            raise
+        self.complete(key, future, audio_bytes)
+        return memoryview(audio_bytes), SOURCE_GENERATED
+
+class PcmCache:
+    """Второй уровень кэша: декодированный PCM в формате микшера
+
+    Каждая запись - файл <ключ>.pcm с коротким заголовком (частота, число
+    каналов, размер сэмпла, число кадров) и сырыми сэмплами. Ключ - хеш исходного
+    аудио (с суффиксом скорости). Общий объем ограничен max_bytes, при переполнении удаляются
+    давно не использовавшиеся записи (LRU).
+    """
+    
+    MAGIC = b'PCM1'
+    HEADER = struct.Struct('<4sIHHI')  # магия, частота, каналы, байт на сэмпл, кадров
+    
+    def __init__(self, cache_dir='pcm_cache', max_bytes=128 * 2**20):
+        self.cache_dir = cache_dir
+        self.index_file = os.path.join(cache_dir, 'index.json')
+        self.max_bytes = max_bytes
+        self.entries = {}  # ключ -> [размер файла, время последнего доступа]
+        self.lock = threading.Lock()
+        self.load_index()
+    
+    def load_index(self):
+        """Восстанавливает индекс по файлам в каталоге кэша"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        try:
+            saved = {}
+            if os.path.exists(self.index_file):
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    saved = json.load(f)
+            
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith('.pcm'):
+                    key = entry.name[:-4]
+                    stat = entry.stat()
+                    last_access = saved.get(key, [0, stat.st_mtime])[1]
+                    self.entries[key] = [stat.st_size, last_access]
+            print(f"✅ Загружен PCM-кэш: {len(self.entries)} записей, {self.total_bytes() / 2**20:.1f} МБ")
+        except Exception as e:
+            print(f"❌ Ошибка загрузки PCM-кэша: {e}")
+    
+    def save(self):
+        """Сохраняет время последнего доступа к записям"""
+        if not self.entries:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with self.lock:
+                data = json.dumps(self.entries)
+            with open(self.index_file, 'w', encoding='utf-8') as f:
+                f.write(data)
+        except Exception as e:
+            print(f"❌ Ошибка сохранения PCM-кэша: {e}")
+    
+    def total_bytes(self):
+        return sum(size for size, _ in self.entries.values())
+    
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pcm")
+    
+    def get(self, key, frequency, channels, sample_width):
+        """Возвращает PCM (bytes) для ключа, если он есть в нужном формате"""
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries[key][1] = time.time()
+        
+        try:
+            with open(self._path(key), 'rb') as f:
+                header = f.read(self.HEADER.size)
+                magic, file_frequency, file_channels, file_width, frames = self.HEADER.unpack(header)
+                if (magic, file_frequency, file_channels, file_width) != (self.MAGIC, frequency, channels, sample_width):
+                    return None
+                pcm = f.read()
+            if len(pcm) != frames * channels * sample_width:
+                raise ValueError("неполная запись")
+            return pcm
+        except (OSError, ValueError, struct.error):
+            self.remove(key)
+            return None
+    
+    def put(self, key, pcm, frequency, channels, sample_width):
+        """Сохраняет PCM и при необходимости вытесняет старые записи"""
+        size = self.HEADER.size + len(pcm)
+        if size > self.max_bytes:
+            return
+        
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = self._path(key) + '.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(self.HEADER.pack(
+                    self.MAGIC, frequency, channels, sample_width,
+                    len(pcm) // (channels * sample_width)
+                ))
+                f.write(pcm)
+            os.replace(temp_path, self._path(key))
+        except OSError as e:
+            print(f"❌ Ошибка записи в PCM-кэш: {e}")
+            return
+        
+        with self.lock:
+            self.entries[key] = [size, time.time()]
+        self.evict()
+    
+    def remove(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+    
+    def evict(self):
+        """Удаляет давно не использовавшиеся записи сверх лимита"""
+        with self.lock:
+            total = sum(size for size, _ in self.entries.values())
+            if total <= self.max_bytes:
+                return
+            victims = []
+            for key, (size, _) in sorted(self.entries.items(), key=lambda item: item[1][1]):
+                if total <= self.max_bytes:
+                    break
+                victims.append(key)
+                total -= size
+        for key in victims:
+            self.remove(key)
@@ -0,0 +1,335 @@
+"""Командная строка: python main.py <команда> [параметры]
+
+Без параметров запускается интерактивное меню. Тяжелые модули (pygame,
+NumPy, gTTS) импортируются только командами, которым они нужны, поэтому
+stats или warm не платят за инициализацию звука.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from .settings import SettingsManager
+
+HEAVY_MODULES = ('pygame', 'numpy', 'gtts')
+
+def report_startup(command, started):
+    """Печатает время от запуска процесса до начала работы команды"""
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+    print(f"⏱️ Запуск команды {command}: {(time.perf_counter() - started) * 1000:.0f} мс"
+          + (f" (загружены: {', '.join(loaded)})" if loaded else " (без pygame, NumPy и gTTS)"))
+
+def read_word_files(filenames):
+    """Слова из нескольких файлов одним списком"""
+    from .words import read_words_from_file
+    words = []
+    for filename in filenames:
+        words += read_words_from_file(filename)
+    return words
+
+def apply_overrides(settings_manager, args):
+    """Параметры командной строки меняют настройки только на этот запуск"""
+    overrides = {
+        'language': args.language,
+        'generation_mode': args.mode,
+        'max_workers': args.workers,
+        'synthesizer': args.synthesizer,
+    }
+    if args.trace is not None:
+        overrides['trace'] = True
+        overrides['trace_file'] = args.trace
+    if args.synthesizer not in (None, settings_manager.get('synthesizer')):
+        # Параметры из настроек относятся к другому синтезатору
+        settings_manager.override('synthesizer_options', {})
+    for key, value in overrides.items():
+        if value is not None:
+            settings_manager.override(key, value)
+
+def build_parser(settings_manager):
+    parser = argparse.ArgumentParser(prog='main.py', description="Произношение слов (TTS)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    # Общие параметры генерации для generate и play
+    generation = argparse.ArgumentParser(add_help=False)
+    generation.add_argument('files', nargs='*', default=['listen.txt'],
+                            help="файлы со словами (по умолчанию listen.txt)")
+    generation.add_argument('-l', '--language', help="язык синтеза")
+    generation.add_argument('-m', '--mode', type=int, choices=(1, 2, 3, 4, 5),
+                            help="режим генерации: 1-параллельный, 2-батчи, 3-адаптивный, 4-асинхронный, 5-фразами")
+    generation.add_argument('-w', '--workers', type=int, help="потоков генерации")
+    generation.add_argument('--synthesizer', choices=('gtts', 'fake', 'http'))
+    generation.add_argument('--trace', nargs='?', const='', metavar='FILE',
+                            help="сводка по операциям; с FILE - выгрузка трассы (*.json или *.jsonl)")
+    
+    subparsers.add_parser('generate', parents=[generation],
+                          help="сгенерировать аудио в кэш без воспроизведения")
+    
+    play_parser = subparsers.add_parser('play', parents=[generation], help="сгенерировать и прослушать")
+    play_parser.add_argument('-s', '--speed', type=float, help="скорость произношения")
+    play_parser.add_argument('-p', '--pause', type=float, help="пауза между словами, с")
+    order = play_parser.add_mutually_exclusive_group()
+    order.add_argument('--shuffle', dest='random_order', action='store_true', default=None,
+                       help="случайный порядок")
+    order.add_argument('--in-order', dest='random_order', action='store_false',
+                       help="порядок как в файле")
+    playback = play_parser.add_mutually_exclusive_group()
+    playback.add_argument('--streaming', action='store_true', help="воспроизведение во время генерации")
+    playback.add_argument('--premixed', action='store_true', help="сведение сессии без пробелов")
+    playback.add_argument('--lazy', action='store_true',
+                          help="ленивая сессия: память не зависит от длины списка")
+    play_parser.add_argument('--export', metavar='WAV', help="сохранить сведенную сессию в WAV")
+    play_parser.add_argument('--pack', metavar='FILE', help="брать аудио из пакета (команда pack)")
+    play_parser.add_argument('--no-normalize', dest='normalize_loudness', action='store_false', default=None,
+                             help="не выравнивать громкость слов")
+    review = play_parser.add_mutually_exclusive_group()
+    review.add_argument('--review', dest='spaced_repetition', action='store_true', default=None,
+                        help="интервальное повторение: только слова, срок которых подошел, и новые")
+    review.add_argument('--all', dest='spaced_repetition', action='store_false', help="все слова файла")
+    play_parser.add_argument('--new', type=int, metavar='N', help="новых слов в сессии повторения")
+    
+    watch_parser = subparsers.add_parser('watch', parents=[generation],
+                                         help="следить за файлами и генерировать только измененные строки")
+    watch_parser.add_argument('-i', '--interval', type=float, default=1.0, help="как часто проверять файлы, с")
+    watch_parser.add_argument('--once', action='store_true', help="обработать изменения один раз и выйти")
+    watch_parser.add_argument('--play', action='store_true', help="прослушивать добавленные слова")
+    watch_parser.add_argument('--manifest', default='watch_manifest.json')
+    
+    pack_parser = subparsers.add_parser('pack', parents=[generation],
+                                        help="упаковать аудио списка в один файл с таблицей смещений")
+    pack_parser.add_argument('-o', '--output', help="файл пакета (по умолчанию <первый файл>.pwpack)")
+    
+    warm_parser = subparsers.add_parser('warm', help="прогрев кэша без воспроизведения")
+    warm_parser.add_argument('files', nargs='+', help="файлы со словами")
+    warm_parser.add_argument('-l', '--languages', nargs='+', default=[settings_manager.get('language')])
+    warm_parser.add_argument('-p', '--processes', type=int, default=os.cpu_count())
+    warm_parser.add_argument('-t', '--threads', type=int, default=settings_manager.get('max_workers'),
+                             help="потоков синтеза в каждом процессе")
+    warm_parser.add_argument('--slow', action='store_true', help="медленная речь (скорость < 0.8)")
+    warm_parser.add_argument('--synthesizer', default=settings_manager.get('synthesizer'))
+    warm_parser.add_argument('--save-every', type=int, default=50,
+                             help="как часто сохранять прогресс шарда (слов)")
+    warm_parser.add_argument('--checkpoint', default='warm_checkpoint.json')
+    
+    stats_parser = subparsers.add_parser('stats', help="статистика кэша аудио")
+    stats_parser.add_argument('--top', type=int, default=5, help="сколько записей показать в списках")
+    
+    serve_parser = subparsers.add_parser('serve', help="локальный HTTP-сервис произношения с общим кэшем")
+    serve_parser.add_argument('--host', default='127.0.0.1', help="адрес (по умолчанию только localhost)")
+    serve_parser.add_argument('--port', type=int, default=8765)
+    serve_parser.add_argument('--synthesizer', choices=('gtts', 'fake'))
+    serve_parser.add_argument('--max-connections', type=int, default=256,
+                              help="одновременных соединений, лишние получают 503")
+    serve_parser.add_argument('--max-concurrency', type=int, default=settings_manager.get('max_concurrency'),
+                              help="одновременных синтезов")
+    serve_parser.add_argument('--save-interval', type=float, default=30.0,
+                              help="как часто сохранять новые записи кэша, с")
+    serve_parser.add_argument('-q', '--quiet', action='store_true', help="не печатать каждый запрос")
+    
+    bench_parser = subparsers.add_parser('bench', help="тест скорости режимов на имитации TTS")
+    bench_parser.add_argument('file', nargs='?', default='listen.txt', help="файл с базовыми словами")
+    bench_parser.add_argument('--sizes', type=int, nargs='+', help="размеры списков слов")
+    bench_parser.add_argument('-o', '--output', default='benchmark_results.json')
+    return parser
+
+def command_generate(settings_manager, args, started):
+    from .session import generate_words
+    from .tracing import TRACER
+    from .words import deduplicate_words
+    
+    apply_overrides(settings_manager, args)
+    words = read_word_files(args.files)
+    if not words:
+        return 1
+    cache = settings_manager.create_audio_cache()
+    report_startup('generate', started)
+    if settings_manager.get('trace'):
+        TRACER.enable()
+    
+    unique_words, _ = deduplicate_words(words)
+    try:
+        unique_audio = generate_words(settings_manager, unique_words, cache)
+    except KeyboardInterrupt:
+        print("\n⏹️ Генерация прервана пользователем")
+        return 130
+    finally:
+        settings_manager.save_settings()
+        cache.save_cache()
+        TRACER.report(settings_manager.get('trace_file'))
+    return 1 if any(audio is None for audio in unique_audio) else 0
+
+def command_play(settings_manager, args, started):
+    apply_overrides(settings_manager, args)
+    for key, value in (('speed_factor', args.speed), ('pause_duration', args.pause),
+                       ('random_order', args.random_order), ('spaced_repetition', args.spaced_repetition),
+                       ('review_new_words', args.new), ('audio_pack', args.pack),
+                       ('normalize_loudness', args.normalize_loudness)):
+        if value is not None:
+            settings_manager.override(key, value)
+    if args.streaming or args.premixed or args.lazy:
+        settings_manager.override('streaming_playback', args.streaming)
+        settings_manager.override('premixed_playback', args.premixed)
+        settings_manager.override('lazy_playback', args.lazy)
+    if args.export is not None:
+        settings_manager.override('export_file', args.export)
+    
+    words = read_word_files(args.files)
+    if not words:
+        return 1
+    # Загрузка pygame и NumPy входит во время запуска этой команды
+    from . import playback  # noqa: F401
+    from .session import play_session
+    cache = settings_manager.create_audio_cache()
+    pcm_cache = settings_manager.create_pcm_cache()
+    report_startup('play', started)
+    
+    settings_manager.print_current_settings()
+    play_session(settings_manager, words, cache, pcm_cache)
+    return 0
+
+def command_watch(settings_manager, args, started):
+    from .tracing import TRACER
+    from .watch import watch_words
+    
+    apply_overrides(settings_manager, args)
+    cache = settings_manager.create_audio_cache()
+    pcm_cache = settings_manager.create_pcm_cache() if args.play else None
+    report_startup('watch', started)
+    if settings_manager.get('trace'):
+        TRACER.enable()
+    try:
+        session = watch_words(
+            args.files, settings_manager, cache, pcm_cache, interval=args.interval,
+            play=args.play, once=args.once, manifest_file=args.manifest
+        )
+    finally:
+        TRACER.report(settings_manager.get('trace_file'))
+    return 1 if session.manifest.failed else 0
+
+def command_pack(settings_manager, args, started):
+    from .pack import AudioPack
+    from .session import generate_words
+    from .tracing import TRACER
+    from .words import deduplicate_words
+    
+    apply_overrides(settings_manager, args)
+    words = read_word_files(args.files)
+    if not words:
+        return 1
+    output = args.output or os.path.splitext(args.files[0])[0] + '.pwpack'
+    cache = settings_manager.create_audio_cache()
+    report_startup('pack', started)
+    if settings_manager.get('trace'):
+        TRACER.enable()
+    
+    unique_words, _ = deduplicate_words(words)
+    try:
+        unique_audio = generate_words(settings_manager, unique_words, cache)
+        cache.save_cache()
+        with TRACER.span('write_pack'):
+            original_bytes, pack_bytes, levels = AudioPack.write(
+                output, unique_words, unique_audio,
+                settings_manager.get('language'), settings_manager.get('speed_factor') < 0.8
+            )
+    finally:
+        TRACER.report(settings_manager.get('trace_file'))
+    
+    packed = sum(audio is not None for audio in unique_audio)
+    print(f"📦 Пакет {output}: {packed} слов, {pack_bytes / 1024:.1f} КБ "
+          f"(исходные клипы {original_bytes / 1024:.1f} КБ)")
+    if levels:
+        print(f"🔊 Громкость клипов от {min(levels):.1f} до {max(levels):.1f} дБ, "
+              f"при воспроизведении выравнивается к {settings_manager.get('loudness_target')} дБ")
+    return 1 if packed < len(unique_words) else 0
+
+def command_warm(settings_manager, args, started):
+    from .synthesis import create_synthesizer
+    from .warm import warm_cache
+    
+    synthesizer_options = (
+        settings_manager.get('synthesizer_options')
+        if args.synthesizer == settings_manager.get('synthesizer') else {}
+    )
+    cache = settings_manager.create_audio_cache(
+        create_synthesizer(args.synthesizer, **synthesizer_options)
+    )
+    report_startup('warm', started)
+    try:
+        failed = warm_cache(
+            args.files, args.languages, processes=args.processes, threads=args.threads,
+            slow=args.slow, synthesizer_name=args.synthesizer,
+            synthesizer_options=synthesizer_options,
+            resilience=settings_manager.get_resilience_options(), cache=cache,
+            checkpoint_file=args.checkpoint,
+            save_every=args.save_every
+        )
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+    except KeyboardInterrupt:
+        return 130
+    return 1 if failed else 0
+
+def command_stats(settings_manager, args, started):
+    cache = settings_manager.create_audio_cache()
+    report_startup('stats', started)
+    cache.print_stats(args.top)
+    return 0
+
+def command_serve(settings_manager, args, started):
+    from .server import run_server
+    
+    if args.synthesizer not in (None, settings_manager.get('synthesizer')):
+        settings_manager.override('synthesizer', args.synthesizer)
+        settings_manager.override('synthesizer_options', {})
+    if settings_manager.get('synthesizer') == 'http':
+        print("❌ Сервис не может синтезировать через самого себя: укажите --synthesizer gtts или fake")
+        return 2
+    synthesizer = settings_manager.create_synthesizer()
+    cache = settings_manager.create_audio_cache(synthesizer)
+    report_startup('serve', started)
+    run_server(
+        cache, synthesizer, host=args.host, port=args.port,
+        max_connections=args.max_connections, max_concurrency=args.max_concurrency,
+        save_interval=args.save_interval, quiet=args.quiet
+    )
+    return 0
+
+def command_bench(settings_manager, args, started):
+    from .benchmark import run_benchmark
+    from .words import read_words_from_file
+    
+    words = read_words_from_file(args.file)
+    if not words:
+        return 1
+    report_startup('bench', started)
+    run_benchmark(words, sizes=args.sizes, output_file=args.output)
+    return 0
+
+COMMANDS = {
+    'generate': command_generate,
+    'play': command_play,
+    'watch': command_watch,
+    'pack': command_pack,
+    'warm': command_warm,
+    'stats': command_stats,
+    'serve': command_serve,
+    'bench': command_bench,
+}
+
+def run_cli(argv, started=None):
+    """Неинтерактивный запуск: python main.py <команда> [параметры]"""
+    started = started or time.perf_counter()
+    settings_manager = SettingsManager()
+    args = build_parser(settings_manager).parse_args(argv)
+    return COMMANDS[args.command](settings_manager, args, started)
+
+def main(argv=None, started=None):
+    """Точка входа: без параметров - интерактивное меню, иначе команда"""
+    started = started or time.perf_counter()
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        return run_cli(argv, started)
+    from .interactive import run_menu
+    run_menu()
+    return 0
@@ -0,0 +1,662 @@
+"""Режимы генерации аудио: параллельный, батчами, адаптивный, асинхронный и фразами"""
+
+import asyncio
+import collections
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .cache import SOURCE_CACHE, SOURCE_COALESCED, SOURCE_FAILED, SOURCE_GENERATED
+from .phrases import group_phrases, make_phrase_text, split_phrase_audio
+from .synthesis import DEFAULT_SYNTHESIZER, ResilientSynthesizer
+from .tracing import TRACER
+
+class GenerationStats:
+    """Потокобезопасная статистика одного запуска генерации
+
+    window - сколько последних задержек хранить для перцентилей (None - все);
+    нужно долгоживущим процессам вроде сервера.
+    """
+    
+    def __init__(self, window=None):
+        self.lock = threading.Lock()
+        self.latencies = collections.deque(maxlen=window) if window else []
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.generated = 0
+        self.failed = 0
+        self.recovered = 0
+    
+    def record(self, latency, source=SOURCE_GENERATED):
+        """Учитывает результат обработки одного слова
+
+        source: SOURCE_CACHE - из кэша, SOURCE_COALESCED - дождались синтеза,
+        начатого другим потоком, SOURCE_GENERATED - новый синтез,
+        SOURCE_FAILED - ошибка.
+        """
+        TRACER.count(f"words_{source}")
+        with self.lock:
+            self.latencies.append(latency)
+            if source == SOURCE_CACHE:
+                self.cache_hits += 1
+            elif source == SOURCE_COALESCED:
+                self.coalesced += 1
+            elif source == SOURCE_FAILED:
+                self.failed += 1
+            else:
+                self.generated += 1
+    
+    def record_recovery(self, source):
+        """Слово, ранее учтенное как ошибка, получено при повторной попытке"""
+        with self.lock:
+            self.failed -= 1
+            self.recovered += 1
+            if source == SOURCE_CACHE:
+                self.cache_hits += 1
+            elif source == SOURCE_COALESCED:
+                self.coalesced += 1
+            else:
+                self.generated += 1
+    
+    def percentile(self, percent):
+        """Перцентиль задержки на слово (метод ближайшего ранга), в секундах"""
+        with self.lock:
+            values = sorted(self.latencies)
+        if not values:
+            return 0.0
+        rank = max(1, math.ceil(percent / 100 * len(values)))
+        return values[rank - 1]
+    
+    def hit_ratio(self):
+        total = self.cache_hits + self.coalesced + self.generated + self.failed
+        return self.cache_hits / total if total else 0.0
+    
+    def summary(self):
+        """Строка итоговой статистики"""
+        text = f"{self.cache_hits} из кэша, {self.coalesced} объединено, {self.generated} сгенерировано"
+        if self.recovered:
+            text += f" (со второго круга: {self.recovered})"
+        return text + (f", {self.failed} ошибок" if self.failed else "")
+
+def generate_single_audio(word, language='ru', slow=False, cache=None, synthesizer=None, stats=None):
+    """Генерирует аудио для одного слова с использованием кэша
+
+    Возвращает (аудио, слово, успех, источник), источник - одна из констант SOURCE_*.
+    """
+    synthesizer = synthesizer or DEFAULT_SYNTHESIZER
+    start = time.perf_counter()
+    
+    def synthesize():
+        with TRACER.span('synthesize', word=word):
+            return synthesizer.synthesize(word, language, slow)
+    
+    try:
+        if cache:
+            # Кэш сам объединяет одновременные запросы одного слова
+            audio, source = cache.get_or_generate(word, synthesize, language, slow)
+        else:
+            audio, source = memoryview(synthesize()), SOURCE_GENERATED
+        
+        if stats:
+            stats.record(time.perf_counter() - start, source)
+        return audio, word, True, source
+    except Exception as e:
+        print(f"❌ Ошибка генерации для '{word}': {e}")
+        if stats:
+            stats.record(time.perf_counter() - start, SOURCE_FAILED)
+        return None, word, False, SOURCE_FAILED
+
+SOURCE_LABELS = {
+    SOURCE_CACHE: "✓ КЭШ",
+    SOURCE_COALESCED: "✓ ОБЪЕДИНЕНО",
+    SOURCE_GENERATED: "✓ ГЕНЕРАЦИЯ",
+}
+
+def generate_audio_parallel(words, language='ru', speed_factor=1.0, max_workers=5, cache=None, synthesizer=None, stats=None):
+    """Параллельная генерация аудио с кэшированием"""
+    print(f"🔄 Параллельная генерация {len(words)} слов...")
+    print(f"📊 Потоков: {max_workers}, скорость: {speed_factor}x")
+    
+    audio_data = [None] * len(words)
+    slow_mode = speed_factor < 0.8
+    stats = stats or GenerationStats()
+    total_words = len(words)
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        future_to_index = {
+            executor.submit(TRACER.queued(generate_single_audio, word=word),
+                            word, language, slow_mode, cache, synthesizer, stats): i 
+            for i, word in enumerate(words)
+        }
+        
+        completed = 0
+        for future in as_completed(future_to_index):
+            i = future_to_index[future]
+            try:
+                audio_buffer, word, success, source = future.result()
+                if success:
+                    audio_data[i] = audio_buffer
+                    completed += 1
+                    print(f"{SOURCE_LABELS[source]}: {word} ({completed}/{total_words})")
+                else:
+                    print(f"✗ ОШИБКА: {word}")
+            except Exception as e:
+                print(f"✗ ИСКЛЮЧЕНИЕ: {words[i]} - {e}")
+    
+    print(f"📈 Статистика: {stats.summary()}")
+    return audio_data
+
+def generate_audio_batch(words, language='ru', speed_factor=1.0, batch_size=3, cache=None, synthesizer=None, stats=None):
+    """Генерация аудио батчами с кэшированием"""
+    print(f"🔄 Батч-генерация {len(words)} слов...")
+    print(f"📦 Размер батча: {batch_size}, скорость: {speed_factor}x")
+    
+    audio_data = []
+    slow_mode = speed_factor < 0.8
+    total_batches = (len(words) + batch_size - 1) // batch_size
+    stats = stats or GenerationStats()
+    
+    for batch_num in range(total_batches):
+        start_idx = batch_num * batch_size
+        end_idx = min((batch_num + 1) * batch_size, len(words))
+        batch_words = words[start_idx:end_idx]
+        
+        print(f"📦 Батч {batch_num + 1}/{total_batches}: {', '.join(batch_words)}")
+        
+        threads = []
+        batch_results = [None] * len(batch_words)
+        batch_sources = [SOURCE_FAILED] * len(batch_words)
+        
+        def generate_batch_word(idx, word):
+            audio_buffer, _, _, source = generate_single_audio(
+                word, language, slow_mode, cache, synthesizer, stats
+            )
+            batch_results[idx] = audio_buffer
+            batch_sources[idx] = source
+        
+        # Запускаем потоки для батча
+        for i, word in enumerate(batch_words):
+            thread = threading.Thread(target=generate_batch_word, args=(i, word))
+            threads.append(thread)
+            thread.start()
+        
+        # Ждем завершения
+        for thread in threads:
+            thread.join()
+        
+        # Считаем попадания в кэш
+        batch_cache_hits = batch_sources.count(SOURCE_CACHE)
+        print(f"   📊 Батч {batch_num + 1}: {batch_cache_hits}/{len(batch_words)} из кэша")
+        
+        audio_data.extend(batch_results)
+    
+    print(f"📈 Итог: {stats.summary()}")
+    return audio_data
+
+def generate_audio_phrases(words, language='ru', speed_factor=1.0, phrase_size=10, max_workers=4,
+                           cache=None, synthesizer=None, stats=None):
+    """Генерация фразами: один запрос синтеза на phrase_size слов
+
+    Аудио фразы режется по паузам на клипы слов, каждый клип сохраняется в
+    кэше под обычным ключом слова. Фраза, которую не удалось уверенно
+    разрезать, синтезируется по одному слову.
+    """
+    synthesizer = synthesizer or DEFAULT_SYNTHESIZER
+    print(f"🔄 Генерация фразами {len(words)} слов...")
+    print(f"📊 Слов во фразе: до {phrase_size}, потоков: {max_workers}, скорость: {speed_factor}x")
+    
+    audio_data = [None] * len(words)
+    slow_mode = speed_factor < 0.8
+    stats = stats or GenerationStats()
+    progress = {'completed': 0, 'requests': 0, 'split': 0, 'single': 0}
+    progress_lock = threading.Lock()
+    
+    def report(i, audio, source, started, finished=None):
+        # Задержка слова считается от начала его запроса, как в остальных режимах
+        stats.record((finished or time.perf_counter()) - started, source)
+        with progress_lock:
+            if audio is None:
+                print(f"✗ ОШИБКА: {words[i]}")
+                return
+            audio_data[i] = audio
+            progress['completed'] += 1
+            print(f"{SOURCE_LABELS[source]}: {words[i]} ({progress['completed']}/{len(words)})")
+    
+    # Кэш и объединение с уже идущим синтезом - как в остальных режимах
+    claims = {}
+    waiting = {}  # номер слова -> (Future чужого синтеза, начало ожидания)
+    finished = {}  # номер слова -> момент, когда чужой синтез завершился
+    misses = []
+    
+    def synthesize(text):
+        with progress_lock:
+            progress['requests'] += 1
+        with TRACER.span('synthesize', word=text):
+            return synthesizer.synthesize(text, language, slow_mode)
+    
+    def synthesize_phrase(indices):
+        clips = None
+        phrase_started = time.perf_counter()
+        if len(indices) > 1:
+            try:
+                phrase_audio = synthesize(make_phrase_text([words[i] for i in indices]))
+                with TRACER.span('split_phrase'):
+                    clips = split_phrase_audio(phrase_audio, len(indices))
+                if clips is None:
+                    print(f"⚠️ Фразу из {len(indices)} слов не удалось разрезать, слова пойдут по одному")
+            except Exception as e:
+                print(f"⚠️ Ошибка синтеза фразы: {e}, слова пойдут по одному")
+        with progress_lock:
+            if clips:
+                progress['split'] += 1
+            else:
+                progress['single'] += len(indices)
+        
+        for n, i in enumerate(indices):
+            audio, error = None, None
+            started = phrase_started if clips else time.perf_counter()
+            try:
+                audio = clips[n] if clips else synthesize(words[i])
+            except Exception as e:
+                error = e
+            claim = claims.pop(i, None)
+            if claim is not None:
+                cache.complete(*claim, audio, error)
+            report(i, memoryview(audio) if audio is not None else None,
+                   SOURCE_GENERATED if audio is not None else SOURCE_FAILED, started)
+    
+    try:
+        for i, word in enumerate(words):
+            if cache:
+                started = time.perf_counter()
+                key, audio, future, owner = cache.claim(word, language, slow_mode)
+                if audio is not None:
+                    report(i, audio, SOURCE_CACHE, started)
+                    continue
+                if not owner:
+                    waiting[i] = (future, started)
+                    future.add_done_callback(lambda _, i=i: finished.setdefault(i, time.perf_counter()))
+                    continue
+                claims[i] = (key, future)
+            misses.append(i)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(synthesize_phrase, indices)
+                       for indices in group_phrases(misses, words, phrase_size)]
+            for future in as_completed(futures):
+                future.result()
+    finally:
+        # Слова, синтез которых не состоялся: ожидающие их не должны зависнуть
+        for i in list(claims):
+            claim = claims.pop(i, None)
+            if claim is not None:
+                cache.complete(*claim, error=RuntimeError(f"синтез фразы со словом '{words[i]}' прерван"))
+    
+    for i, (future, started) in waiting.items():
+        try:
+            audio = memoryview(future.result())
+            report(i, audio, SOURCE_COALESCED, started, finished.get(i))
+        except Exception:
+            report(i, None, SOURCE_FAILED, started, finished.get(i))
+    
+    print(f"📈 Статистика: {stats.summary()}")
+    if misses:
+        print(f"🧩 Запросов синтеза: {progress['requests']} на {len(misses)} слов "
+              f"(фраз разрезано: {progress['split']}, слов по одному: {progress['single']})")
+    return audio_data
+
+class AdaptiveConcurrency:
+    """AIMD-регулятор числа одновременных запросов синтеза
+
+    Запросы считаются окнами размером с текущий лимит. По итогам окна лимит
+    растет, если ошибок нет и задержка не выросла (сначала удваивается, как
+    "медленный старт" TCP, после первого снижения - по одному), и
+    уменьшается вдвое при ошибках или росте медианной задержки в
+    latency_tolerance раз относительно лучшей наблюдавшейся - признаках
+    перегрузки или троттлинга. Запросы, начатые до смены лимита, в новое
+    окно не попадают.
+    
+    Лимит колеблется "пилой" между половиной и уровнем, на котором начинается
+    перегрузка; рабочая точка - 3/4 от средней вершины пилы. Она сохраняется
+    как стартовый лимит для следующего запуска.
+    """
+    
+    MIN_WINDOW = 4
+    
+    def __init__(self, initial=4, minimum=1, maximum=64, error_threshold=0.1, latency_tolerance=1.5,
+                 slow_start=True):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(self.maximum, max(self.minimum, initial))
+        self.error_threshold = error_threshold
+        self.latency_tolerance = latency_tolerance
+        self.slow_start = slow_start
+        self.epoch = 0  # номер текущего значения лимита
+        self.in_flight = 0
+        self.window = []  # (задержка, успех) запросов к синтезатору
+        self.window_completed = 0  # для пропускной способности учитываются все запросы
+        self.window_start = time.perf_counter()
+        self.base_latency = None
+        self.windows = 0
+        self.ceilings = []  # лимиты, на которых наступала перегрузка
+        self.condition = threading.Condition()
+    
+    def acquire(self):
+        """Ждет свободного места в пределах текущего лимита, возвращает номер лимита"""
+        with self.condition:
+            while self.in_flight >= self.limit:
+                self.condition.wait()
+            self.in_flight += 1
+            return self.epoch
+    
+    def release(self, epoch, latency=None, success=True):
+        """Освобождает место; latency=None - запрос не дошел до синтезатора (кэш)"""
+        with self.condition:
+            self.in_flight -= 1
+            if latency is not None:
+                self.window_completed += 1
+            if latency is not None and epoch == self.epoch:
+                self.window.append((latency, success))
+                if len(self.window) >= max(self.limit, self.MIN_WINDOW):
+                    self._adjust()
+            self.condition.notify_all()
+    
+    def optimum(self):
+        """Рабочая точка: стартовый лимит для следующего запуска"""
+        with self.condition:
+            if not self.ceilings:
+                return self.limit
+            average = sum(self.ceilings) / len(self.ceilings)
+            return min(self.maximum, max(self.minimum, round(average * 0.75)))
+    
+    def _adjust(self):
+        """Пересчитывает лимит по итогам окна (вызывается под блокировкой)"""
+        now = time.perf_counter()
+        elapsed = now - self.window_start
+        latencies = sorted(latency for latency, _ in self.window)
+        median = latencies[len(latencies) // 2]
+        error_rate = sum(1 for _, success in self.window if not success) / len(self.window)
+        throughput = self.window_completed / elapsed if elapsed > 0 else 0.0
+        self.window = []
+        self.window_completed = 0
+        self.window_start = now
+        self.windows += 1
+        
+        if self.base_latency is None or median < self.base_latency:
+            self.base_latency = median
+        
+        old_limit = self.limit
+        self.epoch += 1
+        if error_rate > self.error_threshold:
+            reason = f"ошибок {error_rate:.0%}"
+        elif median > self.base_latency * self.latency_tolerance:
+            reason = f"задержка {median * 1000:.0f} мс"
+        else:
+            step = self.limit if self.slow_start else 1
+            self.limit = min(self.maximum, self.limit + step)
+            if self.limit != old_limit:
+                print(f"📈 Параллелизм: {old_limit} → {self.limit} ({throughput:.1f} слов/с)")
+            return
+        
+        self.slow_start = False
+        self.ceilings.append(self.limit)
+        self.limit = max(self.minimum, self.limit // 2)
+        if self.limit != old_limit:
+            print(f"📉 Параллелизм: {old_limit} → {self.limit} ({reason})")
+
+def generate_audio_adaptive(words, language='ru', speed_factor=1.0, controller=None,
+                            cache=None, synthesizer=None, stats=None):
+    """Параллельная генерация с подстройкой числа одновременных запросов"""
+    controller = controller or AdaptiveConcurrency()
+    print(f"🔄 Адаптивная генерация {len(words)} слов...")
+    print(f"📊 Начальный параллелизм: {controller.limit} (предел {controller.maximum}), скорость: {speed_factor}x")
+    
+    audio_data = [None] * len(words)
+    slow_mode = speed_factor < 0.8
+    stats = stats or GenerationStats()
+    
+    def generate_word(word):
+        with TRACER.span('queue_wait', word=word):
+            epoch = controller.acquire()
+        start = time.perf_counter()
+        result = (None, word, False, SOURCE_FAILED)
+        try:
+            result = generate_single_audio(word, language, slow_mode, cache, synthesizer, stats)
+            return result
+        finally:
+            # Попадания в кэш ничего не говорят о нагрузке на сервис
+            source = result[3]
+            informative = source in (SOURCE_GENERATED, SOURCE_FAILED)
+            controller.release(epoch, time.perf_counter() - start if informative else None, result[2])
+    
+    # Потоков с запасом до предела, реальный параллелизм ограничивает регулятор
+    with ThreadPoolExecutor(max_workers=controller.maximum) as executor:
+        future_to_index = {executor.submit(TRACER.queued(generate_word, word=word), word): i
+                           for i, word in enumerate(words)}
+        
+        completed = 0
+        for future in as_completed(future_to_index):
+            i = future_to_index[future]
+            try:
+                audio_buffer, word, success, source = future.result()
+                if success:
+                    audio_data[i] = audio_buffer
+                    completed += 1
+                    print(f"{SOURCE_LABELS[source]}: {word} ({completed}/{len(words)})")
+                else:
+                    print(f"✗ ОШИБКА: {word}")
+            except Exception as e:
+                print(f"✗ ИСКЛЮЧЕНИЕ: {words[i]} - {e}")
+    
+    print(f"📈 Статистика: {stats.summary()}")
+    if controller.windows:
+        print(f"🎛️ Рабочий параллелизм: {controller.optimum()} (станет стартовым в следующий раз)")
+    return audio_data
+
+class TokenBucket:
+    """Ограничитель частоты запросов (token bucket) для asyncio
+
+    rate - запросов в секунду (0 или меньше - без ограничения),
+    capacity - сколько запросов можно сделать "залпом".
+    """
+    
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+    
+    async def acquire(self):
+        """Ждет, пока в ведре появится токен, и забирает его"""
+        if self.rate <= 0:
+            return
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+async def generate_audio_async_tasks(words, language, slow_mode, max_concurrency,
+                                     requests_per_second, cache, synthesizer, stats):
+    """Корутины генерации: семафор ограничивает число запросов в полете"""
+    semaphore = asyncio.Semaphore(max_concurrency)
+    bucket = TokenBucket(requests_per_second)
+    audio_data = [None] * len(words)
+    progress = {'completed': 0}
+    
+    async def synthesize(word):
+        with TRACER.span('queue_wait', asynchronous=True, word=word):
+            await semaphore.acquire()
+        try:
+            with TRACER.span('rate_limit', asynchronous=True, word=word):
+                await bucket.acquire()
+            with TRACER.span('synthesize', asynchronous=True, word=word):
+                return await synthesizer.synthesize_async(word, language, slow_mode)
+        finally:
+            semaphore.release()
+    
+    async def generate_word(i, word):
+        start = time.perf_counter()
+        try:
+            if cache:
+                key, audio, future, owner = cache.claim(word, language, slow_mode)
+                if audio is not None:
+                    source = SOURCE_CACHE
+                elif not owner:
+                    audio = memoryview(await asyncio.wrap_future(future))
+                    source = SOURCE_COALESCED
+                else:
+                    try:
+                        audio_bytes = await synthesize(word)
+                    except Exception as e:
+                        cache.complete(key, future, error=e)
+                        raise
+                    cache.complete(key, future, audio_bytes)
+                    audio, source = memoryview(audio_bytes), SOURCE_GENERATED
+            else:
+                audio, source = memoryview(await synthesize(word)), SOURCE_GENERATED
+        except Exception as e:
+            stats.record(time.perf_counter() - start, SOURCE_FAILED)
+            print(f"✗ ОШИБКА: {word} - {e}")
+            return
+        
+        audio_data[i] = audio
+        progress['completed'] += 1
+        stats.record(time.perf_counter() - start, source)
+        print(f"{SOURCE_LABELS[source]}: {word} ({progress['completed']}/{len(words)})")
+    
+    await asyncio.gather(*(generate_word(i, word) for i, word in enumerate(words)))
+    return audio_data
+
+def generate_audio_async(words, language='ru', speed_factor=1.0, max_concurrency=32,
+                         requests_per_second=10.0, cache=None, synthesizer=None, stats=None):
+    """Асинхронная генерация аудио с ограничением параллелизма и частоты запросов"""
+    synthesizer = synthesizer or DEFAULT_SYNTHESIZER
+    rate_text = f"{requests_per_second} запр/с" if requests_per_second > 0 else "без лимита"
+    print(f"🔄 Асинхронная генерация {len(words)} слов...")
+    print(f"📊 Одновременных запросов: {max_concurrency}, частота: {rate_text}, скорость: {speed_factor}x")
+    
+    slow_mode = speed_factor < 0.8
+    stats = stats or GenerationStats()
+    audio_data = asyncio.run(generate_audio_async_tasks(
+        words, language, slow_mode, max_concurrency, requests_per_second,
+        cache, synthesizer, stats
+    ))
+    
+    print(f"📈 Статистика: {stats.summary()}")
+    return audio_data
+
+def get_optimization_settings(word_count, settings_manager):
+    """Число потоков и размер батча с учетом сохраненных значений
+
+    В адаптивном режиме используется параллелизм, выученный в прошлых запусках.
+    """
+    max_workers = settings_manager.get('max_workers')
+    if settings_manager.get('generation_mode') == 3 and settings_manager.get('adaptive_concurrency'):
+        max_workers = settings_manager.get('adaptive_concurrency')
+    return max(1, min(max_workers, word_count)), settings_manager.get('batch_size')
+
+def requeue_failed_words(words, audio_data, language='ru', speed_factor=1.0,
+                         cache=None, synthesizer=None, stats=None):
+    """Второй круг для слов, которые не удалось получить: по одному, в конце запуска
+
+    К этому моменту временный сбой сервиса обычно проходит, а размыкатель цепи
+    синтезатора не даст засыпать сервис запросами, если он все еще недоступен.
+    """
+    failed = [i for i, audio in enumerate(audio_data) if audio is None]
+    if not failed:
+        return audio_data
+    
+    print(f"🔁 Повторная попытка для {len(failed)} слов в конце запуска...")
+    slow_mode = speed_factor < 0.8
+    for i in failed:
+        audio, word, success, source = generate_single_audio(
+            words[i], language, slow_mode, cache, synthesizer
+        )
+        if success:
+            audio_data[i] = audio
+            if stats:
+                stats.record_recovery(source)
+            print(f"{SOURCE_LABELS[source]}: {word} (со второго круга)")
+        else:
+            print(f"✗ ОШИБКА: {word} - пропускается")
+    return audio_data
+
+def generate_audio(words, generation_mode, language='ru', speed_factor=1.0, max_workers=4,
+                   batch_size=3, cache=None, synthesizer=None, stats=None,
+                   max_concurrency=32, requests_per_second=10.0, controller=None, phrase_size=10):
+    """Генерация аудио выбранным режимом (1-параллельный, 2-батчи, 3-адаптивный, 4-асинхронный, 5-фразами)
+
+    Слова, не полученные с первого раза, повторяются в конце запуска.
+    """
+    stats = stats or GenerationStats()
+    audio_data = generate_audio_by_mode(
+        words, generation_mode, language, speed_factor, max_workers, batch_size,
+        cache, synthesizer, stats, max_concurrency, requests_per_second, controller, phrase_size
+    )
+    if stats.failed:
+        requeue_failed_words(words, audio_data, language, speed_factor, cache, synthesizer, stats)
+        print(f"📈 Итог после повтора: {stats.summary()}")
+    if isinstance(synthesizer, ResilientSynthesizer):
+        print(f"🛡️ Устойчивость синтеза: {synthesizer.summary()}")
+    return audio_data
+
+def generate_audio_by_mode(words, generation_mode, language, speed_factor, max_workers, batch_size,
+                           cache, synthesizer, stats, max_concurrency, requests_per_second,
+                           controller=None, phrase_size=10):
+    if generation_mode == 4:
+        return generate_audio_async(
+            words,
+            speed_factor=speed_factor,
+            max_concurrency=max_concurrency,
+            requests_per_second=requests_per_second,
+            language=language,
+            cache=cache,
+            synthesizer=synthesizer,
+            stats=stats
+        )
+    if generation_mode == 5:
+        return generate_audio_phrases(
+            words,
+            speed_factor=speed_factor,
+            phrase_size=phrase_size,
+            max_workers=max_workers,
+            language=language,
+            cache=cache,
+            synthesizer=synthesizer,
+            stats=stats
+        )
+    if generation_mode not in (1, 2):
+        return generate_audio_adaptive(
+            words,
+            speed_factor=speed_factor,
+            controller=controller or AdaptiveConcurrency(initial=max_workers, maximum=max_concurrency),
+            language=language,
+            cache=cache,
+            synthesizer=synthesizer,
+            stats=stats
+        )
+    
+    if generation_mode == 2:
+        return generate_audio_batch(
+            words, 
+            speed_factor=speed_factor, 
+            batch_size=batch_size, 
+            language=language,
+            cache=cache,
+            synthesizer=synthesizer,
+            stats=stats
+        )
+    return generate_audio_parallel(
+        words, 
+        speed_factor=speed_factor, 
+        max_workers=max_workers, 
+        language=language,
+        cache=cache,
+        synthesizer=synthesizer,
+        stats=stats
+    )
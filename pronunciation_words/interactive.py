@@ -0,0 +1,298 @@
+"""Интерактивный режим: меню и диалог настроек"""
+
+import os
+import shutil
+
+from .generation import generate_audio
+from .session import play_session
+from .settings import SettingsManager
+from .tracing import TRACER
+from .words import deduplicate_words, expand_audio, print_deduplication_report, read_words_from_file
+
+def get_user_settings(settings_manager):
+    """Получает настройки от пользователя с возможностью использовать сохраненные"""
+    settings_manager.print_current_settings()
+    
+    print("\n⚙️ НАСТРОЙКИ ВОСПРОИЗВЕДЕНИЯ:")
+    print("1 - Использовать сохраненные настройки")
+    print("2 - Ввести новые настройки")
+    print("3 - Использовать сохраненные, но изменить паузу/скорость/порядок")
+    
+    choice = input("Выберите вариант (1-3): ").strip()
+    
+    if choice == "1":
+        # Используем сохраненные настройки без изменений
+        print("✅ Используются сохраненные настройки")
+        return
+    
+    # Запрос новых настроек
+    if choice == "3":
+        print("📝 Изменение паузы, скорости и порядка:")
+    
+    if choice != "3":
+        # Настройка паузы
+        print("\n⏱️ Пауза между словами:")
+        print("   0.0 - Без паузы")
+        print("   0.1 - Очень короткая")
+        print("   0.3 - Короткая (рекомендуется)")
+        print("   0.5 - Средняя")
+        print("   1.0 - Длинная")
+    
+    pause_input = input(f"Пауза в секундах [текущая: {settings_manager.get('pause_duration')}]: ").strip()
+    if pause_input:
+        settings_manager.set('pause_duration', float(pause_input))
+    
+    if choice != "3":
+        # Настройка скорости
+        print("\n🎯 Скорость произношения:")
+        print("   0.7 - Очень медленно")
+        print("   0.9 - Медленно")
+        print("   1.0 - Нормальная")
+        print("   1.2 - Быстро (рекомендуется)")
+        print("   1.5 - Очень быстро")
+    
+    speed_input = input(f"Скорость 0.5-2.0 [текущая: {settings_manager.get('speed_factor')}]: ").strip()
+    if speed_input:
+        speed = float(speed_input)
+        if 0.5 <= speed <= 2.0:
+            settings_manager.set('speed_factor', speed)
+        else:
+            print("❌ Скорость должна быть от 0.5 до 2.0, используется значение по умолчанию")
+    
+    # Настройка случайного порядка
+    print("\n🎲 Порядок воспроизведения:")
+    print("   1 - Случайный порядок (рекомендуется для обучения)")
+    print("   2 - Обычный порядок (как в файле)")
+    
+    order_input = input(f"Порядок [текущий: {'1' if settings_manager.get('random_order') else '2'}]: ").strip()
+    if order_input:
+        settings_manager.set('random_order', order_input == "1")
+    
+    if choice != "3":
+        # Интервальное повторение
+        print("\n🧠 Интервальное повторение (только слова, срок повторения которых подошел):")
+        print("   1 - Включено")
+        print("   2 - Выключено (все слова файла)")
+        
+        review_input = input(f"Повторение [текущее: {'1' if settings_manager.get('spaced_repetition') else '2'}]: ").strip()
+        if review_input:
+            settings_manager.set('spaced_repetition', review_input == "1")
+        if settings_manager.get('spaced_repetition'):
+            new_input = input(f"Новых слов за сессию [текущее: {settings_manager.get('review_new_words')}]: ").strip()
+            if new_input:
+                settings_manager.set('review_new_words', int(new_input))
+    
+    if choice != "3":
+        # Потоковое воспроизведение
+        print("\n🌊 Потоковое воспроизведение (звук начинается до окончания генерации):")
+        print("   1 - Включено")
+        print("   2 - Выключено")
+        
+        streaming_input = input(f"Потоковый режим [текущий: {'1' if settings_manager.get('streaming_playback') else '2'}]: ").strip()
+        if streaming_input:
+            settings_manager.set('streaming_playback', streaming_input == "1")
+        if settings_manager.get('streaming_playback'):
+            prefetch_input = input(f"Упреждение, слов [текущее: {settings_manager.get('prefetch')}]: ").strip()
+            if prefetch_input:
+                settings_manager.set('prefetch', int(prefetch_input))
+        else:
+            # Сведение сессии в один поток
+            print("\n🎛️ Сведение без пробелов (тишина обрезается, паузы точные):")
+            print("   1 - Включено")
+            print("   2 - Выключено")
+            
+            premixed_input = input(f"Сведение [текущее: {'1' if settings_manager.get('premixed_playback') else '2'}]: ").strip()
+            if premixed_input:
+                settings_manager.set('premixed_playback', premixed_input == "1")
+            if settings_manager.get('premixed_playback'):
+                export_input = input(f"Сохранить сессию в WAV-файл, '-' - не сохранять [текущий: {settings_manager.get('export_file') or 'нет'}]: ").strip()
+                if export_input:
+                    settings_manager.set('export_file', '' if export_input == '-' else export_input)
+    
+    if choice != "3":
+        # Выбор режима генерации
+        print("\n🎛️ РЕЖИМ ГЕНЕРАЦИИ:")
+        print("1 - Параллельный (скорость)")
+        print("2 - Батчами (стабильность)")
+        print("3 - Адаптивный (подбирает число потоков сам)")
+        print("4 - Асинхронный (большие списки)")
+        print("5 - Фразами (много слов за один запрос)")
+        
+        mode_input = input(f"Режим [текущий: {settings_manager.get('generation_mode')}]: ").strip()
+        if mode_input:
+            settings_manager.set('generation_mode', int(mode_input))
+        
+        # Дополнительные настройки в зависимости от режима
+        if settings_manager.get('generation_mode') == 1:
+            workers_input = input(f"Количество потоков [текущее: {settings_manager.get('max_workers')}]: ").strip()
+            if workers_input:
+                settings_manager.set('max_workers', int(workers_input))
+        elif settings_manager.get('generation_mode') == 2:
+            batch_input = input(f"Размер батча [текущий: {settings_manager.get('batch_size')}]: ").strip()
+            if batch_input:
+                settings_manager.set('batch_size', int(batch_input))
+        elif settings_manager.get('generation_mode') == 4:
+            concurrency_input = input(f"Одновременных запросов [текущее: {settings_manager.get('max_concurrency')}]: ").strip()
+            if concurrency_input:
+                settings_manager.set('max_concurrency', int(concurrency_input))
+            rate_input = input(f"Запросов в секунду, 0 - без лимита [текущее: {settings_manager.get('requests_per_second')}]: ").strip()
+            if rate_input:
+                settings_manager.set('requests_per_second', float(rate_input))
+        elif settings_manager.get('generation_mode') == 5:
+            phrase_input = input(f"Слов во фразе [текущее: {settings_manager.get('phrase_size')}]: ").strip()
+            if phrase_input:
+                settings_manager.set('phrase_size', int(phrase_input))
+        
+        # Замеры по операциям: кэш, синтез, декодирование, воспроизведение
+        print("\n⏱️ Трассировка (сводка по операциям в конце запуска):")
+        print("   1 - Включена")
+        print("   2 - Выключена")
+        
+        trace_input = input(f"Трассировка [текущее: {'1' if settings_manager.get('trace') else '2'}]: ").strip()
+        if trace_input:
+            settings_manager.set('trace', trace_input == "1")
+        if settings_manager.get('trace'):
+            trace_file_input = input(f"Файл трассы (*.json - Chrome, *.jsonl - JSON Lines), '-' - не сохранять [текущий: {settings_manager.get('trace_file') or 'нет'}]: ").strip()
+            if trace_file_input:
+                settings_manager.set('trace_file', '' if trace_file_input == '-' else trace_file_input)
+
+def main_optimized_with_cache_and_settings():
+    """Основная функция с кэшированием и настройками"""
+    # Инициализируем менеджеры
+    settings_manager = SettingsManager()
+    cache = settings_manager.create_audio_cache()
+    pcm_cache = settings_manager.create_pcm_cache()
+    
+    filename = "listen.txt"
+    
+    if not os.path.exists(filename):
+        print(f"❌ Файл {filename} не найден!")
+        print("📝 Создайте файл listen.txt со словами (каждое слово на новой строке)")
+        return
+    
+    words = read_words_from_file(filename)
+    if not words:
+        print("❌ Не удалось прочитать слова из файла")
+        return
+    
+    print(f"📖 Загружено {len(words)} слов")
+    print("📝 Слова:", ", ".join(words[:10]) + ("..." if len(words) > 10 else ""))
+    
+    # Получаем настройки от пользователя
+    get_user_settings(settings_manager)
+    
+    # Показываем финальные настройки
+    settings_manager.print_current_settings()
+    
+    play_session(settings_manager, words, cache, pcm_cache)
+
+def clear_all_data():
+    """Очистка всех данных"""
+    # Очистка кэша
+    cache_files = ['audio_cache.pkl', 'audio_cache.seg', 'audio_cache.idx', 'audio_cache.usage.json',
+                   'audio_cache.seg.v1', 'audio_cache.idx.v1']
+    for cache_file in cache_files:
+        if os.path.exists(cache_file):
+            os.remove(cache_file)
+            print(f"🧹 Кэш {cache_file} очищен")
+    if os.path.isdir('warm_shards'):
+        shutil.rmtree('warm_shards', ignore_errors=True)
+    if os.path.exists('warm_checkpoint.json'):
+        os.remove('warm_checkpoint.json')
+    if os.path.isdir('pcm_cache'):
+        shutil.rmtree('pcm_cache', ignore_errors=True)
+        print("🧹 PCM-кэш pcm_cache очищен")
+    # Манифест наблюдения и состояние повторения описывают удаляемые слова и их аудио
+    for state_file in ('watch_manifest.json', 'review_state.json'):
+        if os.path.exists(state_file):
+            os.remove(state_file)
+            print(f"🧹 Файл {state_file} удален")
+    
+    # Очистка настроек
+    settings_file = 'tts_settings.json'
+    if os.path.exists(settings_file):
+        os.remove(settings_file)
+        print(f"🧹 Настройки {settings_file} очищены")
+
+def show_settings_info():
+    """Показывает текущие настройки"""
+    settings_manager = SettingsManager()
+    settings_manager.print_current_settings()
+
+def quick_start():
+    """Быстрый запуск с сохраненными настройками"""
+    from .playback import play_words_optimized
+    
+    settings_manager = SettingsManager()
+    cache = settings_manager.create_audio_cache()
+    pcm_cache = settings_manager.create_pcm_cache()
+    words = read_words_from_file("listen.txt")
+    if words:
+        print("⚡ Быстрый запуск с сохраненными настройками")
+        settings_manager.print_current_settings()
+        if settings_manager.get('trace'):
+            TRACER.enable()
+        
+        unique_words, index_map = deduplicate_words(words)
+        print_deduplication_report(
+            words, unique_words, index_map, cache,
+            settings_manager.get('language'), settings_manager.get('speed_factor') < 0.8
+        )
+        words = [unique_words[i] for i in index_map]
+        audio_data = expand_audio(generate_audio(
+            unique_words,
+            1,
+            speed_factor=settings_manager.get('speed_factor'), 
+            max_workers=settings_manager.get('max_workers'), 
+            language=settings_manager.get('language'),
+            cache=cache,
+            synthesizer=settings_manager.create_synthesizer()
+        ), index_map)
+        play_words_optimized(
+            audio_data, 
+            words, 
+            settings_manager.get('pause_duration'), 
+            settings_manager.get('speed_factor'),
+            settings_manager.get('random_order'),  # Добавляем параметр случайного порядка
+            language=settings_manager.get('language'),
+            pcm_cache=pcm_cache,
+            loudness_target=settings_manager.get_loudness_target()
+        )
+        settings_manager.save_settings()
+        cache.save_cache()
+        if pcm_cache:
+            pcm_cache.save()
+        TRACER.report(settings_manager.get('trace_file'))
+
+def run_menu():
+    """Интерактивное меню (запуск без параметров)"""
+    print("🚀 УСКОРЕННОЕ АУДИО ВОСПРОИЗВЕДЕНИЕ С СОХРАНЕНИЕМ НАСТРОЕК")
+    print("=" * 65)
+    
+    print("\n🎮 РЕЖИМЫ:")
+    print("1 - Основной режим (с настройками)")
+    print("2 - Быстрый запуск с сохраненными настройками")
+    print("3 - Просмотр текущих настроек")
+    print("4 - Очистка всех данных (кэш + настройки)")
+    print("5 - Тест скорости")
+    print("6 - Статистика кэша")
+    
+    choice = input("Выберите режим (1-6): ").strip()
+    
+    if choice == "2":
+        quick_start()
+    elif choice == "3":
+        show_settings_info()
+    elif choice == "4":
+        clear_all_data()
+    elif choice == "5":
+        # Тест скорости на имитации TTS (не зависит от сети)
+        words = read_words_from_file("listen.txt")
+        if words:
+            from .benchmark import run_benchmark
+            run_benchmark(words)
+    elif choice == "6":
+        SettingsManager().create_audio_cache().print_stats()
+    else:
+        main_optimized_with_cache_and_settings()
+
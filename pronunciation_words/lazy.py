@@ -0,0 +1,175 @@
+"""Ленивая сессия для очень больших списков слов
+
+Сессия хранит не аудио, а компактные записи со ссылками на байтовые
+диапазоны сегментного файла кэша. Аудио читается, синтезируется и
+декодируется только для скользящего окна ближайших слов, а воспроизведенные
+звуки сразу освобождаются, поэтому память не зависит от длины списка.
+"""
+
+import array
+import queue
+import threading
+import time
+
+import pygame
+
+from .cache import SOURCE_CACHE, make_cache_label
+from .generation import generate_single_audio
+from .playback import SoundBank, get_playback_order, get_stretch_factor, play_sound
+from .synthesis import ResilientSynthesizer
+from .tracing import TRACER
+from .words import deduplicate_words
+
+class SessionEntry:
+    """Слово сессии и место его аудио в сегменте кэша (key None - еще не в сегменте)"""
+    
+    __slots__ = ('word', 'key', 'offset', 'length', 'flags')
+    
+    def __init__(self, word, location=None):
+        self.word = word
+        self.set_location(location)
+    
+    def set_location(self, location):
+        self.key, self.offset, self.length, self.flags = location or (None, 0, 0, 0)
+
+class LazySession:
+    """Список слов сессии без аудио в памяти
+
+    Повторы слов хранятся одной записью, порядок - компактным массивом
+    номеров. Слова, которых нет в кэше, синтезируются при первом обращении;
+    новые записи сохраняются на диск каждые save_every слов, чтобы не
+    копиться в памяти кэша. Слова из пакета pack читаются из него: клип
+    пакета - тоже срез отображенного файла.
+    """
+    
+    def __init__(self, words, cache, language='ru', slow=False, synthesizer=None, save_every=200, pack=None):
+        unique_words, index_map = deduplicate_words(words)
+        self.cache = cache
+        self.language = language
+        self.slow = slow
+        self.synthesizer = synthesizer
+        self.save_every = save_every
+        self.pack = pack
+        with TRACER.span('lazy_session'):
+            # Составление сессии - не обращение к словам: статистику кэша
+            # пополняют только чтение и синтез в load()
+            self.entries = [SessionEntry(word, cache.locate(word, language, slow, record=False))
+                            for word in unique_words]
+        self.order = array.array('I', index_map)
+        self.cached = sum(entry.key is not None for entry in self.entries)
+        self.packed = 0 if pack is None else sum(
+            pack.get(entry.word, language, slow) is not None for entry in self.entries
+        )
+        self.generated = 0
+        self.unsaved = 0
+        self.lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self.order)
+    
+    def word(self, position):
+        return self.entries[self.order[position]].word
+    
+    def load(self, position):
+        """Аудио слова на позиции position: чтение по ссылке или синтез"""
+        entry = self.entries[self.order[position]]
+        if self.pack is not None:
+            audio = self.pack.get(entry.word, self.language, self.slow)
+            if audio is not None:
+                return audio
+        if entry.key is not None:
+            audio = self.cache.read_range(entry.key, entry.offset, entry.length, entry.flags,
+                                          make_cache_label(entry.word, self.language, self.slow))
+            if audio is not None:
+                return audio
+        
+        audio, _, success, source = generate_single_audio(
+            entry.word, self.language, self.slow, self.cache, self.synthesizer
+        )
+        if not success:
+            return None
+        if source != SOURCE_CACHE:
+            with self.lock:
+                self.generated += 1
+                self.unsaved += 1
+                save = self.unsaved >= self.save_every
+                if save:
+                    self.unsaved = 0
+            if save:
+                self.cache.save_cache()
+        entry.set_location(self.cache.locate(entry.word, self.language, self.slow, record=False))
+        return audio
+
+def play_words_lazy(session, pause_duration=0.3, speed_factor=1.0, random_order=True, window=8,
+                    pcm_cache=None, loudness_target=None):
+    """Воспроизведение ленивой сессии: готовы только window ближайших слов
+
+    Фоновый поток читает или синтезирует аудио и декодирует его в порядке
+    воспроизведения, опережая его не более чем на window слов.
+    """
+    pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
+    pygame.mixer.set_num_channels(3)
+    
+    print(f"🎵 Ленивое воспроизведение {len(session)} слов "
+          f"({len(session.entries)} уникальных, {session.cached} в кэше"
+          + (f", {session.packed} в пакете" if session.pack is not None else "") + f", окно {window})...")
+    print(f"⏱️ Пауза: {pause_duration}с, скорость: {speed_factor}x")
+    print("-" * 60)
+    
+    playback_indices = array.array('I', get_playback_order(len(session), random_order))
+    sound_bank = SoundBank(session.language, session.slow, pcm_cache, get_stretch_factor(speed_factor),
+                           loudness_target, capacity=window)
+    ready_queue = queue.Queue(maxsize=max(1, window))
+    stop_event = threading.Event()
+    
+    def produce():
+        for position in playback_indices:
+            if stop_event.is_set():
+                return
+            word = session.word(position)
+            sound = None
+            try:
+                audio_buffer = session.load(position)
+                if audio_buffer is not None:
+                    sound = sound_bank.get_sound(word, audio_buffer)
+            except Exception as e:
+                print(f"❌ Ошибка подготовки '{word}': {e}")
+            while not stop_event.is_set():
+                try:
+                    ready_queue.put((word, sound), timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+    
+    producer = threading.Thread(target=produce, daemon=True)
+    start_time = time.time()
+    
+    try:
+        producer.start()
+        for play_index in range(1, len(playback_indices) + 1):
+            with TRACER.span('queue_wait'):
+                word, sound = ready_queue.get()
+            if sound is None:
+                print(f"⏭️ Пропуск {play_index}/{len(session)}: {word}")
+                continue
+            
+            print(f"{play_index}/{len(session)}: {word}")
+            try:
+                play_sound(sound, word)
+                if play_index < len(playback_indices):
+                    with TRACER.span('pause'):
+                        time.sleep(pause_duration)
+            except Exception as e:
+                print(f"❌ Ошибка воспроизведения '{word}': {e}")
+        
+        total_time = time.time() - start_time
+        print("-" * 60)
+        print(f"✅ Воспроизведение завершено за {total_time:.1f} секунд")
+        print(f"📊 Синтезировано во время сессии: {session.generated}, декодировано {sound_bank.decoded}, "
+              f"PCM из кэша {sound_bank.pcm_hits}")
+        if isinstance(session.synthesizer, ResilientSynthesizer):
+            print(f"🛡️ Устойчивость синтеза: {session.synthesizer.summary()}")
+    finally:
+        stop_event.set()
+        producer.join()
+        sound_bank.close()
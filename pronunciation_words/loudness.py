@@ -0,0 +1,53 @@
+"""Громкость клипов: измерение по озвученной части и выравнивание усилением
+
+Громкость - средняя энергия окон WINDOW с двумя порогами, как в EBU R128
+(без частотного взвешивания): абсолютный отбрасывает тишину, относительный -
+тихие хвосты звуков. Поэтому паузы по краям клипа и его длина на результат
+не влияют. Усиление ограничено MAX_GAIN и запасом до PEAK_CEILING, чтобы
+тихое слово не превратилось в шум, а громкое не перегрузилось.
+"""
+
+import math
+
+try:
+    import numpy as np
+except ImportError:  # Без NumPy громкость не выравнивается
+    np = None
+
+TARGET_LOUDNESS = -20.0  # дБ относительно полной шкалы
+MAX_GAIN = 12.0
+PEAK_CEILING = -1.0
+WINDOW = 0.05  # окно измерения, с
+ABSOLUTE_GATE = -60.0
+RELATIVE_GATE = -20.0
+
+def measure_loudness(samples, rate):
+    """Громкость клипа (int16, форма (кадры, каналы)) в дБ; None - если клип тихий"""
+    window = max(1, int(rate * WINDOW))
+    count = len(samples) // window
+    if count == 0:
+        return None
+
+    frames = samples[:count * window].astype(np.float64) / 32768
+    energy = (frames.reshape(count, -1) ** 2).mean(axis=1)
+    gated = energy[energy > 10 ** (ABSOLUTE_GATE / 10)]
+    if not len(gated):
+        return None
+    gated = gated[gated >= gated.mean() * 10 ** (RELATIVE_GATE / 10)]
+    return 10 * math.log10(gated.mean())
+
+def normalization_gain(samples, rate, target=TARGET_LOUDNESS):
+    """Усиление в дБ, приводящее клип к громкости target без перегрузки"""
+    loudness = measure_loudness(samples, rate)
+    if loudness is None:
+        return 0.0
+    gain = max(-MAX_GAIN, min(MAX_GAIN, target - loudness))
+    peak = int(np.abs(samples.astype(np.int32)).max())
+    if peak:
+        gain = min(gain, PEAK_CEILING - 20 * math.log10(peak / 32768))
+    return gain
+
+def apply_gain(samples, gain):
+    """Клип int16, усиленный на gain дБ"""
+    scaled = samples.astype(np.float32) * (10 ** (gain / 20))
+    return np.clip(scaled, -32768, 32767).astype(np.int16)
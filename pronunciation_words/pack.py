@@ -0,0 +1,143 @@
+"""Упаковка списка слов в один файл с таблицей смещений
+
+Пакет - заголовок, таблица записей (ключ слова, смещение, длина) и клипы
+подряд. Клипы ужаты без перекодирования: у MP3 отрезаются тег ID3 и
+кадры тишины по краям (с запасом в пару кадров на резервуар битов), у WAV -
+тишина по сэмплам; одинаковые клипы хранятся один раз. Файл открывается
+через mmap, и клип слова - срез памяти без отдельного файла и разбора.
+"""
+
+import hashlib
+import io
+import mmap
+import os
+import struct
+import wave
+
+from .cache import make_cache_key
+from .loudness import measure_loudness
+from .phrases import ANALYSIS_WINDOW, decode_pcm, iter_mp3_frames, window_levels
+
+TRIM_DB = -40.0  # тише этого уровня относительно пика - тишина по краям
+TRIM_MARGIN_FRAMES = 2
+TRIM_MARGIN = 0.02  # запас для WAV, с
+
+def voiced_bounds(levels):
+    """Первое и последнее озвученное окно или None для тихого клипа"""
+    voiced = [i for i, level in enumerate(levels or []) if level >= TRIM_DB]
+    if not voiced:
+        return None
+    return voiced[0], voiced[-1] + 1
+
+def trim_mp3(audio, pcm, rate, channels):
+    frames = list(iter_mp3_frames(audio))
+    bounds = voiced_bounds(window_levels(pcm, rate, channels))
+    if not frames or bounds is None:
+        return bytes(audio)
+    
+    _, _, samples, frame_rate = frames[0]
+    frame_duration = samples / frame_rate
+    first = max(0, int(bounds[0] * ANALYSIS_WINDOW / frame_duration) - TRIM_MARGIN_FRAMES)
+    last = min(len(frames), int(bounds[1] * ANALYSIS_WINDOW / frame_duration) + 1 + TRIM_MARGIN_FRAMES)
+    end_offset, end_length, _, _ = frames[last - 1]
+    return bytes(audio[frames[first][0]:end_offset + end_length])
+
+def trim_wav(audio):
+    with wave.open(io.BytesIO(bytes(audio)), 'rb') as wav_file:
+        params = wav_file.getparams()
+        pcm = wav_file.readframes(params.nframes)
+    if params.sampwidth != 2:
+        return bytes(audio)
+    bounds = voiced_bounds(window_levels(pcm, params.framerate, params.nchannels))
+    if bounds is None:
+        return bytes(audio)
+    
+    frame_bytes = params.sampwidth * params.nchannels
+    start = max(0, int((bounds[0] * ANALYSIS_WINDOW - TRIM_MARGIN) * params.framerate))
+    end = int((bounds[1] * ANALYSIS_WINDOW + TRIM_MARGIN) * params.framerate)
+    clip_buffer = io.BytesIO()
+    with wave.open(clip_buffer, 'wb') as clip_file:
+        clip_file.setparams(params)
+        clip_file.writeframes(pcm[start * frame_bytes:end * frame_bytes])
+    return clip_buffer.getvalue()
+
+def prepare_clip(audio):
+    """Ужатый клип и его громкость (дБ, None для тихого клипа)"""
+    import numpy as np
+    pcm, rate, channels = decode_pcm(audio)
+    loudness = measure_loudness(np.frombuffer(pcm, dtype=np.int16).reshape(-1, channels), rate)
+    if bytes(audio[:4]) == b'RIFF':
+        return trim_wav(audio), loudness
+    return trim_mp3(audio, pcm, rate, channels), loudness
+
+class AudioPack:
+    """Пакет клипов списка слов, открытый только для чтения"""
+    
+    MAGIC = b'PWPK'
+    # Громкость выравнивается при воспроизведении, в версии 2 она не хранится
+    VERSION = 2
+    HEADER = struct.Struct('<4sHHI')  # магия, версия, резерв, число записей
+    ENTRY = struct.Struct('<16sQI')  # ключ слова, смещение, длина
+    
+    def __init__(self, filename):
+        self.filename = filename
+        self.entries = {}  # ключ -> (смещение, длина)
+        with open(filename, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count = self.HEADER.unpack_from(self.data, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            self.data.close()
+            raise ValueError(f"{filename} - не пакет слов или неизвестная версия")
+        for number in range(count):
+            key, offset, length = self.ENTRY.unpack_from(self.data, self.HEADER.size + number * self.ENTRY.size)
+            self.entries[key] = (offset, length)
+    
+    def get(self, word, language='ru', slow=False):
+        """Клип слова как срез отображенного файла или None"""
+        entry = self.entries.get(bytes.fromhex(make_cache_key(word, language, slow)))
+        if entry is None:
+            return None
+        offset, length = entry
+        return memoryview(self.data)[offset:offset + length]
+    
+    def close(self):
+        self.entries.clear()
+        self.data.close()
+    
+    @classmethod
+    def write(cls, filename, words, audio_data, language='ru', slow=False):
+        """Записывает пакет; возвращает (байт исходных клипов, байт пакета, громкости)"""
+        table = []
+        payload = []
+        offsets = {}  # хеш клипа -> (смещение в данных, длина)
+        position = 0
+        original_bytes = 0
+        levels = []
+        for word, audio in zip(words, audio_data):
+            if audio is None:
+                continue
+            original_bytes += len(audio)
+            try:
+                clip, loudness = prepare_clip(audio)
+            except Exception as e:
+                print(f"⚠️ Клип '{word}' сохранен без обработки: {e}")
+                clip, loudness = bytes(audio), None
+            digest = hashlib.sha256(clip).digest()
+            if digest not in offsets:
+                offsets[digest] = (position, len(clip))
+                payload.append(clip)
+                position += len(clip)
+            table.append((bytes.fromhex(make_cache_key(word, language, slow)), *offsets[digest]))
+            if loudness is not None:
+                levels.append(loudness)
+        
+        data_start = cls.HEADER.size + len(table) * cls.ENTRY.size
+        temp_file = filename + '.tmp'
+        with open(temp_file, 'wb') as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, 0, len(table)))
+            for key, offset, length in table:
+                f.write(cls.ENTRY.pack(key, data_start + offset, length))
+            for clip in payload:
+                f.write(clip)
+        os.replace(temp_file, filename)
+        return original_bytes, os.path.getsize(filename), levels
@@ -0,0 +1,212 @@
+"""Синтез фразами: много слов за один запрос и разрезание аудио по паузам
+
+Слова соединяются через точку, поэтому синтезатор делает между ними
+отчетливую паузу. Полученное аудио режется по самым длинным паузам на столько
+клипов, сколько слов во фразе. MP3 режется по границам кадров без
+перекодирования (паузы находятся по декодированному звуку), WAV - по сэмплам.
+Если число пауз не сходится с числом слов, фраза считается неразрезаемой и
+слова синтезируются по одному.
+"""
+
+import io
+import math
+import os
+import threading
+import wave
+
+PHRASE_SEPARATOR = '. '
+# gTTS отправляет текст до 100 символов одним запросом, длиннее - режет сам
+PHRASE_MAX_CHARS = 100
+# Символы, дающие собственную паузу: такие слова во фразу не берутся
+PAUSE_CHARACTERS = '.,;:!?…'
+
+ANALYSIS_WINDOW = 0.01  # окно оценки уровня, с
+SILENCE_DB = -35.0      # тише этого уровня относительно максимума - пауза
+MIN_GAP = 0.15          # самая короткая пауза между словами, с
+GAP_RATIO = 1.5         # паузы между словами заметно длиннее пауз внутри слов
+
+# Битрейты Layer III (кбит/с) и частоты MPEG-1 / MPEG-2 / MPEG-2.5
+MP3_BITRATES = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+decode_lock = threading.Lock()
+
+def phrase_safe(word):
+    """Можно ли произнести слово внутри фразы, не сбив разрезание"""
+    return not any(char in word for char in PAUSE_CHARACTERS)
+
+def make_phrase_text(words):
+    return PHRASE_SEPARATOR.join(words)
+
+def group_phrases(items, words, phrase_size, max_chars=PHRASE_MAX_CHARS):
+    """Делит элементы на фразы не длиннее phrase_size слов и max_chars символов
+
+    items - индексы в words; слова со знаками препинания идут отдельными фразами.
+    """
+    phrases = []
+    current = []
+    length = 0
+    for item in items:
+        word = words[item]
+        if not phrase_safe(word):
+            phrases.append([item])
+            continue
+        added = len(word) + (len(PHRASE_SEPARATOR) if current else 0)
+        if current and (len(current) >= phrase_size or length + added > max_chars):
+            phrases.append(current)
+            current, length = [], 0
+            added = len(word)
+        current.append(item)
+        length += added
+    if current:
+        phrases.append(current)
+    return phrases
+
+def iter_mp3_frames(audio):
+    """Кадры MP3 Layer III: (смещение, длина, сэмплов в кадре, частота)
+
+    Тег ID3v2 в начале пропускается; разбор останавливается на первом
+    байте, не похожем на заголовок кадра.
+    """
+    data = bytes(audio)
+    offset = 0
+    if data[:3] == b'ID3' and len(data) >= 10:
+        size = (data[6] & 0x7f) << 21 | (data[7] & 0x7f) << 14 | (data[8] & 0x7f) << 7 | (data[9] & 0x7f)
+        offset = 10 + size
+    while offset + 4 <= len(data):
+        b1, b2 = data[offset + 1], data[offset + 2]
+        if data[offset] != 0xff or b1 & 0xe0 != 0xe0:
+            return
+        version = (b1 >> 3) & 3
+        layer = (b1 >> 1) & 3
+        bitrate_index = b2 >> 4
+        rate_index = (b2 >> 2) & 3
+        if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+            return
+        bitrate = MP3_BITRATES[1 if version == 3 else 2][bitrate_index] * 1000
+        rate = MP3_SAMPLE_RATES[version][rate_index]
+        samples = 1152 if version == 3 else 576
+        length = samples // 8 * bitrate // rate + ((b2 >> 1) & 1)
+        yield offset, length, samples, rate
+        offset += length
+
+def decode_pcm(audio):
+    """Декодирует MP3 в PCM микшера pygame: (сырые int16, частота, каналы)"""
+    import pygame
+    with decode_lock:
+        if not pygame.mixer.get_init():
+            try:
+                # Те же параметры, что и при воспроизведении: повторная инициализация не нужна
+                pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
+            except pygame.error:
+                # Без звукового устройства (сервер, прогрев) декодирование все равно работает
+                os.environ['SDL_AUDIODRIVER'] = 'dummy'
+                pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
+        rate, _, channels = pygame.mixer.get_init()
+        sound = pygame.mixer.Sound(file=io.BytesIO(bytes(audio)))
+        return sound.get_raw(), rate, channels
+
+def window_levels(pcm, rate, channels):
+    """Уровень каждого окна ANALYSIS_WINDOW в дБ относительно самого громкого"""
+    window = max(1, int(rate * ANALYSIS_WINDOW)) * channels
+    try:
+        import numpy as np
+        samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float64)
+        count = len(samples) // window
+        energy = (samples[:count * window].reshape(count, window) ** 2).mean(axis=1).tolist()
+    except ImportError:
+        import array
+        samples = array.array('h', pcm[:len(pcm) // 2 * 2])
+        energy = [sum(value * value for value in samples[start:start + window]) / window
+                  for start in range(0, len(samples) - window + 1, window)]
+    peak = max(energy, default=0)
+    if peak <= 0:
+        return None
+    return [10 * math.log10(value / peak) if value > 0 else -120.0 for value in energy]
+
+def find_cuts(levels, count):
+    """Моменты разрезов (в секундах) - середины count-1 самых длинных пауз
+
+    Возвращает None, если пауз меньше, чем нужно, или выбранные паузы не
+    отличаются уверенно от пауз внутри слов.
+    """
+    if not levels:
+        return None
+    voiced = [i for i, level in enumerate(levels) if level >= SILENCE_DB]
+    if not voiced:
+        return None
+    gaps = []
+    gap_start = None
+    for i in range(voiced[0], voiced[-1] + 1):
+        if levels[i] < SILENCE_DB:
+            if gap_start is None:
+                gap_start = i
+        elif gap_start is not None:
+            gaps.append((i - gap_start, gap_start, i))
+            gap_start = None
+    if len(gaps) < count - 1:
+        return None
+
+    gaps.sort(reverse=True)
+    chosen, rest = gaps[:count - 1], gaps[count - 1:]
+    if chosen:
+        shortest = chosen[-1][0]
+        if shortest * ANALYSIS_WINDOW < MIN_GAP or (rest and shortest < rest[0][0] * GAP_RATIO):
+            return None
+    return sorted((start + end) / 2 * ANALYSIS_WINDOW for _, start, end in chosen)
+
+def split_wav(audio, count):
+    with wave.open(io.BytesIO(bytes(audio)), 'rb') as wav_file:
+        params = wav_file.getparams()
+        pcm = wav_file.readframes(params.nframes)
+    if params.sampwidth != 2:
+        return None
+    cuts = find_cuts(window_levels(pcm, params.framerate, params.nchannels), count)
+    if cuts is None:
+        return None
+
+    frame_bytes = params.sampwidth * params.nchannels
+    bounds = [0] + [int(cut * params.framerate) * frame_bytes for cut in cuts] + [len(pcm)]
+    clips = []
+    for start, end in zip(bounds, bounds[1:]):
+        clip_buffer = io.BytesIO()
+        with wave.open(clip_buffer, 'wb') as clip_file:
+            clip_file.setparams(params)
+            clip_file.writeframes(pcm[start:end])
+        clips.append(clip_buffer.getvalue())
+    return clips
+
+def split_mp3(audio, count):
+    frames = list(iter_mp3_frames(audio))
+    if len(frames) < count:
+        return None
+    pcm, rate, channels = decode_pcm(audio)
+    cuts = find_cuts(window_levels(pcm, rate, channels), count)
+    if cuts is None:
+        return None
+
+    # Разрез приходится на середину паузы, поэтому сдвиг декодера на пару
+    # кадров не важен; кадры не перекодируются
+    _, _, samples, frame_rate = frames[0]
+    frame_duration = samples / frame_rate
+    bounds = [0] + [min(len(frames), round(cut / frame_duration)) for cut in cuts] + [len(frames)]
+    data = bytes(audio)
+    clips = []
+    for start, end in zip(bounds, bounds[1:]):
+        if start >= end:
+            return None
+        first_offset = frames[start][0]
+        last_offset, last_length, _, _ = frames[end - 1]
+        clips.append(data[first_offset:last_offset + last_length])
+    return clips
+
+def split_phrase_audio(audio, count):
+    """Режет аудио фразы на count клипов; None - если уверенно разрезать нельзя"""
+    if count == 1:
+        return [bytes(audio)]
+    if bytes(audio[:4]) == b'RIFF':
+        return split_wav(audio, count)
+    return split_mp3(audio, count)
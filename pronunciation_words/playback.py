@@ -0,0 +1,666 @@
+"""Декодирование и воспроизведение через pygame (импортируется только для проигрывания)"""
+
+import collections
+import hashlib
+import io
+import itertools
+import os
+import queue
+import random
+import shutil
+import tempfile
+import threading
+import time
+import wave
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pygame
+try:
+    import numpy as np
+except ImportError:  # Без NumPy недоступна обработка звука (изменение скорости)
+    np = None
+
+from .cache import SOURCE_CACHE
+from .generation import generate_single_audio
+from .loudness import apply_gain, normalization_gain
+from .synthesis import ResilientSynthesizer
+from .tracing import TRACER
+
+def load_sound(audio_buffer, temp_dir, index):
+    """Подготавливает звук к воспроизведению через временный файл"""
+    temp_filename = os.path.join(temp_dir, f"word_{index}.mp3")
+    
+    with open(temp_filename, 'wb') as f:
+        f.write(audio_buffer)
+    
+    return pygame.mixer.Sound(temp_filename)
+
+def decode_sound(audio_buffer):
+    """Декодирует аудио прямо из буфера в PCM в памяти, без временного файла"""
+    return pygame.mixer.Sound(file=io.BytesIO(audio_buffer))
+
+def time_stretch(samples, speed, frame_size=2048, hop=512):
+    """Меняет темп без изменения высоты тона (фазовый вокодер на NumPy)
+
+    samples - массив int16 формы (кадры, каналы), speed > 1 ускоряет речь.
+    Все кадры STFT обрабатываются векторно, без цикла по времени.
+    """
+    if abs(speed - 1.0) < 1e-3 or len(samples) == 0:
+        return samples
+    
+    signal = np.pad(samples.astype(np.float32), ((frame_size, frame_size + hop), (0, 0)))
+    window = np.hanning(frame_size).astype(np.float32)[None, :, None]
+    frame_count = 1 + (len(signal) - frame_size) // hop
+    positions = hop * np.arange(frame_count)[:, None] + np.arange(frame_size)[None, :]
+    spectrum = np.fft.rfft(signal[positions] * window, axis=1)  # (кадры, частоты, каналы)
+    
+    # Дробные позиции входных кадров для каждого выходного кадра
+    steps = np.arange(0, frame_count - 1, speed)
+    left = steps.astype(int)
+    weight = (steps - left)[:, None, None]
+    magnitude = (1 - weight) * np.abs(spectrum[left]) + weight * np.abs(spectrum[left + 1])
+    
+    # Набег фазы между соседними кадрами с поправкой на истинную частоту бина
+    expected = (2 * np.pi * hop * np.arange(spectrum.shape[1]) / frame_size)[None, :, None]
+    delta = np.angle(spectrum[left + 1]) - np.angle(spectrum[left]) - expected
+    delta -= 2 * np.pi * np.round(delta / (2 * np.pi))
+    increments = expected + delta
+    phase = np.angle(spectrum[0])[None] + np.concatenate(
+        [np.zeros_like(increments[:1]), np.cumsum(increments[:-1], axis=0)]
+    )
+    
+    # Фазовая синхронизация: бины вокруг спектрального пика сохраняют фазовые
+    # соотношения входного сигнала, иначе звук становится "гулким"
+    bins = np.arange(spectrum.shape[1])[None, :, None]
+    padded = np.pad(magnitude, ((0, 0), (1, 1), (0, 0)))
+    is_peak = (magnitude >= padded[:, :-2]) & (magnitude >= padded[:, 2:])
+    previous_peak = np.maximum.accumulate(np.where(is_peak, bins, 0), axis=1)
+    next_peak = np.flip(np.minimum.accumulate(
+        np.flip(np.where(is_peak, bins, spectrum.shape[1] - 1), axis=1), axis=1), axis=1)
+    nearest_peak = np.where(bins - previous_peak <= next_peak - bins, previous_peak, next_peak)
+    input_phase = np.angle(spectrum[left])
+    phase = (np.take_along_axis(phase, nearest_peak, axis=1) + input_phase
+             - np.take_along_axis(input_phase, nearest_peak, axis=1))
+    
+    frames = np.fft.irfft(magnitude * np.exp(1j * phase), n=frame_size, axis=1) * window
+    
+    # Сложение перекрывающихся кадров с нормировкой на сумму квадратов окна
+    out_positions = hop * np.arange(len(steps))[:, None] + np.arange(frame_size)[None, :]
+    output = np.zeros((out_positions[-1, -1] + 1, samples.shape[1]), dtype=np.float64)
+    norm = np.zeros(len(output))
+    np.add.at(output, out_positions, frames)
+    np.add.at(norm, out_positions, np.broadcast_to(window[0, :, 0] ** 2, out_positions.shape))
+    output /= np.maximum(norm, 1e-3)[:, None]
+    
+    start = int(round(frame_size / speed))
+    output = output[start:start + int(round(len(samples) / speed))]
+    return np.clip(output, -32768, 32767).astype(np.int16)
+
+def sound_to_array(sound):
+    """PCM звука как массив int16 формы (кадры, каналы)"""
+    channels = pygame.mixer.get_init()[2]
+    return np.frombuffer(sound.get_raw(), dtype=np.int16).reshape(-1, channels)
+
+def stretch_sound(sound, speed):
+    """Возвращает звук, ускоренный/замедленный в speed раз с сохранением тона"""
+    if abs(speed - 1.0) < 1e-3:
+        return sound
+    if np is None:
+        print("⚠️ NumPy не установлен, скорость воспроизведения не меняется")
+        return sound
+    
+    return pygame.mixer.Sound(buffer=time_stretch(sound_to_array(sound), speed).tobytes())
+
+def get_stretch_factor(speed_factor):
+    """Во сколько раз растягивать звук для заданной скорости
+
+    При скорости ниже 0.8 gTTS уже синтезирует медленную речь (slow=True),
+    поэтому дополнительное растяжение не применяется.
+    """
+    return 1.0 if speed_factor < 0.8 else speed_factor
+
+class SoundBank:
+    """Декодированные звуки текущей сессии
+
+    Каждое слово декодируется один раз, повторные воспроизведения используют
+    готовый PCM. Варианты с измененной скоростью запоминаются по паре
+    (слово, скорость). С pcm_cache декодированный и растянутый звук
+    сохраняется между запусками. Если SDL_mixer не умеет читать формат из
+    памяти, звук загружается по-старому через временный файл. С
+    loudness_target громкость каждого клипа после декодирования приводится
+    к этому уровню (дБ). С capacity хранится не больше capacity последних
+    звуков, иначе - все звуки сессии.
+    """
+    
+    def __init__(self, language='ru', slow=False, pcm_cache=None, speed=1.0, loudness_target=None,
+                 capacity=None):
+        self.language = language
+        self.slow = slow
+        self.pcm_cache = pcm_cache
+        self.speed = speed
+        self.loudness_target = loudness_target if np is not None else None
+        self.capacity = capacity
+        self.sounds = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.temp_dir = None
+        self.temp_names = itertools.count()  # номера временных файлов (уникальны между потоками)
+        self.decoded = 0
+        self.stretched = 0
+        self.reused = 0
+        self.pcm_hits = 0
+        self.normalized = 0
+    
+    def get_sound(self, word, audio_buffer, speed=None):
+        """Возвращает звук для слова с нужной скоростью, готовя его при первом обращении"""
+        speed = self.speed if speed is None else speed
+        if abs(speed - 1.0) < 1e-3:
+            return self._base_sound(word, audio_buffer)
+        
+        sound = self._recall((word, speed))
+        if sound is not None:
+            return sound
+        
+        sound = self._load_pcm(word, audio_buffer, speed)
+        if sound is None:
+            base_sound = self._base_sound(word, audio_buffer)
+            with TRACER.span('time_stretch', word=word):
+                sound = stretch_sound(base_sound, speed)
+            if sound is not base_sound:
+                with self.lock:
+                    self.stretched += 1
+                self._store_pcm(word, audio_buffer, sound, speed)
+        
+        self._remember((word, speed), sound)
+        return sound
+    
+    def _base_sound(self, word, audio_buffer):
+        """Звук слова с исходной скоростью"""
+        sound = self._recall((word, 1.0))
+        if sound is not None:
+            return sound
+        
+        sound = self._load_pcm(word, audio_buffer)
+        if sound is None:
+            sound = self._normalize(word, self._decode(word, audio_buffer))
+            self._store_pcm(word, audio_buffer, sound)
+        
+        self._remember((word, 1.0), sound)
+        return sound
+    
+    def _recall(self, key):
+        with self.lock:
+            sound = self.sounds.get(key)
+            if sound is not None:
+                self.reused += 1
+                self.sounds.move_to_end(key)
+            return sound
+    
+    def _remember(self, key, sound):
+        with self.lock:
+            self.sounds[key] = sound
+            self.sounds.move_to_end(key)
+            if self.capacity is not None:
+                while len(self.sounds) > self.capacity:
+                    self.sounds.popitem(last=False)
+    
+    def _decode(self, word, audio_buffer):
+        try:
+            with TRACER.span('decode', word=word):
+                sound = decode_sound(audio_buffer)
+        except pygame.error:
+            with self.lock:
+                if self.temp_dir is None:
+                    self.temp_dir = tempfile.mkdtemp()
+                index = next(self.temp_names)
+            # Запись во временный файл и декодирование из него
+            with TRACER.span('temp_file', word=word):
+                sound = load_sound(audio_buffer, self.temp_dir, index)
+        with self.lock:
+            self.decoded += 1
+        return sound
+    
+    def _normalize(self, word, sound):
+        """Приводит громкость звука к loudness_target"""
+        if self.loudness_target is None:
+            return sound
+        samples = sound_to_array(sound)
+        with TRACER.span('normalize', word=word):
+            gain = normalization_gain(samples, pygame.mixer.get_init()[0], self.loudness_target)
+            if abs(gain) < 0.1:
+                return sound
+            sound = pygame.mixer.Sound(buffer=apply_gain(samples, gain).tobytes())
+        with self.lock:
+            self.normalized += 1
+        return sound
+    
+    def _pcm_key(self, audio_buffer, speed):
+        # Ключ по содержимому: после смены синтезатора старый PCM не подойдет,
+        # а одинаковое аудио разных слов декодируется один раз
+        key = hashlib.sha256(audio_buffer).hexdigest()[:32]
+        if self.loudness_target is not None:
+            key += f"_n{self.loudness_target:g}"
+        return key if speed == 1.0 else f"{key}_x{speed:g}"
+    
+    def _load_pcm(self, word, audio_buffer, speed=1.0):
+        """Берет готовый PCM из постоянного кэша, минуя декодирование"""
+        if not self.pcm_cache:
+            return None
+        frequency, size, channels = pygame.mixer.get_init()
+        with TRACER.span('pcm_load', word=word):
+            pcm = self.pcm_cache.get(self._pcm_key(audio_buffer, speed), frequency, channels, abs(size) // 8)
+            if pcm is None:
+                return None
+            sound = pygame.mixer.Sound(buffer=pcm)
+        with self.lock:
+            self.pcm_hits += 1
+        return sound
+    
+    def _store_pcm(self, word, audio_buffer, sound, speed=1.0):
+        if not self.pcm_cache:
+            return
+        frequency, size, channels = pygame.mixer.get_init()
+        with TRACER.span('pcm_store', word=word):
+            self.pcm_cache.put(self._pcm_key(audio_buffer, speed), sound.get_raw(), frequency, channels, abs(size) // 8)
+    
+    def close(self):
+        """Освобождает звуки и временные файлы"""
+        self.sounds.clear()
+        if self.temp_dir:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+            self.temp_dir = None
+
+def play_sound(sound, word=None):
+    """Воспроизводит звук и ждет окончания"""
+    with TRACER.span('playback', word=word):
+        channel = sound.play()
+        
+        while channel.get_busy():
+            pygame.time.wait(5)
+
+def get_playback_order(count, random_order=True):
+    """Возвращает список индексов слов в порядке воспроизведения"""
+    playback_indices = list(range(count))
+    if random_order:
+        # Случайный порядок: перемешиваем индексы
+        random.shuffle(playback_indices)
+        print("🔀 Слова будут воспроизведены в случайном порядке")
+    else:
+        # Обычный порядок
+        print("➡️ Слова будут воспроизведены в обычном порядке")
+    return playback_indices
+
+def play_words_optimized(audio_data, words, pause_duration=0.3, playback_speed=1.0, random_order=True,
+                         language='ru', pcm_cache=None, loudness_target=None):
+    """Воспроизведение с настройками"""
+    pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
+    pygame.mixer.set_num_channels(3)
+    
+    print(f"🎵 Воспроизведение {len(words)} слов...")
+    print(f"⏱️ Пауза: {pause_duration}с, скорость: {playback_speed}x")
+    print(f"🎲 Случайный порядок: {'ВКЛ' if random_order else 'ВЫКЛ'}")
+    print("-" * 60)
+    
+    playback_indices = get_playback_order(len(words), random_order)
+    
+    sound_bank = SoundBank(language, playback_speed < 0.8, pcm_cache, get_stretch_factor(playback_speed),
+                           loudness_target)
+    
+    try:
+        start_time = time.time()
+        
+        for play_index, original_index in enumerate(playback_indices, 1):
+            word = words[original_index]
+            audio_buffer = audio_data[original_index]
+            
+            if audio_buffer is None:
+                print(f"⏭️ Пропуск {play_index}/{len(words)}: {word}")
+                continue
+                
+            print(f"{play_index}/{len(words)}: {word}")
+            
+            try:
+                sound = sound_bank.get_sound(word, audio_buffer)
+                play_sound(sound, word)
+                
+                if play_index < len(words):
+                    with TRACER.span('pause'):
+                        time.sleep(pause_duration)
+                    
+            except Exception as e:
+                print(f"❌ Ошибка воспроизведения '{word}': {e}")
+        
+        total_time = time.time() - start_time
+        print("-" * 60)
+        print(f"✅ Воспроизведение завершено за {total_time:.1f} секунд")
+        if pcm_cache:
+            print(f"🎼 PCM: {sound_bank.pcm_hits} из кэша, {sound_bank.decoded} декодировано, "
+                  f"{sound_bank.stretched} растянуто, {sound_bank.normalized} выровнено по громкости")
+        
+    finally:
+        sound_bank.close()
+
+def trim_silence(samples, rate, threshold_db=-40.0, frame_ms=10, margin_ms=20):
+    """Обрезает тишину в начале и конце клипа
+
+    Громкость считается по кадрам frame_ms (RMS); тишиной считаются кадры
+    тише пикового на threshold_db. По краям оставляется запас margin_ms.
+    """
+    frame_length = max(1, int(rate * frame_ms / 1000))
+    frame_count = len(samples) // frame_length
+    if frame_count == 0:
+        return samples
+    
+    frames = samples[:frame_count * frame_length].astype(np.float32).reshape(frame_count, -1)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    loud = np.nonzero(rms >= rms.max() * 10 ** (threshold_db / 20))[0]
+    if rms.max() == 0 or len(loud) == 0:
+        return samples[:0]
+    
+    margin = int(rate * margin_ms / 1000)
+    start = max(0, loud[0] * frame_length - margin)
+    end = min(len(samples), (loud[-1] + 1) * frame_length + margin)
+    return samples[start:end]
+
+def render_session(sound_bank, audio_data, words, playback_indices, pause_duration):
+    """Склеивает обрезанные клипы и точные паузы в один буфер PCM
+
+    Возвращает массив int16 (кадры, каналы) и список (начало в секундах,
+    номер слова) для вывода прогресса.
+    """
+    rate, _, channels = pygame.mixer.get_init()
+    pause = np.zeros((int(round(rate * pause_duration)), channels), dtype=np.int16)
+    pieces = []
+    timeline = []
+    position = 0
+    
+    for original_index in playback_indices:
+        audio_buffer = audio_data[original_index]
+        if audio_buffer is None:
+            print(f"⏭️ Пропуск: {words[original_index]}")
+            continue
+        try:
+            sound = sound_bank.get_sound(words[original_index], audio_buffer)
+        except Exception as e:
+            print(f"❌ Ошибка подготовки '{words[original_index]}': {e}")
+            continue
+        
+        clip = trim_silence(sound_to_array(sound), rate)
+        if pieces and len(pause):
+            pieces.append(pause)
+            position += len(pause)
+        timeline.append((position / rate, original_index))
+        pieces.append(clip)
+        position += len(clip)
+    
+    if not pieces:
+        return np.zeros((0, channels), dtype=np.int16), timeline
+    return np.concatenate(pieces), timeline
+
+def export_wav(samples, filename):
+    """Сохраняет буфер PCM микшера в WAV-файл"""
+    rate, size, channels = pygame.mixer.get_init()
+    with wave.open(filename, 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(abs(size) // 8)
+        wav_file.setframerate(rate)
+        wav_file.writeframes(samples.tobytes())
+    print(f"💾 Сессия сохранена в {filename}")
+
+def play_words_premixed(audio_data, words, pause_duration=0.3, playback_speed=1.0, random_order=True,
+                        language='ru', pcm_cache=None, export_file=None, loudness_target=None):
+    """Воспроизведение без пробелов: вся сессия заранее сводится в один поток
+
+    Тишина по краям клипов обрезается, между словами вставляются точные паузы,
+    поэтому длительность сессии равна сумме речи и настроенных пауз.
+    """
+    if np is None:
+        print("⚠️ NumPy не установлен, используется обычное воспроизведение")
+        return play_words_optimized(audio_data, words, pause_duration, playback_speed,
+                                    random_order, language, pcm_cache, loudness_target)
+    
+    pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
+    
+    print(f"🎵 Сведение {len(words)} слов в один поток...")
+    print(f"⏱️ Пауза: {pause_duration}с, скорость: {playback_speed}x")
+    print("-" * 60)
+    
+    playback_indices = get_playback_order(len(words), random_order)
+    sound_bank = SoundBank(language, playback_speed < 0.8, pcm_cache, get_stretch_factor(playback_speed),
+                           loudness_target)
+    
+    try:
+        render_start = time.time()
+        with TRACER.span('render_session'):
+            samples, timeline = render_session(sound_bank, audio_data, words, playback_indices, pause_duration)
+        rate = pygame.mixer.get_init()[0]
+        duration = len(samples) / rate
+        print(f"🎛️ Сведено за {time.time() - render_start:.2f}с, длительность сессии {duration:.1f}с")
+        
+        if export_file:
+            with TRACER.span('export_wav'):
+                export_wav(samples, export_file)
+        if not timeline:
+            return
+        
+        session_sound = pygame.mixer.Sound(buffer=samples.tobytes())
+        start_time = time.time()
+        start_time_perf = time.perf_counter()
+        session_sound.play()
+        
+        for play_index, (offset, original_index) in enumerate(timeline, 1):
+            delay = offset - (time.time() - start_time)
+            if delay > 0:
+                time.sleep(delay)
+            print(f"{play_index}/{len(timeline)}: {words[original_index]}")
+        
+        remaining = duration - (time.time() - start_time)
+        if remaining > 0:
+            time.sleep(remaining)
+        TRACER.record('playback', start_time_perf, time.perf_counter() - start_time_perf)
+        
+        total_time = time.time() - start_time
+        print("-" * 60)
+        print(f"✅ Воспроизведение завершено за {total_time:.1f} секунд (расчетное {duration:.1f}с)")
+    finally:
+        pygame.mixer.stop()
+        sound_bank.close()
+
+def play_words_streaming(words, language='ru', speed_factor=1.0, pause_duration=0.3,
+                         random_order=True, max_workers=4, prefetch=4, cache=None,
+                         synthesizer=None, stats=None, pcm_cache=None, loudness_target=None, pack=None):
+    """Потоковый режим: воспроизведение начинается, как только готово первое слово
+
+    Генерация идет в порядке воспроизведения и опережает его не более чем
+    на prefetch слов (ограниченная очередь между производителем и потребителем).
+    Слова, которые не удалось получить, повторяются в конце сессии. Слова из
+    пакета pack берутся из него без синтеза.
+    """
+    pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
+    pygame.mixer.set_num_channels(3)
+    
+    slow_mode = speed_factor < 0.8
+    print(f"🎵 Потоковое воспроизведение {len(words)} слов (упреждение: {prefetch})...")
+    print(f"⏱️ Пауза: {pause_duration}с, скорость: {speed_factor}x, потоков: {max_workers}")
+    print("-" * 60)
+    
+    playback_indices = get_playback_order(len(words), random_order)
+    ready_queue = queue.Queue(maxsize=max(1, prefetch))
+    stop_event = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    
+    submitted = {}
+    
+    def produce():
+        # Задачи ставятся в очередь в порядке воспроизведения; put блокируется,
+        # пока потребитель не освободит место, поэтому генерация не убегает вперед
+        for original_index in playback_indices:
+            if stop_event.is_set():
+                break
+            # Повторяющиеся слова генерируются один раз
+            word = words[original_index]
+            future = submitted.get(word)
+            if future is None:
+                packed = pack.get(word, language, slow_mode) if pack is not None else None
+                if packed is not None:
+                    future = Future()
+                    future.set_result((packed, word, True, SOURCE_CACHE))
+                else:
+                    future = executor.submit(
+                        TRACER.queued(generate_single_audio, word=word), word, language, slow_mode,
+                        cache, synthesizer, stats
+                    )
+                submitted[word] = future
+            while not stop_event.is_set():
+                try:
+                    ready_queue.put((original_index, future), timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+    
+    producer = threading.Thread(target=produce, daemon=True)
+    sound_bank = SoundBank(language, slow_mode, pcm_cache, get_stretch_factor(speed_factor), loudness_target)
+    start_time = time.time()
+    first_audio_time = None
+    stalls = []
+    retry_later = []
+    
+    try:
+        producer.start()
+        play_index = 0
+        while play_index < len(playback_indices) + len(retry_later):
+            play_index += 1
+            wait_start = time.time()
+            if play_index <= len(playback_indices):
+                with TRACER.span('queue_wait'):
+                    original_index, future = ready_queue.get()
+                    audio_buffer, word, success, source = future.result()
+            else:
+                # Второй круг: слово, пропущенное из-за ошибки синтеза
+                word = retry_later[play_index - len(playback_indices) - 1]
+                audio_buffer, word, success, source = generate_single_audio(
+                    word, language, slow_mode, cache, synthesizer
+                )
+                if success and stats:
+                    stats.record_recovery(source)
+            waited = time.time() - wait_start
+            
+            # Ожидание синтеза заметнее паузы между словами считаем простоем
+            if first_audio_time is not None and waited > max(0.05, pause_duration):
+                stalls.append(waited)
+                print(f"⏳ Ожидание синтеза: {waited:.2f}с")
+            
+            position = f"{play_index}/{len(words)}" if play_index <= len(playback_indices) else "🔁"
+            if not success:
+                if play_index <= len(playback_indices):
+                    if word not in retry_later:
+                        retry_later.append(word)
+                    print(f"⏭️ Пропуск {position}: {word} (повтор в конце)")
+                else:
+                    print(f"⏭️ Пропуск: {word}")
+                continue
+            
+            print(f"{position}: {word}" + (" (кэш)" if source == SOURCE_CACHE else ""))
+            
+            try:
+                sound = sound_bank.get_sound(word, audio_buffer)
+                if first_audio_time is None:
+                    first_audio_time = time.time() - start_time
+                    print(f"⚡ Первый звук через {first_audio_time:.2f}с")
+                play_sound(sound, word)
+                
+                if play_index < len(playback_indices) + len(retry_later):
+                    with TRACER.span('pause'):
+                        time.sleep(pause_duration)
+                    
+            except Exception as e:
+                print(f"❌ Ошибка воспроизведения '{word}': {e}")
+        
+        total_time = time.time() - start_time
+        print("-" * 60)
+        print(f"✅ Воспроизведение завершено за {total_time:.1f} секунд")
+        if first_audio_time is not None:
+            print(f"⚡ Время до первого звука: {first_audio_time:.2f}с")
+        print(f"⏳ Простоев из-за синтеза: {len(stalls)}, всего {sum(stalls):.2f}с")
+        if isinstance(synthesizer, ResilientSynthesizer):
+            print(f"🛡️ Устойчивость синтеза: {synthesizer.summary()}")
+    finally:
+        stop_event.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+        producer.join()
+        sound_bank.close()
+
+class SessionPrefetcher:
+    """Фоновая подготовка слов следующей сессии во время текущей
+
+    Аудио слов генерируется в кэш, а с pcm_cache еще и декодируется (с нужной
+    скоростью), поэтому следующая сессия начинается без синтеза и
+    декодирования. Работает в фоновом потоке с небольшим числом потоков
+    синтеза, чтобы не мешать воспроизведению.
+    """
+    
+    def __init__(self, words, language='ru', speed_factor=1.0, max_workers=2, cache=None,
+                 synthesizer=None, pcm_cache=None, loudness_target=None):
+        self.words = words
+        self.language = language
+        self.speed_factor = speed_factor
+        self.max_workers = max_workers
+        self.cache = cache
+        self.synthesizer = synthesizer
+        self.pcm_cache = pcm_cache
+        self.loudness_target = loudness_target
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.prepared = 0
+        self.failed = 0
+        self.lock = threading.Lock()
+    
+    def start(self):
+        if not self.words:
+            return
+        # Микшер нужен для декодирования; инициализируется в основном потоке
+        pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+    
+    def run(self):
+        slow_mode = self.speed_factor < 0.8
+        sound_bank = SoundBank(self.language, slow_mode, self.pcm_cache, get_stretch_factor(self.speed_factor),
+                               self.loudness_target)
+        
+        def prepare(word):
+            if self.stop_event.is_set():
+                return
+            with TRACER.span('prefetch', word=word):
+                audio_buffer, _, success, _ = generate_single_audio(
+                    word, self.language, slow_mode, self.cache, self.synthesizer
+                )
+                if success and self.pcm_cache:
+                    try:
+                        sound_bank.get_sound(word, audio_buffer)
+                    except Exception as e:
+                        print(f"⚠️ Не удалось заранее декодировать '{word}': {e}")
+            with self.lock:
+                if success:
+                    self.prepared += 1
+                else:
+                    self.failed += 1
+        
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                list(executor.map(prepare, self.words))
+        finally:
+            sound_bank.close()
+    
+    def stop(self):
+        """Прерывает подготовку: уже начатые слова доделываются"""
+        self.stop_event.set()
+    
+    def wait(self):
+        """Дожидается окончания подготовки и печатает итог"""
+        if self.thread is None:
+            return
+        if self.thread.is_alive():
+            print(f"⏳ Подготовка следующей сессии ({len(self.words)} слов)...")
+        self.thread.join()
+        print(f"📥 Следующая сессия подготовлена: {self.prepared} из {len(self.words)} слов"
+              + (f", ошибок {self.failed}" if self.failed else ""))
@@ -0,0 +1,159 @@
+"""Интервальное повторение: состояние слов между сессиями и план сессии
+
+Каждое слово хранит состояние алгоритма SM-2: число успешных повторений
+подряд, коэффициент легкости, текущий интервал и день следующего
+повторения. Сессия составляется из слов, срок которых подошел (самые
+просроченные первыми), и ограниченного числа новых слов из файла.
+"""
+
+import datetime
+import json
+import os
+import threading
+
+# Оценки ответа по шкале SM-2 (0-5): ниже 3 - слово не вспомнилось
+QUALITY_GOOD = 4
+QUALITY_HARD = 2
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+
+def today():
+    """Номер текущего дня (дни удобнее хранить, чем даты)"""
+    return datetime.date.today().toordinal()
+
+def format_day(day):
+    return datetime.date.fromordinal(day).strftime('%d.%m.%Y')
+
+class ReviewStore:
+    """Состояние повторения слов в компактном JSON-файле
+
+    Запись слова - список [повторений подряд, легкость * 100, интервал в днях,
+    день следующего повторения, число забываний] под ключом "язык:слово".
+    Файл перезаписывается атомарно через временный файл.
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, store_file='review_state.json'):
+        self.store_file = store_file
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.load()
+    
+    def load(self):
+        """Загружает состояние (при ошибке повторение начинается заново)"""
+        try:
+            if not os.path.exists(self.store_file):
+                return
+            with open(self.store_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != self.VERSION:
+                print(f"⚠️ Неизвестная версия {self.store_file}, повторение начнется заново")
+                return
+            self.entries = data.get('words', {})
+            print(f"✅ Загружено состояние повторения: {len(self.entries)} слов")
+        except Exception as e:
+            print(f"❌ Ошибка загрузки состояния повторения: {e}")
+    
+    def save(self):
+        """Сохраняет состояние всех слов"""
+        try:
+            with self.lock:
+                data = json.dumps({'version': self.VERSION, 'words': self.entries},
+                                  ensure_ascii=False, separators=(',', ':'))
+            temp_file = self.store_file + '.tmp'
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(temp_file, self.store_file)
+        except Exception as e:
+            print(f"❌ Ошибка сохранения состояния повторения: {e}")
+    
+    @staticmethod
+    def make_key(word, language='ru'):
+        return f"{language}:{word}"
+    
+    def get_entry(self, word, language='ru'):
+        return self.entries.get(self.make_key(word, language))
+    
+    def split_words(self, words, language='ru', day=None):
+        """Делит слова на (к повторению до дня day включительно, новые)
+
+        Слова к повторению отсортированы по сроку: самые просроченные первыми.
+        Повторы в списке words учитываются один раз.
+        """
+        day = today() if day is None else day
+        due = []
+        new = []
+        seen = set()
+        for position, word in enumerate(words):
+            if word in seen:
+                continue
+            seen.add(word)
+            entry = self.get_entry(word, language)
+            if entry is None:
+                new.append(word)
+            elif entry[3] <= day:
+                due.append((entry[3], position, word))
+        return [word for _, _, word in sorted(due)], new
+    
+    def plan_session(self, words, language='ru', new_limit=20, day=None):
+        """Очередь сессии: слова, срок которых подошел, и до new_limit новых"""
+        due, new = self.split_words(words, language, day)
+        return due + new[:new_limit]
+    
+    def plan_upcoming(self, words, session_words, language='ru', new_limit=20, day=None):
+        """Слова следующей сессии, которых нет в текущей
+
+        Считается, что следующая сессия будет завтра: в нее попадут слова со
+        сроком до завтра и следующие new_limit новых слов. Слова текущей
+        сессии уже готовы и не считаются.
+        """
+        day = today() if day is None else day
+        session = set(session_words)
+        due, new = self.split_words(words, language, day + 1)
+        new = [word for word in new if word not in session]
+        return [word for word in due if word not in session] + new[:new_limit]
+    
+    def record(self, word, quality, language='ru', day=None):
+        """Обновляет состояние слова по оценке quality (0-5) по алгоритму SM-2"""
+        day = today() if day is None else day
+        key = self.make_key(word, language)
+        with self.lock:
+            repetitions, ease, interval, _, lapses = self.entries.get(
+                key, [0, int(DEFAULT_EASE * 100), 0, day, 0]
+            )
+            ease /= 100
+            if quality < 3:
+                # Забытое слово начинает цепочку интервалов сначала
+                repetitions, interval = 0, 1
+                lapses += 1
+            else:
+                if repetitions == 0:
+                    interval = 1
+                elif repetitions == 1:
+                    interval = 6
+                else:
+                    interval = max(1, round(interval * ease))
+                repetitions += 1
+            ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+            self.entries[key] = [repetitions, round(ease * 100), interval, day + interval, lapses]
+        return interval
+    
+    def record_session(self, words, hard_words=(), language='ru', day=None):
+        """Записывает итог сессии: hard_words - слова, которые вызвали затруднения"""
+        hard_words = set(hard_words)
+        for word in dict.fromkeys(words):
+            self.record(word, QUALITY_HARD if word in hard_words else QUALITY_GOOD, language, day)
+    
+    def print_summary(self, words, language='ru', day=None):
+        """Сколько слов новых, к повторению сегодня и когда следующее повторение"""
+        day = today() if day is None else day
+        due, new = self.split_words(words, language, day)
+        upcoming = [
+            entry[3] for entry in (self.get_entry(word, language) for word in set(words))
+            if entry is not None and entry[3] > day
+        ]
+        print(f"🧠 Повторение: {len(due)} к повторению, {len(new)} новых, "
+              f"{len(upcoming)} отложено"
+              + (f" (ближайшее {format_day(min(upcoming))})" if upcoming else ""))
@@ -0,0 +1,402 @@
+"""Локальный HTTP-сервис произношения поверх общего кэша аудио
+
+GET /audio?word=&lang=&speed= отдает аудио слова из AudioCache, при промахе
+синтезирует его (одинаковые одновременные запросы объединяются). Ответы
+поддерживают ETag (SHA-256 содержимого) и Range; данные пишутся в сокет
+кусками прямо из отображенного в память сегмента кэша. GET /metrics - счетчики
+и задержки в текстовом формате Prometheus (?format=json - в JSON).
+
+Сервер слушает только заданный адрес (по умолчанию 127.0.0.1) и работает без
+сети с синтезатором fake.
+"""
+
+import asyncio
+import contextlib
+import functools
+import hashlib
+import json
+import signal
+import time
+import urllib.parse
+
+from .cache import SOURCE_CACHE, SOURCE_COALESCED, SOURCE_FAILED, SOURCE_GENERATED
+from .generation import GenerationStats
+from .tracing import TRACER
+
+STATUS_TEXT = {
+    200: 'OK',
+    206: 'Partial Content',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    416: 'Range Not Satisfiable',
+    502: 'Bad Gateway',
+    503: 'Service Unavailable',
+}
+
+class HttpError(Exception):
+    """Ответ с кодом ошибки (тело - текст сообщения)"""
+    
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+def parse_range(header, size):
+    """Разбирает заголовок Range для одного диапазона байтов
+
+    Возвращает (начало, конец включительно) или None, если заголовок нужно
+    игнорировать (другие единицы, несколько диапазонов или синтаксически
+    неверный диапазон с концом раньше начала - тогда отдается весь файл,
+    RFC 7233 §2.1). Начало за концом файла - HttpError 416.
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    first, _, last = spec.strip().partition('-')
+    try:
+        if not first:
+            # bytes=-N: последние N байт
+            length = int(last)
+            if length <= 0:
+                raise ValueError
+            start, end = max(0, size - length), size - 1
+        else:
+            start = int(first)
+            end = size - 1
+            if last:
+                if int(last) < start:
+                    raise ValueError
+                end = min(int(last), end)
+    except ValueError:
+        return None
+    if start >= size:
+        raise HttpError(416, "диапазон вне файла", {'Content-Range': f"bytes */{size}"})
+    return start, end
+
+def content_type(audio_data):
+    """MIME-тип по сигнатуре данных (gTTS отдает MP3, fake может отдавать WAV)"""
+    return 'audio/wav' if bytes(audio_data[:4]) == b'RIFF' else 'audio/mpeg'
+
+class PronunciationServer:
+    """Асинхронный HTTP/1.1-сервер (keep-alive, GET и HEAD)
+
+    max_connections - сколько соединений обслуживается одновременно, лишние
+    получают 503; max_concurrency - сколько синтезов идет одновременно,
+    остальные промахи ждут в очереди. Новые записи кэша сохраняются на диск
+    раз в save_interval секунд и при остановке.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    IDLE_TIMEOUT = 15.0
+    MAX_HEADER_BYTES = 16 * 1024
+    LATENCY_WINDOW = 10000
+    
+    def __init__(self, cache, synthesizer, host='127.0.0.1', port=8765, max_connections=256,
+                 max_concurrency=32, save_interval=30.0, quiet=False):
+        self.cache = cache
+        self.synthesizer = synthesizer
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self.save_interval = save_interval
+        self.quiet = quiet
+        
+        self.stats = GenerationStats(window=self.LATENCY_WINDOW)
+        self.responses = {}  # код ответа -> число
+        self.bytes_sent = 0
+        self.connections = 0
+        self.rejected = 0
+        self.synthesizing = 0
+        self.started = time.time()
+        self.semaphore = None
+        self.server = None
+    
+    async def serve(self):
+        """Запускает сервер и обслуживает запросы до отмены"""
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.server = await asyncio.start_server(
+            self.handle_connection, self.host, self.port, limit=self.MAX_HEADER_BYTES
+        )
+        address = self.server.sockets[0].getsockname()
+        print(f"🌐 Сервис произношения: http://{address[0]}:{address[1]}/audio?word=...")
+        print(f"📊 Соединений до {self.max_connections}, синтезов одновременно до {self.max_concurrency}")
+        saver = asyncio.create_task(self.save_periodically())
+        # SIGTERM останавливает сервис так же, как Ctrl+C (с сохранением кэша)
+        with contextlib.suppress(NotImplementedError):
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            saver.cancel()
+            self.cache.save_cache()
+    
+    async def save_periodically(self):
+        while True:
+            await asyncio.sleep(self.save_interval)
+            if self.cache.pending:
+                await self.save_cache()
+    
+    async def save_cache(self):
+        # Запись на диск не должна останавливать обслуживание запросов; вытеснение
+        # перезаписывает сегмент под блокировкой кэша и выполняется при остановке
+        await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self.cache.save_cache, enforce_limits=False)
+        )
+    
+    async def handle_connection(self, reader, writer):
+        if self.connections >= self.max_connections:
+            self.rejected += 1
+            await self.send_error(writer, HttpError(503, "слишком много соединений", {'Retry-After': '1'}),
+                                  keep_alive=False)
+            await self.close(writer)
+            return
+        
+        self.connections += 1
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), self.IDLE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self.send_error(writer, HttpError(400, "слишком длинные заголовки"), keep_alive=False)
+                    break
+                keep_alive = await self.handle_request(head, writer)
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            await self.close(writer)
+    
+    async def close(self, writer):
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+    
+    async def handle_request(self, head, writer):
+        """Обрабатывает один запрос; возвращает, можно ли продолжать соединение"""
+        start = time.perf_counter()
+        try:
+            request_line, *header_lines = head.decode('latin-1').split('\r\n')
+            method, target, version = request_line.split(' ')
+        except ValueError:
+            await self.send_error(writer, HttpError(400, "некорректная строка запроса"), keep_alive=False)
+            return False
+        headers = {}
+        for line in header_lines:
+            name, _, value = line.partition(':')
+            if name:
+                headers[name.strip().lower()] = value.strip()
+        
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+        # Неэкранированные не-ASCII символы в адресе приходят как UTF-8
+        url = urllib.parse.urlsplit(target.encode('latin-1').decode('utf-8', 'replace'))
+        params = urllib.parse.parse_qs(url.query)
+        
+        try:
+            if method not in ('GET', 'HEAD'):
+                raise HttpError(405, "поддерживаются только GET и HEAD", {'Allow': 'GET, HEAD'})
+            if url.path == '/audio':
+                status = await self.send_audio(writer, method, params, headers, keep_alive, start)
+            elif url.path == '/metrics':
+                status = await self.send_metrics(writer, method, params, keep_alive)
+            else:
+                raise HttpError(404, "неизвестный путь")
+        except HttpError as e:
+            await self.send_error(writer, e, keep_alive, with_body=method != 'HEAD')
+            status = e.status
+        
+        if not self.quiet:
+            query = '?' + urllib.parse.unquote(url.query) if url.query else ''
+            print(f"{method} {url.path}{query} {status} "
+                  f"{(time.perf_counter() - start) * 1000:.1f} мс")
+        return keep_alive
+    
+    async def get_audio(self, word, language, slow):
+        """Возвращает (ключ, аудио, источник) с объединением одинаковых промахов"""
+        key, audio, future, owner = self.cache.claim(word, language, slow)
+        if audio is not None:
+            return key, audio, SOURCE_CACHE
+        if not owner:
+            return key, memoryview(await asyncio.wrap_future(future)), SOURCE_COALESCED
+        
+        try:
+            with TRACER.span('queue_wait', asynchronous=True, word=word):
+                await self.semaphore.acquire()
+            try:
+                self.synthesizing += 1
+                with TRACER.span('synthesize', asynchronous=True, word=word):
+                    audio_bytes = await self.synthesizer.synthesize_async(word, language, slow)
+            finally:
+                self.synthesizing -= 1
+                self.semaphore.release()
+        except BaseException as e:
+            # Ожидающие того же слова получат ту же ошибку, а не зависнут
+            self.cache.complete(key, future, error=e if isinstance(e, Exception) else RuntimeError(str(e)))
+            raise
+        self.cache.complete(key, future, audio_bytes)
+        return key, memoryview(audio_bytes), SOURCE_GENERATED
+    
+    async def send_audio(self, writer, method, params, headers, keep_alive, start):
+        word = params.get('word', [''])[0].strip()
+        if not word:
+            raise HttpError(400, "не указано слово: /audio?word=...")
+        language = params.get('lang', ['ru'])[0]
+        try:
+            speed = float(params.get('speed', ['1.0'])[0])
+        except ValueError:
+            raise HttpError(400, "speed должен быть числом")
+        # Как и при генерации: медленная речь запрашивается у синтезатора,
+        # остальные скорости получаются растяжением на стороне клиента
+        slow = speed < 0.8
+        
+        try:
+            key, audio, source = await self.get_audio(word, language, slow)
+        except Exception as e:
+            self.stats.record(time.perf_counter() - start, SOURCE_FAILED)
+            raise HttpError(502, f"ошибка синтеза: {e}")
+        self.stats.record(time.perf_counter() - start, source)
+        
+        digest = self.cache.content_digest(key) or hashlib.sha256(audio).digest()
+        etag = f'"{digest.hex()}"'
+        response_headers = {
+            'Content-Type': content_type(audio),
+            'ETag': etag,
+            'Accept-Ranges': 'bytes',
+            'Cache-Control': 'public, max-age=86400',
+            'X-Audio-Source': source,
+        }
+        if etag in [tag.strip() for tag in headers.get('if-none-match', '').split(',')]:
+            await self.send_head(writer, 304, response_headers, keep_alive)
+            return 304
+        
+        status, body = 200, audio
+        byte_range = None
+        if 'range' in headers and headers.get('if-range', etag) == etag:
+            byte_range = parse_range(headers['range'], len(audio))
+        if byte_range:
+            first, last = byte_range
+            status, body = 206, audio[first:last + 1]
+            response_headers['Content-Range'] = f"bytes {first}-{last}/{len(audio)}"
+        response_headers['Content-Length'] = str(len(body))
+        
+        await self.send_head(writer, status, response_headers, keep_alive)
+        if method == 'GET':
+            await self.send_body(writer, body)
+        return status
+    
+    async def send_metrics(self, writer, method, params, keep_alive):
+        metrics = self.metrics()
+        if params.get('format', [''])[0] == 'json':
+            body = json.dumps(metrics, ensure_ascii=False, indent=2).encode('utf-8')
+            mime = 'application/json; charset=utf-8'
+        else:
+            body = self.render_prometheus(metrics).encode('utf-8')
+            mime = 'text/plain; version=0.0.4; charset=utf-8'
+        await self.send_head(writer, 200, {'Content-Type': mime, 'Content-Length': str(len(body)),
+                                           'Cache-Control': 'no-store'}, keep_alive)
+        if method == 'GET':
+            await self.send_body(writer, body)
+        return 200
+    
+    def metrics(self):
+        """Снимок счетчиков сервиса"""
+        stats = self.stats
+        return {
+            'uptime_s': round(time.time() - self.started, 1),
+            'responses': {str(status): count for status, count in sorted(self.responses.items())},
+            'audio': {
+                SOURCE_CACHE: stats.cache_hits,
+                SOURCE_COALESCED: stats.coalesced,
+                SOURCE_GENERATED: stats.generated,
+                SOURCE_FAILED: stats.failed,
+            },
+            'hit_ratio': round(stats.hit_ratio(), 4),
+            'latency_s': {
+                'p50': stats.percentile(50),
+                'p95': stats.percentile(95),
+                'p99': stats.percentile(99),
+            },
+            'bytes_sent': self.bytes_sent,
+            'connections': self.connections,
+            'rejected_connections': self.rejected,
+            'synthesizing': self.synthesizing,
+            'cache_entries': len(self.cache.index) + len(self.cache.pending),
+        }
+    
+    def render_prometheus(self, metrics):
+        lines = [
+            "# HELP pronunciation_responses_total HTTP-ответы по коду",
+            "# TYPE pronunciation_responses_total counter",
+        ]
+        lines += [f'pronunciation_responses_total{{status="{status}"}} {count}'
+                  for status, count in metrics['responses'].items()]
+        lines += [
+            "# HELP pronunciation_audio_total Запросы аудио по источнику",
+            "# TYPE pronunciation_audio_total counter",
+        ]
+        lines += [f'pronunciation_audio_total{{source="{source}"}} {count}'
+                  for source, count in metrics['audio'].items()]
+        lines += [
+            "# HELP pronunciation_cache_hit_ratio Доля запросов аудио, отданных из кэша",
+            "# TYPE pronunciation_cache_hit_ratio gauge",
+            f"pronunciation_cache_hit_ratio {metrics['hit_ratio']}",
+            "# HELP pronunciation_audio_latency_seconds Задержка ответа /audio (последние запросы)",
+            "# TYPE pronunciation_audio_latency_seconds summary",
+        ]
+        lines += [f'pronunciation_audio_latency_seconds{{quantile="{int(name[1:]) / 100}"}} {value:.6f}'
+                  for name, value in metrics['latency_s'].items()]
+        for name, kind, value in (
+            ('bytes_sent_total', 'counter', metrics['bytes_sent']),
+            ('connections', 'gauge', metrics['connections']),
+            ('rejected_connections_total', 'counter', metrics['rejected_connections']),
+            ('synthesizing', 'gauge', metrics['synthesizing']),
+            ('cache_entries', 'gauge', metrics['cache_entries']),
+            ('uptime_seconds', 'gauge', metrics['uptime_s']),
+        ):
+            lines += [f"# TYPE pronunciation_{name} {kind}", f"pronunciation_{name} {value}"]
+        return '\n'.join(lines) + '\n'
+    
+    async def send_head(self, writer, status, headers, keep_alive):
+        self.responses[status] = self.responses.get(status, 0) + 1
+        lines = [f"HTTP/1.1 {status} {STATUS_TEXT[status]}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await writer.drain()
+    
+    async def send_body(self, writer, body):
+        """Пишет тело кусками из memoryview, не собирая копию всего блоба"""
+        body = memoryview(body)
+        for offset in range(0, len(body), self.CHUNK_SIZE):
+            chunk = body[offset:offset + self.CHUNK_SIZE]
+            writer.write(chunk)
+            self.bytes_sent += len(chunk)
+            await writer.drain()
+    
+    async def send_error(self, writer, error, keep_alive, with_body=True):
+        body = (str(error) + '\n').encode('utf-8')
+        headers = {'Content-Type': 'text/plain; charset=utf-8', 'Content-Length': str(len(body))}
+        headers.update(error.headers)
+        await self.send_head(writer, error.status, headers, keep_alive)
+        if with_body:
+            await self.send_body(writer, body)
+
+def run_server(cache, synthesizer, **options):
+    """Запускает сервис до Ctrl+C"""
+    server = PronunciationServer(cache, synthesizer, **options)
+    try:
+        asyncio.run(server.serve())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("\n⏹️ Сервис остановлен")
+    stats = server.stats
+    print(f"📈 Статистика: {stats.summary()}, доля кэша {stats.hit_ratio():.0%}")
+    return server
@@ -0,0 +1,248 @@
+"""Сессия прослушивания: генерация слов по настройкам и воспроизведение"""
+
+import sys
+import time
+
+from .generation import generate_audio, get_optimization_settings
+from .review import ReviewStore
+from .tracing import TRACER
+from .words import deduplicate_words, expand_audio, normalize_word, print_deduplication_report
+
+def generate_words(settings_manager, unique_words, cache, pack=None):
+    """Генерирует аудио для уникальных слов в режиме из настроек
+
+    Возвращает список аудио (None для слов, которые не удалось получить).
+    Выученный адаптивным режимом параллелизм запоминается в настройках.
+    Слова из пакета pack берутся из него, генерируются только остальные.
+    """
+    if pack is not None:
+        language = settings_manager.get('language')
+        slow = settings_manager.get('speed_factor') < 0.8
+        packed = [pack.get(word, language, slow) for word in unique_words]
+        missing = [word for word, audio in zip(unique_words, packed) if audio is None]
+        print(f"📦 Из пакета {pack.filename}: {len(unique_words) - len(missing)} слов, "
+              f"генерируется {len(missing)}")
+        generated = iter(generate_words(settings_manager, missing, cache) if missing else [])
+        return [audio if audio is not None else next(generated) for audio in packed]
+    
+    gen_start = time.time()
+    
+    max_workers, batch_size = get_optimization_settings(len(unique_words), settings_manager)
+    controller = settings_manager.create_concurrency_controller()
+    unique_audio = generate_audio(
+        unique_words,
+        settings_manager.get('generation_mode'),
+        language=settings_manager.get('language'),
+        speed_factor=settings_manager.get('speed_factor'),
+        max_workers=max_workers,
+        batch_size=batch_size,
+        cache=cache,
+        synthesizer=settings_manager.create_synthesizer(),
+        max_concurrency=settings_manager.get('max_concurrency'),
+        requests_per_second=settings_manager.get('requests_per_second'),
+        controller=controller,
+        phrase_size=settings_manager.get('phrase_size')
+    )
+    settings_manager.remember_concurrency(controller)
+    
+    gen_time = time.time() - gen_start
+    print(f"⏱️ Генерация аудио завершена за {gen_time:.1f} секунд")
+    return unique_audio
+
+def open_pack(filename):
+    """Открывает пакет слов; при ошибке аудио берется из кэша"""
+    from .pack import AudioPack
+    try:
+        return AudioPack(filename)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Пакет {filename} не открыт ({e}), аудио берется из кэша")
+        return None
+
+def plan_review(settings_manager, review_store, unique_words):
+    """Очередь сессии интервального повторения и слова следующей сессии"""
+    language = settings_manager.get('language')
+    new_limit = settings_manager.get('review_new_words')
+    review_store.print_summary(unique_words, language)
+    session_words = review_store.plan_session(unique_words, language, new_limit)
+    upcoming = review_store.plan_upcoming(unique_words, session_words, language, new_limit)
+    if session_words:
+        print(f"🧠 В сессии {len(session_words)} слов, заранее будет подготовлено {len(upcoming)} слов следующей")
+    return session_words, upcoming
+
+def ask_hard_words(words):
+    """Спрашивает, какие слова вызвали затруднения (только в терминале)"""
+    if not sys.stdin.isatty():
+        return []
+    answer = input("\nСлова, которые вызвали затруднения (через запятую, Enter - все хорошо): ").strip()
+    known = {normalize_word(word).lower(): word for word in words}
+    hard_words = []
+    for answer_word in answer.split(','):
+        answer_word = normalize_word(answer_word).lower()
+        if not answer_word:
+            continue
+        if answer_word in known:
+            hard_words.append(known[answer_word])
+        else:
+            print(f"⚠️ Слова '{answer_word}' не было в сессии")
+    return hard_words
+
+def play_session(settings_manager, words, cache, pcm_cache=None):
+    """Генерирует и воспроизводит список слов согласно настройкам
+
+    С интервальным повторением играются только слова, срок которых подошел,
+    и новые слова, а слова следующей сессии готовятся в фоне во время этой.
+    """
+    # pygame и NumPy нужны только здесь
+    from .playback import SessionPrefetcher, play_words_optimized, play_words_premixed, play_words_streaming
+    
+    if settings_manager.get('trace'):
+        TRACER.enable()
+    
+    # Каждое уникальное слово генерируется один раз
+    unique_words, index_map = deduplicate_words(words)
+    review_store = None
+    upcoming = []
+    if settings_manager.get('spaced_repetition'):
+        review_store = ReviewStore(settings_manager.get('review_file'))
+        unique_words, upcoming = plan_review(settings_manager, review_store, unique_words)
+        if not unique_words:
+            print("🎉 На сегодня повторять нечего")
+            return
+        words = unique_words
+        index_map = list(range(len(unique_words)))
+    print_deduplication_report(
+        words, unique_words, index_map, cache,
+        settings_manager.get('language'), settings_manager.get('speed_factor') < 0.8
+    )
+    words = [unique_words[i] for i in index_map]
+    language = settings_manager.get('language')
+    prefetcher = SessionPrefetcher(
+        upcoming,
+        language=language,
+        speed_factor=settings_manager.get('speed_factor'),
+        max_workers=settings_manager.get('review_prefetch_workers'),
+        cache=cache,
+        synthesizer=settings_manager.create_synthesizer(),
+        pcm_cache=pcm_cache,
+        loudness_target=settings_manager.get_loudness_target()
+    )
+    completed = False
+    pack = open_pack(settings_manager.get('audio_pack')) if settings_manager.get('audio_pack') else None
+    
+    if settings_manager.get('lazy_playback') or len(words) >= settings_manager.get('lazy_threshold'):
+        # Очень большой список: в памяти только ссылки на кэш и окно ближайших слов
+        from .lazy import LazySession, play_words_lazy
+        try:
+            prefetcher.start()
+            session = LazySession(
+                words, cache, language, settings_manager.get('speed_factor') < 0.8,
+                synthesizer=settings_manager.create_synthesizer(), pack=pack
+            )
+            play_words_lazy(
+                session,
+                pause_duration=settings_manager.get('pause_duration'),
+                speed_factor=settings_manager.get('speed_factor'),
+                random_order=settings_manager.get('random_order'),
+                window=settings_manager.get('prefetch'),
+                pcm_cache=pcm_cache,
+                loudness_target=settings_manager.get_loudness_target()
+            )
+            completed = True
+        except KeyboardInterrupt:
+            print("\n⏹️ Воспроизведение прервано пользователем")
+        except Exception as e:
+            print(f"❌ Ошибка при воспроизведении: {e}")
+        finally:
+            finish_session(settings_manager, words, cache, pcm_cache, review_store, prefetcher, completed)
+        return
+    
+    if settings_manager.get('streaming_playback'):
+        # Генерация и воспроизведение одновременно
+        max_workers, _ = get_optimization_settings(len(words), settings_manager)
+        try:
+            prefetcher.start()
+            play_words_streaming(
+                words,
+                language=language,
+                speed_factor=settings_manager.get('speed_factor'),
+                pause_duration=settings_manager.get('pause_duration'),
+                random_order=settings_manager.get('random_order'),
+                max_workers=max_workers,
+                prefetch=settings_manager.get('prefetch'),
+                cache=cache,
+                synthesizer=settings_manager.create_synthesizer(),
+                pcm_cache=pcm_cache,
+                loudness_target=settings_manager.get_loudness_target(),
+                pack=pack
+            )
+            completed = True
+        except KeyboardInterrupt:
+            print("\n⏹️ Воспроизведение прервано пользователем")
+        except Exception as e:
+            print(f"❌ Ошибка при воспроизведении: {e}")
+        finally:
+            finish_session(settings_manager, words, cache, pcm_cache, review_store, prefetcher, completed)
+        return
+    
+    # Генерация аудио
+    audio_data = expand_audio(generate_words(settings_manager, unique_words, cache, pack), index_map)
+    
+    # Сохраняем настройки и кэш
+    settings_manager.save_settings()
+    cache.save_cache()
+    
+    # Воспроизведение
+    try:
+        prefetcher.start()
+        if settings_manager.get('premixed_playback'):
+            play_words_premixed(
+                audio_data,
+                words,
+                settings_manager.get('pause_duration'),
+                settings_manager.get('speed_factor'),
+                settings_manager.get('random_order'),
+                language=language,
+                pcm_cache=pcm_cache,
+                loudness_target=settings_manager.get_loudness_target(),
+                export_file=settings_manager.get('export_file') or None
+            )
+        else:
+            play_words_optimized(
+                audio_data, 
+                words, 
+                settings_manager.get('pause_duration'), 
+                settings_manager.get('speed_factor'),
+                settings_manager.get('random_order'),  # Добавляем параметр случайного порядка
+                language=language,
+                pcm_cache=pcm_cache,
+                loudness_target=settings_manager.get_loudness_target()
+            )
+        completed = True
+    except KeyboardInterrupt:
+        print("\n⏹️ Воспроизведение прервано пользователем")
+    except Exception as e:
+        print(f"❌ Ошибка при воспроизведении: {e}")
+    finally:
+        # Всегда сохраняем настройки и кэш при завершении
+        finish_session(settings_manager, words, cache, pcm_cache, review_store, prefetcher, completed)
+
+def finish_session(settings_manager, words, cache, pcm_cache, review_store, prefetcher, completed):
+    """Итог сессии повторения, ожидание подготовки следующей и сохранение кэшей"""
+    if not completed:
+        prefetcher.stop()
+    try:
+        if review_store and completed:
+            review_store.record_session(words, ask_hard_words(words), settings_manager.get('language'))
+            review_store.save()
+            review_store.print_summary(words, settings_manager.get('language'))
+        prefetcher.wait()
+    except KeyboardInterrupt:
+        # Прерванная подготовка доделывает только начатые слова
+        prefetcher.stop()
+        prefetcher.wait()
+    finally:
+        settings_manager.save_settings()
+        cache.save_cache()
+        if pcm_cache:
+            pcm_cache.save()
+        TRACER.report(settings_manager.get('trace_file'))
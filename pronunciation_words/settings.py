@@ -0,0 +1,223 @@
+"""Настройки программы (tts_settings.json)"""
+
+import json
+import os
+
+from .cache import AudioCache, PcmCache
+from .generation import AdaptiveConcurrency
+from .synthesis import ResilientSynthesizer, create_synthesizer
+
+class SettingsManager:
+    """Класс для управления настройками программы"""
+    
+    # Версия формата tts_settings.json: 2 - режим 3 стал адаптивным
+    SETTINGS_VERSION = 2
+    
+    def __init__(self, settings_file='tts_settings.json'):
+        self.settings_file = settings_file
+        self.default_settings = {
+            'settings_version': self.SETTINGS_VERSION,
+            'pause_duration': 0.3,
+            'speed_factor': 1.2,
+            'language': 'ru',
+            'generation_mode': 1,  # 1-параллельный, 2-батчи, 3-адаптивный, 4-асинхронный, 5-фразами
+            'max_workers': 4,
+            'batch_size': 3,
+            'phrase_size': 10,  # Слов в одном запросе синтеза в режиме фразами
+            'max_concurrency': 32,  # для асинхронного режима и предел адаптивного
+            'adaptive_concurrency': 0,  # выучен адаптивным режимом, 0 - еще нет
+            'requests_per_second': 10.0,  # 0 - без ограничения
+            'random_order': True,  # Добавляем настройку случайного порядка
+            'spaced_repetition': False,  # Играть только слова, срок повторения которых подошел
+            'review_file': 'review_state.json',
+            'review_new_words': 20,  # Новых слов в одной сессии повторения
+            'review_prefetch_workers': 2,  # Потоков подготовки следующей сессии
+            'streaming_playback': False,  # Воспроизведение во время генерации
+            'prefetch': 4,  # На сколько слов генерация опережает воспроизведение
+            'lazy_playback': False,  # Ленивая сессия: аудио готовится только для ближайших слов
+            'lazy_threshold': 5000,  # С этого размера списка ленивая сессия включается сама
+            'premixed_playback': False,  # Сведение сессии в один поток без пробелов
+            'export_file': '',  # WAV-файл для сохранения сведенной сессии
+            'pcm_cache': True,  # Хранить декодированный звук между запусками
+            'pcm_cache_mb': 128,
+            'normalize_loudness': True,  # Выравнивать громкость слов при декодировании
+            'loudness_target': -20.0,  # дБ относительно полной шкалы
+            'audio_pack': '',  # Упакованный список слов (команда pack), из которого берется аудио
+            'cache_max_mb': 0,  # Лимит кэша аудио, 0 - без ограничения
+            'cache_max_entries': 0,
+            'cache_eviction': 'lru',  # lru - давно не используемые, lfu - редко используемые
+            'synthesizer': 'gtts',  # gtts - Google TTS, fake - локальная имитация, http - сервис serve
+            'synthesizer_options': {},
+            'retry_attempts': 3,  # Попыток синтеза одного слова
+            'retry_base_delay': 0.5,
+            'retry_max_delay': 8.0,
+            'retry_budget': 100,  # Повторов на весь запуск
+            'breaker_threshold': 5,  # Ошибок подряд до паузы запросов
+            'breaker_cooldown': 10.0,
+            'trace': False,  # Замеры по операциям и сводка в конце запуска
+            'trace_file': ''  # Куда выгрузить трассу: *.json - Chrome Trace, *.jsonl - JSON Lines
+        }
+        self.settings = self.load_settings()
+        self.overridden = {}  # исходные значения настроек, измененных только на этот запуск
+    
+    def load_settings(self):
+        """Загружает настройки из файла"""
+        try:
+            if os.path.exists(self.settings_file):
+                with open(self.settings_file, 'r', encoding='utf-8') as f:
+                    saved_settings = json.load(f)
+                
+                # Объединяем с настройками по умолчанию
+                settings = {**self.default_settings, **self.migrate_settings(saved_settings)}
+                if saved_settings.get('settings_version') != self.SETTINGS_VERSION:
+                    # Сразу записываем новую версию, чтобы предупреждение о переходе показать один раз
+                    with open(self.settings_file, 'w', encoding='utf-8') as f:
+                        json.dump({**saved_settings, 'settings_version': self.SETTINGS_VERSION}, f, indent=2, ensure_ascii=False)
+                print(f"✅ Загружены сохраненные настройки")
+                return settings
+            else:
+                print("✅ Используются настройки по умолчанию")
+                return self.default_settings.copy()
+        except Exception as e:
+            print(f"❌ Ошибка загрузки настроек: {e}, используем по умолчанию")
+            return self.default_settings.copy()
+    
+    def migrate_settings(self, saved_settings):
+        """Переводит настройки прошлых версий программы в текущий формат"""
+        if saved_settings.get('settings_version', 1) < 2 and saved_settings.get('generation_mode') == 3:
+            # Раньше режим 3 выбирал параллельный режим или батчи по числу слов
+            print("ℹ️ Режим генерации 3 (автоматический) заменен адаптивным: число потоков "
+                  "подбирается по задержке и ошибкам синтеза и запоминается между запусками. "
+                  "Прежнее поведение ближе всего к режимам 1 и 2 (-m 1, -m 2)")
+        return {**saved_settings, 'settings_version': self.SETTINGS_VERSION}
+    
+    def save_settings(self):
+        """Сохраняет настройки в файл"""
+        try:
+            with open(self.settings_file, 'w', encoding='utf-8') as f:
+                json.dump({**self.settings, **self.overridden}, f, indent=2, ensure_ascii=False)
+            print("💾 Настройки сохранены!")
+        except Exception as e:
+            print(f"❌ Ошибка сохранения настроек: {e}")
+    
+    def get(self, key):
+        """Получает значение настройки"""
+        return self.settings.get(key, self.default_settings.get(key))
+    
+    def set(self, key, value):
+        """Устанавливает значение настройки"""
+        self.overridden.pop(key, None)
+        self.settings[key] = value
+    
+    def override(self, key, value):
+        """Меняет настройку только на этот запуск (в файл не сохраняется)"""
+        self.overridden.setdefault(key, self.get(key))
+        self.settings[key] = value
+    
+    def print_current_settings(self):
+        """Показывает текущие настройки"""
+        print("\n📊 ТЕКУЩИЕ НАСТРОЙКИ:")
+        print(f"   ⏱️ Пауза между словами: {self.settings['pause_duration']}с")
+        print(f"   🎯 Скорость произношения: {self.settings['speed_factor']}x")
+        print(f"   🌐 Язык: {self.settings['language']}")
+        print(f"   🔧 Режим генерации: {self.get_mode_name()}")
+        print(f"   🎲 Случайный порядок: {'ВКЛ' if self.settings['random_order'] else 'ВЫКЛ'}")
+        if self.get('spaced_repetition'):
+            print(f"   🧠 Интервальное повторение: ВКЛ (новых слов за сессию: {self.get('review_new_words')})")
+        if self.get('lazy_playback'):
+            print(f"   🪶 Ленивая сессия: ВКЛ (окно {self.get('prefetch')} слов)")
+        elif self.get('streaming_playback'):
+            print(f"   🌊 Потоковое воспроизведение: ВКЛ (упреждение {self.get('prefetch')})")
+        elif self.get('premixed_playback'):
+            print(f"   🎛️ Сведение без пробелов: ВКЛ" + (f" (экспорт в {self.get('export_file')})" if self.get('export_file') else ""))
+        if self.get('normalize_loudness'):
+            print(f"   🔊 Выравнивание громкости: до {self.get('loudness_target')} дБ")
+        if self.get('audio_pack'):
+            print(f"   📦 Пакет слов: {self.get('audio_pack')}")
+        if self.get('synthesizer') != 'gtts':
+            print(f"   🧪 Синтезатор: {self.get('synthesizer')}")
+        if self.get('trace'):
+            print(f"   ⏱️ Трассировка: ВКЛ" + (f" (выгрузка в {self.get('trace_file')})" if self.get('trace_file') else ""))
+        if self.get('cache_max_mb') or self.get('cache_max_entries'):
+            limits = []
+            if self.get('cache_max_mb'):
+                limits.append(f"{self.get('cache_max_mb')} МБ")
+            if self.get('cache_max_entries'):
+                limits.append(f"{self.get('cache_max_entries')} записей")
+            print(f"   💾 Лимит кэша: {', '.join(limits)} ({self.get('cache_eviction').upper()})")
+        
+        if self.settings['generation_mode'] == 1:
+            print(f"   🚀 Потоков: {self.settings['max_workers']}")
+        elif self.settings['generation_mode'] == 2:
+            print(f"   📦 Размер батча: {self.settings['batch_size']}")
+        elif self.settings['generation_mode'] == 3:
+            learned = self.get('adaptive_concurrency')
+            print(f"   🎛️ Стартовый параллелизм: {learned or self.get('max_workers')}"
+                  + (" (выучен в прошлых запусках)" if learned else ""))
+        elif self.settings['generation_mode'] == 4:
+            print(f"   🚀 Одновременных запросов: {self.get('max_concurrency')}")
+            print(f"   🪣 Лимит запросов в секунду: {self.get('requests_per_second') or 'нет'}")
+        elif self.settings['generation_mode'] == 5:
+            print(f"   🧩 Слов во фразе: {self.get('phrase_size')}, потоков: {self.get('max_workers')}")
+    
+    def get_loudness_target(self):
+        """Уровень выравнивания громкости или None, если выравнивание выключено"""
+        return self.get('loudness_target') if self.get('normalize_loudness') else None
+    
+    def create_synthesizer(self):
+        """Создает синтезатор согласно настройкам (с повторами при сбоях)"""
+        synthesizer = create_synthesizer(self.get('synthesizer'), **self.get('synthesizer_options'))
+        return ResilientSynthesizer(synthesizer, **self.get_resilience_options())
+    
+    def create_concurrency_controller(self):
+        """Регулятор параллелизма, стартующий с выученного значения"""
+        learned = self.get('adaptive_concurrency')
+        return AdaptiveConcurrency(
+            initial=learned or self.get('max_workers'),
+            maximum=self.get('max_concurrency'),
+            # С выученной точки растем осторожно, без удвоения
+            slow_start=not learned
+        )
+    
+    def remember_concurrency(self, controller):
+        """Запоминает лучший параллелизм запуска для следующего"""
+        if controller.windows:
+            self.set('adaptive_concurrency', controller.optimum())
+    
+    def get_resilience_options(self):
+        """Параметры повторов и размыкателя цепи для ResilientSynthesizer"""
+        return {
+            'attempts': self.get('retry_attempts'),
+            'base_delay': self.get('retry_base_delay'),
+            'max_delay': self.get('retry_max_delay'),
+            'retry_budget': self.get('retry_budget'),
+            'breaker_threshold': self.get('breaker_threshold'),
+            'breaker_cooldown': self.get('breaker_cooldown'),
+        }
+    
+    def create_audio_cache(self, synthesizer=None):
+        """Создает кэш аудио с лимитами из настроек для записей синтезатора"""
+        synthesizer = synthesizer or self.create_synthesizer()
+        return AudioCache(
+            max_bytes=int(self.get('cache_max_mb') * 2**20),
+            max_entries=self.get('cache_max_entries'),
+            eviction=self.get('cache_eviction'),
+            provenance=synthesizer.fingerprint()
+        )
+    
+    def create_pcm_cache(self):
+        """Создает PCM-кэш, если он включен в настройках"""
+        if not self.get('pcm_cache'):
+            return None
+        return PcmCache(max_bytes=int(self.get('pcm_cache_mb') * 2**20))
+    
+    def get_mode_name(self):
+        """Возвращает название режима генерации"""
+        modes = {
+            1: "Параллельный",
+            2: "Батчами", 
+            3: "Адаптивный",
+            4: "Асинхронный",
+            5: "Фразами"
+        }
+        return modes.get(self.settings['generation_mode'], "Неизвестно")
@@ -0,0 +1,384 @@
+"""Синтезаторы речи: gTTS, локальная имитация и обертка с повторами"""
+
+import array
+import asyncio
+import contextlib
+import hashlib
+import io
+import math
+import random
+import threading
+import time
+import wave
+
+from .tracing import TRACER
+
+class Synthesizer:
+    """Базовый интерфейс синтезатора речи
+
+    Все режимы генерации обращаются к синтезатору только через synthesize(),
+    поэтому сетевой gTTS можно заменить локальной реализацией.
+    """
+    
+    name = 'base'
+    
+    def synthesize(self, text, language='ru', slow=False):
+        """Возвращает аудио для текста в виде bytes"""
+        raise NotImplementedError
+    
+    def fingerprint(self):
+        """Описание параметров, влияющих на звучание (отпечаток записей кэша)"""
+        return self.name
+    
+    async def synthesize_async(self, text, language='ru', slow=False):
+        """Асинхронный вариант synthesize()
+
+        По умолчанию блокирующий вызов выполняется в пуле потоков цикла событий;
+        синтезаторы с неблокирующим вводом-выводом переопределяют этот метод.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.synthesize, text, language, slow)
+
+class GTTSSynthesizer(Synthesizer):
+    """Синтез через Google Text-to-Speech (требует сеть)"""
+    
+    name = 'gtts'
+    
+    def synthesize(self, text, language='ru', slow=False):
+        # gTTS тянет за собой requests; импорт только при первом синтезе
+        from gtts import gTTS
+        tts = gTTS(text=text, lang=language, slow=slow)
+        audio_buffer = io.BytesIO()
+        tts.write_to_fp(audio_buffer)
+        return audio_buffer.getvalue()
+
+class HttpSynthesizer(Synthesizer):
+    """Синтез через локальный сервис произношения (python main.py serve)
+
+    Сервис хранит общий кэш и объединяет одинаковые запросы, поэтому слово
+    синтезируется один раз для всех, кто к нему обращается.
+    """
+    
+    name = 'http'
+    
+    def __init__(self, url='http://127.0.0.1:8765', timeout=30.0):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+    
+    def fingerprint(self):
+        return f"{self.name}:{self.url}"
+    
+    def synthesize(self, text, language='ru', slow=False):
+        import urllib.error
+        import urllib.parse
+        import urllib.request
+        query = urllib.parse.urlencode({'word': text, 'lang': language, 'speed': 0.5 if slow else 1.0})
+        try:
+            with urllib.request.urlopen(f"{self.url}/audio?{query}", timeout=self.timeout) as response:
+                return response.read()
+        except urllib.error.HTTPError as e:
+            if 400 <= e.code < 500:
+                # Ошибка запроса не исправится повтором
+                raise ValueError(f"сервис отклонил запрос: {e.code} {e.reason}") from e
+            raise
+
+class FakeSynthesizer(Synthesizer):
+    """Локальный детерминированный синтезатор для тестов и бенчмарков
+
+    Имитирует задержку сети (latency ± jitter) и случайные сбои с вероятностью
+    failure_rate. Случайность выводится из seed, текста и номера попытки, поэтому
+    результат не зависит от порядка выполнения потоков. Возвращает корректный
+    MP3 (беззвучные кадры, как у gTTS: MPEG-2 Layer III, 24 кГц, моно) или WAV
+    с тоном между участками тишины.
+    
+    capacity > 0 имитирует ограниченный сервис: сверх capacity одновременных
+    запросов задержка растет пропорционально нагрузке, а сверх удвоенной
+    capacity запросы отклоняются (троттлинг).
+    """
+    
+    name = 'fake'
+    SAMPLE_RATE = 24000
+    # Заголовок кадра MPEG-2 Layer III, 64 кбит/с, 24 кГц, моно; кадр 192 байта
+    MP3_FRAME = b'\xff\xf3\x84\xc4' + b'\x00' * 188
+    MP3_FRAME_DURATION = 576 / 24000
+    
+    def __init__(self, latency=0.1, jitter=0.0, failure_rate=0.0, audio_format='mp3', seed=0,
+                 capacity=0):
+        if audio_format not in ('mp3', 'wav'):
+            raise ValueError(f"Неподдерживаемый формат: {audio_format}")
+        self.capacity = capacity
+        self.in_flight = 0
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.audio_format = audio_format
+        self.seed = seed
+        self.attempts = {}
+        self.lock = threading.Lock()
+    
+    def plan_request(self, text, language, slow):
+        """Определяет задержку и исход очередной попытки синтеза"""
+        request = f"{text}_{language}_{slow}"
+        with self.lock:
+            attempt = self.attempts.get(request, 0)
+            self.attempts[request] = attempt + 1
+        
+        rng = random.Random(f"{self.seed}:{request}:{attempt}")
+        delay = max(0.0, self.latency + rng.uniform(-self.jitter, self.jitter))
+        fail = rng.random() < self.failure_rate
+        if self.capacity:
+            with self.lock:
+                load = self.in_flight / self.capacity
+            delay *= max(1.0, load)
+            fail = fail or load > 2
+        return delay, fail
+    
+    @contextlib.contextmanager
+    def request_slot(self):
+        """Учитывает запрос в числе одновременных (для имитации capacity)"""
+        with self.lock:
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+    
+    def synthesize(self, text, language='ru', slow=False):
+        with self.request_slot():
+            delay, fail = self.plan_request(text, language, slow)
+            time.sleep(delay)
+        return self.render(text, slow, fail)
+    
+    async def synthesize_async(self, text, language='ru', slow=False):
+        with self.request_slot():
+            delay, fail = self.plan_request(text, language, slow)
+            await asyncio.sleep(delay)
+        return self.render(text, slow, fail)
+    
+    def fingerprint(self):
+        # Задержка, сбои и seed не влияют на сам звук
+        return f"{self.name}:{self.audio_format}"
+    
+    def render(self, text, slow, fail):
+        """Возвращает аудио или имитирует сбой"""
+        if fail:
+            raise ConnectionError(f"Имитация сбоя синтеза для '{text}'")
+        
+        if self.audio_format == 'wav':
+            return self.make_wav(text, slow)
+        return self.make_mp3(self.speech_duration(text, slow))
+    
+    def speech_duration(self, text, slow=False):
+        """Длительность "речи" для текста в секундах"""
+        duration = 0.2 + 0.06 * len(text)
+        return duration * 1.5 if slow else duration
+    
+    def make_mp3(self, duration):
+        """Собирает MP3 из беззвучных кадров нужной длительности"""
+        frames = max(1, int(duration / self.MP3_FRAME_DURATION))
+        return self.MP3_FRAME * frames
+    
+    def make_wav(self, text, slow=False, padding=0.15, phrase_pause=0.4):
+        """Собирает WAV: тишина, тон с частотой от текста, тишина
+
+        Фраза из слов через ". " озвучивается как настоящий синтезатор:
+        тон на каждое слово и пауза phrase_pause между ними.
+        """
+        rate = self.SAMPLE_RATE
+        silence = array.array('h', bytes(2 * int(rate * padding)))
+        pause = array.array('h', bytes(2 * int(rate * phrase_pause)))
+        samples = array.array('h', silence)
+        for n, part in enumerate(part for part in text.split('. ') if part):
+            if n:
+                samples += pause
+            frequency = 200 + int(hashlib.md5(part.encode('utf-8')).hexdigest(), 16) % 400
+            samples += array.array('h', (
+                int(8000 * math.sin(2 * math.pi * frequency * i / rate))
+                for i in range(int(rate * self.speech_duration(part, slow)))
+            ))
+        samples += silence
+        
+        wav_buffer = io.BytesIO()
+        with wave.open(wav_buffer, 'wb') as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(rate)
+            wav_file.writeframes(samples.tobytes())
+        return wav_buffer.getvalue()
+
+class CircuitBreaker:
+    """Размыкатель цепи: приостанавливает запросы после серии ошибок подряд
+
+    После failure_threshold ошибок подряд цепь размыкается на cooldown секунд,
+    новые запросы в это время ждут. Затем пропускается один пробный запрос:
+    при успехе цепь замыкается, при ошибке снова размыкается.
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+    # Как часто проверять, завершился ли пробный запрос
+    PROBE_POLL = 0.05
+    
+    def __init__(self, failure_threshold=5, cooldown=10.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.trips = 0
+        self.lock = threading.Lock()
+    
+    def wait_time(self):
+        """Сколько ждать перед запросом (0 - запрос можно выполнять сейчас)"""
+        with self.lock:
+            if self.state == self.CLOSED:
+                return 0.0
+            remaining = self.opened_at + self.cooldown - time.monotonic()
+            if remaining > 0:
+                return remaining
+            if self.probe_in_flight:
+                return self.PROBE_POLL
+            self.state = self.HALF_OPEN
+            self.probe_in_flight = True
+            return 0.0
+    
+    def record_success(self):
+        with self.lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.probe_in_flight = False
+    
+    def cancel_probe(self):
+        """Пробный запрос завершился ошибкой, не связанной с сервисом"""
+        with self.lock:
+            self.probe_in_flight = False
+    
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == self.OPEN:
+                return
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                # О повторном размыкании после неудачной пробы не сообщаем
+                if self.state == self.CLOSED:
+                    print(f"⚡ {self.failures} ошибок синтеза подряд: пауза запросов на {self.cooldown:g}с")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.probe_in_flight = False
+                self.trips += 1
+
+class ResilientSynthesizer(Synthesizer):
+    """Обертка синтезатора: повторы с экспоненциальной задержкой и размыкатель цепи
+
+    Неудачный запрос повторяется до attempts раз с задержкой
+    base_delay * 2^n (не больше max_delay) со случайным разбросом ("full
+    jitter"), чтобы потоки не повторяли запросы одновременно. Повторы за
+    весь запуск ограничены бюджетом retry_budget: при массовом сбое сервис
+    не засыпается повторами. Общий CircuitBreaker приостанавливает новые
+    запросы после серии ошибок. Все режимы генерации работают через
+    synthesize()/synthesize_async(), поэтому защита у них общая.
+    """
+    
+    # Ошибки в самом запросе (неподдерживаемый язык, пустой текст) не повторяются
+    NON_RETRYABLE = (ValueError, AssertionError)
+    
+    def __init__(self, synthesizer, attempts=3, base_delay=0.5, max_delay=8.0,
+                 retry_budget=100, breaker_threshold=5, breaker_cooldown=10.0):
+        self.synthesizer = synthesizer
+        self.name = synthesizer.name
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_budget = retry_budget
+        self.retries_left = retry_budget
+        self.retries = 0
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_cooldown)
+        self.lock = threading.Lock()
+    
+    def fingerprint(self):
+        return self.synthesizer.fingerprint()
+    
+    def backoff(self, attempt):
+        """Задержка перед повтором номер attempt (с нуля)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+    
+    def _should_retry(self, error, attempt):
+        """Учитывает ошибку и решает, тратить ли на нее повтор из бюджета"""
+        if isinstance(error, self.NON_RETRYABLE):
+            self.breaker.cancel_probe()
+            return False
+        self.breaker.record_failure()
+        if attempt + 1 >= self.attempts:
+            return False
+        with self.lock:
+            if self.retries_left <= 0:
+                return False
+            self.retries_left -= 1
+            self.retries += 1
+        return True
+    
+    def synthesize(self, text, language='ru', slow=False):
+        attempt = 0
+        while True:
+            wait = self.breaker.wait_time()
+            while wait > 0:
+                with TRACER.span('breaker_wait', word=text):
+                    time.sleep(wait)
+                wait = self.breaker.wait_time()
+            try:
+                audio_data = self.synthesizer.synthesize(text, language, slow)
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    raise
+                TRACER.count('retries')
+                with TRACER.span('backoff', word=text):
+                    time.sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return audio_data
+    
+    async def synthesize_async(self, text, language='ru', slow=False):
+        attempt = 0
+        while True:
+            wait = self.breaker.wait_time()
+            while wait > 0:
+                with TRACER.span('breaker_wait', asynchronous=True, word=text):
+                    await asyncio.sleep(wait)
+                wait = self.breaker.wait_time()
+            try:
+                audio_data = await self.synthesizer.synthesize_async(text, language, slow)
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    raise
+                TRACER.count('retries')
+                with TRACER.span('backoff', asynchronous=True, word=text):
+                    await asyncio.sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return audio_data
+    
+    def summary(self):
+        """Строка статистики повторов за запуск"""
+        text = f"повторов {self.retries} (бюджет {self.retry_budget}, осталось {self.retries_left})"
+        if self.breaker.trips:
+            text += f", пауз после серии ошибок: {self.breaker.trips}"
+        return text
+
+SYNTHESIZERS = {
+    'gtts': GTTSSynthesizer,
+    'fake': FakeSynthesizer,
+    'http': HttpSynthesizer,
+}
+
+def create_synthesizer(name='gtts', **options):
+    """Создает синтезатор по имени из настроек"""
+    if name not in SYNTHESIZERS:
+        raise ValueError(f"Неизвестный синтезатор: {name}")
+    return SYNTHESIZERS[name](**options)
+
+DEFAULT_SYNTHESIZER = GTTSSynthesizer()
@@ -0,0 +1,238 @@
+"""Трассировка запуска: интервалы по операциям, счетчики, сводка и выгрузка"""
+
+import contextlib
+import json
+import math
+import os
+import threading
+import time
+
+class Tracer:
+    """Инструментирование запуска: интервалы (spans) и счетчики
+
+    По умолчанию выключен, и span() почти ничего не стоит. Включенный
+    трассировщик запоминает для каждого интервала имя, поток, начало,
+    длительность и аргументы (обычно слово). В конце запуска печатается
+    сводная таблица: где тратится время, самые долгие слова и загрузка
+    потоков; события выгружаются в формате Chrome Trace (chrome://tracing,
+    Perfetto) или JSON Lines (файл *.jsonl).
+    
+    Асинхронные интервалы (корутины, ожидание в очереди пула) могут
+    пересекаться в одном потоке и в загрузку потоков не входят, как и
+    интервалы ожидания из IDLE_SPANS.
+    """
+    
+    NOOP = contextlib.nullcontext()
+    IDLE_SPANS = ('queue_wait', 'pause', 'backoff', 'breaker_wait')
+    
+    def __init__(self):
+        self.enabled = False
+        self.events = []    # (имя, поток, начало, длительность, аргументы, асинхронный, верхний уровень)
+        self.counters = {}
+        self.thread_names = {}
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+        self.local = threading.local()
+    
+    def enable(self):
+        """Включает трассировку и начинает запуск заново"""
+        with self.lock:
+            self.enabled = True
+            self.events = []
+            self.counters = {}
+            self.thread_names = {}
+            self.started = time.perf_counter()
+    
+    def span(self, name, asynchronous=False, **args):
+        """Контекстный менеджер, измеряющий интервал"""
+        if not self.enabled:
+            return self.NOOP
+        return self._span(name, asynchronous, args)
+    
+    @contextlib.contextmanager
+    def _span(self, name, asynchronous, args):
+        depth = 0 if asynchronous else getattr(self.local, 'depth', 0)
+        if not asynchronous:
+            self.local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            if not asynchronous:
+                self.local.depth = depth
+            self.record(name, start, duration, asynchronous, depth == 0, **args)
+    
+    def record(self, name, start, duration, asynchronous=False, top_level=True, **args):
+        """Добавляет уже измеренный интервал"""
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        with self.lock:
+            self.thread_names[thread.ident] = thread.name
+            self.events.append((name, thread.ident, start, duration, args, asynchronous, top_level))
+    
+    def count(self, name, value=1):
+        """Увеличивает счетчик"""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+    
+    def queued(self, function, **args):
+        """Оборачивает задачу пула: время от постановки в очередь до запуска - queue_wait"""
+        if not self.enabled:
+            return function
+        submitted = time.perf_counter()
+        
+        def run(*call_args, **call_kwargs):
+            self.record('queue_wait', submitted, time.perf_counter() - submitted, True, **args)
+            return function(*call_args, **call_kwargs)
+        return run
+    
+    def summary_rows(self):
+        """Строки сводки по операциям: (имя, число, всего с, среднее, p95, максимум в мс)"""
+        with self.lock:
+            events = list(self.events)
+        durations = {}
+        for name, _, _, duration, _, _, _ in events:
+            durations.setdefault(name, []).append(duration)
+        rows = []
+        for name, values in durations.items():
+            values.sort()
+            p95 = values[max(0, math.ceil(0.95 * len(values)) - 1)]
+            rows.append((name, len(values), sum(values), sum(values) / len(values) * 1000,
+                         p95 * 1000, values[-1] * 1000))
+        rows.sort(key=lambda row: -row[2])
+        return rows
+    
+    def thread_utilization(self):
+        """Загрузка потоков по группам (пул ThreadPoolExecutor-N - одна группа)
+
+        Возвращает (группа, потоков, занято с, окно с, доля), где окно - от
+        первого до последнего интервала группы.
+        """
+        with self.lock:
+            events = list(self.events)
+            thread_names = dict(self.thread_names)
+        groups = {}
+        for name, thread, start, duration, _, asynchronous, top_level in events:
+            if asynchronous or not top_level or name in self.IDLE_SPANS:
+                continue
+            group_name = thread_names.get(thread, str(thread)).rsplit('_', 1)[0]
+            group = groups.setdefault(group_name, {'threads': set(), 'busy': 0.0,
+                                                   'first': start, 'last': start + duration})
+            group['threads'].add(thread)
+            group['busy'] += duration
+            group['first'] = min(group['first'], start)
+            group['last'] = max(group['last'], start + duration)
+        result = []
+        for group_name, group in groups.items():
+            window = group['last'] - group['first']
+            capacity = window * len(group['threads'])
+            result.append((group_name, len(group['threads']), group['busy'], window,
+                           group['busy'] / capacity if capacity else 0.0))
+        return result
+    
+    def slowest_words(self, top=5):
+        """Слова, на которые ушло больше всего времени, с разбивкой по операциям"""
+        with self.lock:
+            events = list(self.events)
+        words = {}
+        for name, _, _, duration, args, asynchronous, _ in events:
+            if asynchronous or args.get('word') is None or name in self.IDLE_SPANS:
+                continue
+            parts = words.setdefault(args['word'], {})
+            parts[name] = parts.get(name, 0.0) + duration
+        return sorted(words.items(), key=lambda item: -sum(item[1].values()))[:top]
+    
+    def print_summary(self):
+        """Печатает таблицу: где тратятся секунды запуска"""
+        rows = self.summary_rows()
+        if not rows:
+            return
+        wall_time = time.perf_counter() - self.started
+        print(f"\n⏱️ ТРАССИРОВКА ЗАПУСКА ({wall_time:.1f}с):")
+        print(f"   {'операция':<16} {'раз':>6} {'всего, с':>9} {'сред, мс':>9} {'p95, мс':>9} {'макс, мс':>9}")
+        for name, count, total, mean, p95, maximum in rows:
+            print(f"   {name:<16} {count:>6} {total:>9.3f} {mean:>9.1f} {p95:>9.1f} {maximum:>9.1f}")
+        
+        utilization = self.thread_utilization()
+        if utilization:
+            print("   🧵 Загрузка потоков:")
+            for group_name, threads, busy, window, share in sorted(utilization, key=lambda row: -row[2]):
+                print(f"      {group_name}: потоков {threads}, занято {busy:.2f}с за {window:.2f}с ({share:.0%})")
+        
+        slowest = self.slowest_words()
+        if slowest:
+            print("   🐢 Самые долгие слова:")
+            for word, parts in slowest:
+                largest = sorted(parts.items(), key=lambda item: -item[1])[:3]
+                details = ", ".join(f"{name} {seconds * 1000:.0f} мс" for name, seconds in largest)
+                print(f"      {word}: {sum(parts.values()):.2f}с ({details})")
+        
+        with self.lock:
+            counters = dict(self.counters)
+        if counters:
+            print("   🔢 Счетчики: " + ", ".join(f"{name}={value:g}" for name, value in sorted(counters.items())))
+    
+    def export(self, filename):
+        """Выгружает события: *.jsonl - JSON Lines, иначе Chrome Trace"""
+        with self.lock:
+            events = list(self.events)
+            counters = dict(self.counters)
+            thread_names = dict(self.thread_names)
+        
+        try:
+            with open(filename, 'w', encoding='utf-8') as f:
+                if filename.endswith('.jsonl'):
+                    for name, thread, start, duration, args, asynchronous, _ in events:
+                        f.write(json.dumps({
+                            'name': name,
+                            'thread': thread_names.get(thread, str(thread)),
+                            'start_ms': round((start - self.started) * 1000, 3),
+                            'duration_ms': round(duration * 1000, 3),
+                            'async': asynchronous,
+                            'args': args,
+                        }, ensure_ascii=False) + '\n')
+                    f.write(json.dumps({'counters': counters}, ensure_ascii=False) + '\n')
+                else:
+                    json.dump({'traceEvents': self.chrome_events(events, counters, thread_names),
+                               'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+            print(f"💾 Трасса сохранена в {filename} ({len(events)} событий)")
+        except OSError as e:
+            print(f"❌ Ошибка сохранения трассы: {e}")
+    
+    def chrome_events(self, events, counters, thread_names):
+        """События в формате Chrome Trace Event (время в микросекундах)"""
+        pid = os.getpid()
+        trace = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': thread, 'args': {'name': name}}
+            for thread, name in thread_names.items()
+        ]
+        end = 0.0
+        for event_id, (name, thread, start, duration, args, asynchronous, _) in enumerate(events):
+            timestamp = (start - self.started) * 1e6
+            end = max(end, timestamp + duration * 1e6)
+            if asynchronous:
+                # Пересекающиеся интервалы - асинхронные события с общим id
+                common = {'name': name, 'cat': 'async', 'id': event_id, 'pid': pid, 'tid': thread}
+                trace.append(dict(common, ph='b', ts=timestamp, args=args))
+                trace.append(dict(common, ph='e', ts=timestamp + duration * 1e6))
+            else:
+                trace.append({'name': name, 'cat': 'run', 'ph': 'X', 'ts': timestamp,
+                              'dur': duration * 1e6, 'pid': pid, 'tid': thread, 'args': args})
+        if counters:
+            trace.append({'name': 'counters', 'ph': 'C', 'ts': end, 'pid': pid, 'args': counters})
+        return trace
+    
+    def report(self, trace_file=None):
+        """Итог запуска: сводная таблица и, если задан файл, выгрузка событий"""
+        if not self.enabled:
+            return
+        self.print_summary()
+        if trace_file:
+            self.export(trace_file)
+
+# Общий трассировщик; включается настройкой 'trace'
+TRACER = Tracer()
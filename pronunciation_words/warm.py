@@ -0,0 +1,241 @@
+"""Прогрев кэша в нескольких процессах с шардами и контрольной точкой"""
+
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import queue
+import shutil
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import AudioCache
+from .generation import generate_single_audio
+from .synthesis import ResilientSynthesizer, create_synthesizer
+from .words import deduplicate_words, read_words_from_file
+
+# Как часто проверять, живы ли рабочие процессы, пока результатов нет
+RESULT_POLL = 5.0
+
+def warm_shard(shard_file, tasks, slow, synthesizer_name, synthesizer_options, resilience,
+               threads, save_every):
+    """Заполняет один шард кэша (выполняется в отдельном процессе)
+
+    Шард сохраняется каждые save_every слов, поэтому он же служит точкой
+    восстановления: при повторном запуске уже готовые слова пропускаются.
+    Возвращает (сгенерировано, пропущено, список неудачных (слово, язык)).
+    """
+    synthesizer = ResilientSynthesizer(
+        create_synthesizer(synthesizer_name, **synthesizer_options), **resilience
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        shard = AudioCache(shard_file, legacy_file=shard_file + '.none',
+                           provenance=synthesizer.fingerprint())
+    todo = [(word, language) for word, language in tasks if not shard.contains(word, language, slow)]
+    skipped = len(tasks) - len(todo)
+    name = os.path.basename(shard_file)
+    generated = 0
+    failed = []
+    
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for chunk_start in range(0, len(todo), save_every):
+            chunk = todo[chunk_start:chunk_start + save_every]
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = list(executor.map(
+                    lambda task: generate_single_audio(task[0], task[1], slow, shard, synthesizer),
+                    chunk
+                ))
+                shard.save_cache()
+            for (word, language), (_, _, success, _) in zip(chunk, results):
+                if success:
+                    generated += 1
+                else:
+                    failed.append((word, language))
+            print(f"   🔥 {name}: {chunk_start + len(chunk)}/{len(todo)}")
+    
+    return generated, skipped, failed
+
+def warm_shard_process(result_queue, shard_file, tasks, *args):
+    """Точка входа рабочего процесса прогрева: (шард, результат) передается через очередь"""
+    # Ctrl+C обрабатывает главный процесс
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        result = warm_shard(shard_file, tasks, *args)
+    except Exception as e:
+        print(f"❌ Ошибка прогрева {os.path.basename(shard_file)}: {e}")
+        result = (0, 0, list(tasks))
+    result_queue.put((shard_file, result))
+
+def collect_results(result_queue, workers, poll_interval=RESULT_POLL):
+    """Собирает результаты рабочих процессов: {шард: результат или None}
+
+    None - процесс завершился, не передав результат (убит системой, упал
+    в нативной библиотеке). Такие процессы обнаруживаются при опросе раз
+    в poll_interval секунд, поэтому прогрев не зависает.
+    """
+    results = {}
+    while len(results) < len(workers):
+        try:
+            shard_file, result = result_queue.get(timeout=poll_interval)
+            results[shard_file] = result
+            continue
+        except queue.Empty:
+            pass
+        dead = [(worker, shard_file) for worker, shard_file, _ in workers
+                if shard_file not in results and not worker.is_alive()]
+        if not dead:
+            continue
+        # Результат мог прийти перед самым завершением процесса
+        try:
+            while True:
+                shard_file, result = result_queue.get(timeout=0.5)
+                results[shard_file] = result
+        except queue.Empty:
+            pass
+        for worker, shard_file in dead:
+            if shard_file not in results:
+                print(f"❌ Процесс {os.path.basename(shard_file)} завершился без результата "
+                      f"(код {worker.exitcode}), прогресс шарда сохранен для продолжения")
+                results[shard_file] = None
+    return results
+
+def checkpoint_differences(checkpoint, word_files, languages, slow):
+    """Чем параметры точки восстановления отличаются от текущего запуска"""
+    differences = []
+    if 'files' in checkpoint and (sorted(map(os.path.abspath, checkpoint['files']))
+                                  != sorted(map(os.path.abspath, word_files))):
+        differences.append(f"файлы {', '.join(checkpoint['files'])}")
+    if 'languages' in checkpoint and sorted(checkpoint['languages']) != sorted(languages):
+        differences.append(f"языки {', '.join(checkpoint['languages'])}")
+    if 'slow' in checkpoint and checkpoint['slow'] != slow:
+        differences.append("медленная речь" if checkpoint['slow'] else "обычная речь")
+    return differences
+
+def warm_cache(word_files, languages, processes=None, threads=4, slow=False,
+               synthesizer_name='gtts', synthesizer_options=None, resilience=None, cache=None,
+               checkpoint_file='warm_checkpoint.json', shard_dir='warm_shards', save_every=50):
+    """Неинтерактивный прогрев кэша для больших словарей
+
+    Работа делится по шардам между процессами; каждый процесс пишет в свой
+    шард кэша, в конце шарды сливаются в основной кэш. Уже закэшированные
+    слова пропускаются. Прерванный запуск продолжается с места остановки:
+    параметры разбиения хранятся в checkpoint_file, а готовые слова - в шардах.
+    Если файлы, языки или скорость не совпадают с точкой восстановления,
+    запуск отклоняется (ValueError), а не продолжает чужие шарды.
+    """
+    synthesizer_options = synthesizer_options or {}
+    words = []
+    for filename in word_files:
+        words.extend(read_words_from_file(filename))
+    unique_words, _ = deduplicate_words(words)
+    
+    cache = cache or AudioCache()
+    tasks = [
+        (word, language) for language in languages for word in unique_words
+        if not cache.contains(word, language, slow)
+    ]
+    print(f"📖 Слов: {len(unique_words)}, языков: {len(languages)}, "
+          f"уже в кэше: {len(unique_words) * len(languages) - len(tasks)}, к генерации: {len(tasks)}")
+    
+    # Точка восстановления фиксирует число шардов, чтобы слово попало в тот же шард
+    checkpoint = {}
+    if os.path.exists(checkpoint_file):
+        with open(checkpoint_file, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+        differences = checkpoint_differences(checkpoint, word_files, languages, slow)
+        if differences:
+            raise ValueError(
+                f"{checkpoint_file} остался от прогрева с другими параметрами ({'; '.join(differences)}). "
+                f"Повторите тот прогрев или удалите {checkpoint_file} и {shard_dir}"
+            )
+        print(f"♻️ Продолжение прерванного прогрева ({checkpoint['shards']} шардов)")
+    shard_count = checkpoint.get('shards') or processes or os.cpu_count() or 1
+    if processes and processes != shard_count:
+        print(f"ℹ️ Число процессов берется из точки восстановления: {shard_count}")
+    checkpoint = {
+        'shards': shard_count,
+        'files': list(word_files),
+        'languages': list(languages),
+        'slow': slow,
+        'started': checkpoint.get('started', time.strftime('%Y-%m-%dT%H:%M:%S')),
+    }
+    os.makedirs(shard_dir, exist_ok=True)
+    with open(checkpoint_file, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, indent=2, ensure_ascii=False)
+    
+    shard_tasks = [[] for _ in range(shard_count)]
+    for word, language in tasks:
+        shard_number = int(cache.get_cache_key(word, language, slow), 16) % shard_count
+        shard_tasks[shard_number].append((word, language))
+    shard_files = [os.path.join(shard_dir, f"shard_{i}.seg") for i in range(shard_count)]
+    
+    # Бюджет повторов рассчитан на весь запуск и делится между шардами
+    shard_resilience = dict(resilience or {})
+    if 'retry_budget' in shard_resilience:
+        shard_resilience['retry_budget'] = shard_resilience['retry_budget'] // shard_count
+    
+    start = time.time()
+    generated = skipped = 0
+    failed = []
+    # По процессу на шард. Ctrl+C обрабатывает только главный процесс: он
+    # останавливает рабочие, а сохраненный прогресс шардов используется при
+    # следующем запуске (недописанная запись индекса при загрузке отбрасывается)
+    result_queue = multiprocessing.Queue()
+    workers = [
+        (multiprocessing.Process(target=warm_shard_process, args=(
+            result_queue, shard_file, shard_task, slow, synthesizer_name,
+            synthesizer_options, shard_resilience, threads, save_every
+        )), shard_file, shard_task)
+        for shard_file, shard_task in zip(shard_files, shard_tasks) if shard_task
+    ]
+    lost = set()  # шарды, процесс которых завершился без результата
+    try:
+        for worker, _, _ in workers:
+            worker.start()
+        results = collect_results(result_queue, workers, RESULT_POLL)
+        for _, shard_file, shard_task in workers:
+            if results[shard_file] is None:
+                lost.add(shard_file)
+                failed.extend(shard_task)
+                continue
+            shard_generated, shard_skipped, shard_failed = results[shard_file]
+            generated += shard_generated
+            skipped += shard_skipped
+            failed.extend(shard_failed)
+    except KeyboardInterrupt:
+        for worker, _, _ in workers:
+            if worker.is_alive():
+                worker.terminate()
+        print("\n⏸️ Прогрев прерван. Прогресс сохранен, повторите команду для продолжения")
+        raise
+    finally:
+        for worker, _, _ in workers:
+            if worker.pid is not None:
+                worker.join()
+    
+    print(f"🔀 Слияние {shard_count - len(lost)} шардов в основной кэш...")
+    merged = 0
+    for shard_file in shard_files:
+        if shard_file in lost or not os.path.exists(shard_file):
+            continue
+        with contextlib.redirect_stdout(io.StringIO()):
+            shard = AudioCache(shard_file, legacy_file=shard_file + '.none')
+        merged += cache.merge_from(shard)
+        for path in (shard.cache_file, shard.index_file, shard.usage_file):
+            if os.path.exists(path):
+                os.remove(path)
+    
+    # Шарды упавших процессов остаются вместе с точкой восстановления
+    if lost:
+        print(f"⏸️ Шардов без результата: {len(lost)}. Повторите команду, чтобы продолжить их прогрев")
+    else:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+        os.remove(checkpoint_file)
+    
+    print(f"✅ Прогрев завершен за {time.time() - start:.1f}с: сгенерировано {generated}, "
+          f"восстановлено из шардов {skipped}, добавлено в кэш {merged}, ошибок {len(failed)}")
+    for word, language in failed[:20]:
+        print(f"   ✗ {word} ({language})")
+    return failed
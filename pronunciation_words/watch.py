@@ -0,0 +1,216 @@
+"""Наблюдение за файлами слов: генерация только добавленных и измененных строк
+
+Манифест помнит для каждого файла размер, время изменения и уже обработанные
+слова. Неизмененный файл даже не читается, а после правки синтезируются и
+кэшируются только новые слова; слова удаленных строк убираются из текущей
+сессии. Стоимость обновления зависит от размера правки, а не от длины списка.
+"""
+
+import json
+import os
+import time
+
+from .session import generate_words
+from .words import deduplicate_words, read_words_from_file
+
+class WordManifest:
+    """Обработанные строки файлов со словами
+
+    signature описывает параметры генерации (язык, скорость, синтезатор):
+    при их смене обработанные слова больше не считаются готовыми.
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, manifest_file='watch_manifest.json', signature=''):
+        self.manifest_file = manifest_file
+        self.signature = signature
+        self.files = {}  # путь -> {'mtime_ns', 'size', 'words'}
+        self.failed = []  # слова, которые не удалось получить в прошлый раз
+        self.load()
+    
+    def load(self):
+        try:
+            if not os.path.exists(self.manifest_file):
+                return
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != self.VERSION or data.get('signature') != self.signature:
+                print("🔄 Параметры генерации изменились, все слова будут проверены заново")
+                return
+            self.files = data.get('files', {})
+            self.failed = data.get('failed', [])
+        except Exception as e:
+            print(f"❌ Ошибка загрузки манифеста: {e}")
+    
+    def save(self):
+        try:
+            data = json.dumps({
+                'version': self.VERSION,
+                'signature': self.signature,
+                'files': self.files,
+                'failed': self.failed,
+            }, ensure_ascii=False, separators=(',', ':'))
+            temp_file = self.manifest_file + '.tmp'
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(temp_file, self.manifest_file)
+        except Exception as e:
+            print(f"❌ Ошибка сохранения манифеста: {e}")
+    
+    def matches(self, path, stat):
+        """Файл не менялся с момента обработки"""
+        entry = self.files.get(path)
+        if entry is None or stat is None:
+            return entry is None and stat is None
+        return entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size
+    
+    def words(self, path):
+        entry = self.files.get(path)
+        return entry['words'] if entry else []
+    
+    def update(self, path, stat, words):
+        if stat is None:
+            self.files.pop(path, None)
+        else:
+            self.files[path] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'words': words}
+
+def stat_file(path):
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+class WatchSession:
+    """Слова из наблюдаемых файлов и их аудио в текущем запуске
+
+    При первой проверке обработанные слова сверяются с кэшем: слова, аудио
+    которых с тех пор удалено (очистка или вытеснение), создаются заново.
+    """
+    
+    def __init__(self, files, settings_manager, cache, manifest):
+        self.files = [os.path.abspath(path) for path in files]
+        self.settings_manager = settings_manager
+        self.cache = cache
+        self.manifest = manifest
+        self.audio = {}  # слово -> аудио; только слова, полученные в этом запуске
+        self.first_sync = True
+    
+    def changed_files(self):
+        return [path for path in self.files if not self.manifest.matches(path, stat_file(path))]
+    
+    def wait_until_stable(self, paths, settle=0.3):
+        """Ждет, пока редактор допишет файлы: размер и время перестают меняться"""
+        previous = None
+        while True:
+            current = [(stat.st_mtime_ns, stat.st_size) if stat else None
+                       for stat in map(stat_file, paths)]
+            if current == previous:
+                return
+            previous = current
+            time.sleep(settle)
+    
+    def missing_words(self):
+        """Обработанные слова, которых больше нет в кэше"""
+        language = self.settings_manager.get('language')
+        slow = self.settings_manager.get('speed_factor') < 0.8
+        processed = dict.fromkeys(word for path in self.files for word in self.manifest.words(path))
+        return [word for word in processed if not self.cache.contains(word, language, slow)]
+    
+    def sync(self):
+        """Обрабатывает изменения файлов; возвращает (добавленные слова, удаленные слова)"""
+        changed = self.changed_files()
+        missing = self.missing_words() if self.first_sync else []
+        if missing:
+            print(f"♻️ Нет в кэше {len(missing)} обработанных слов, они будут созданы заново")
+        if not changed and not missing and not (self.first_sync and self.manifest.failed):
+            self.first_sync = False
+            return [], []
+        self.wait_until_stable(changed)
+        
+        processed = {word for path in self.files for word in self.manifest.words(path)}
+        stats = {}
+        current = {}
+        for path in self.files:
+            if path in changed:
+                stats[path] = stat_file(path)
+                current[path] = read_words_from_file(path) if stats[path] else []
+            else:
+                current[path] = self.manifest.words(path)
+        present = {word for words in current.values() for word in words}
+        
+        # Новые строки, слова, не полученные в прошлый раз, и пропавшие из кэша
+        retry = set(self.manifest.failed) | set(missing)
+        candidates = [word for path in self.files for word in current[path]
+                      if word not in processed or word in retry]
+        added, _ = deduplicate_words(candidates)
+        removed = sorted(processed - present)
+        
+        failed = []
+        if added:
+            print(f"➕ Новых или измененных слов: {len(added)}")
+            audio_data = generate_words(self.settings_manager, added, self.cache)
+            for word, audio in zip(added, audio_data):
+                if audio is None:
+                    failed.append(word)
+                else:
+                    self.audio[word] = audio
+        for word in removed:
+            self.audio.pop(word, None)
+        if removed:
+            print(f"➖ Удалено слов: {len(removed)} ({', '.join(removed[:10])}{'...' if len(removed) > 10 else ''})")
+        
+        for path in changed:
+            self.manifest.update(path, stats[path], current[path])
+        self.manifest.failed = [word for word in failed if word in present]
+        self.manifest.save()
+        if added:
+            self.cache.save_cache()
+        self.first_sync = False
+        return [word for word in added if word in self.audio], removed
+
+def make_manifest_signature(settings_manager, cache):
+    return (f"{settings_manager.get('language')}|{settings_manager.get('speed_factor') < 0.8}|"
+            f"{cache.provenance_id.hex()}")
+
+def watch_words(files, settings_manager, cache, pcm_cache=None, interval=1.0, play=False, once=False,
+                manifest_file='watch_manifest.json'):
+    """Следит за файлами слов и генерирует только изменения
+
+    once - обработать изменения один раз и выйти; play - прослушивать
+    добавленные слова сразу после генерации.
+    """
+    manifest = WordManifest(manifest_file, make_manifest_signature(settings_manager, cache))
+    session = WatchSession(files, settings_manager, cache, manifest)
+    print(f"👀 Наблюдение за {', '.join(files)} (проверка каждые {interval}с, Ctrl+C - выход)"
+          if not once else f"🔍 Проверка изменений в {', '.join(files)}")
+    
+    try:
+        while True:
+            start = time.perf_counter()
+            added, removed = session.sync()
+            if added or removed:
+                total = sum(len(manifest.words(path)) for path in session.files)
+                print(f"✅ Обновлено за {time.perf_counter() - start:.2f}с: +{len(added)} / -{len(removed)}, "
+                      f"всего строк {total}, в сессии {len(session.audio)} слов")
+                if play and added:
+                    from .playback import play_words_optimized
+                    play_words_optimized(
+                        [session.audio[word] for word in added], added,
+                        settings_manager.get('pause_duration'), settings_manager.get('speed_factor'),
+                        False, language=settings_manager.get('language'), pcm_cache=pcm_cache,
+                        loudness_target=settings_manager.get_loudness_target()
+                    )
+            elif once:
+                print("✅ Изменений нет")
+            if once:
+                break
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\n⏹️ Наблюдение остановлено")
+    finally:
+        manifest.save()
+        cache.save_cache()
+        if pcm_cache:
+            pcm_cache.save()
+    return session
@@ -0,0 +1,57 @@
+"""Чтение списка слов и удаление повторов"""
+
+def read_words_from_file(filename):
+    """Читает слова из файла и возвращает список"""
+    try:
+        with open(filename, 'r', encoding='utf-8') as file:
+            words = [line.strip() for line in file if line.strip()]
+        return words
+    except FileNotFoundError:
+        print(f"❌ Ошибка: Файл {filename} не найден!")
+        return []
+    except Exception as e:
+        print(f"❌ Ошибка при чтении файла: {e}")
+        return []
+
+def normalize_word(word):
+    """Канонический текст слова: без лишних пробелов внутри и по краям"""
+    return " ".join(word.split())
+
+def deduplicate_words(words):
+    """Сводит список к уникальным словам без учета регистра и пробелов
+
+    Возвращает (unique_words, index_map): для каждого слова исходного списка
+    index_map хранит номер его канонического варианта в unique_words.
+    Каноническим считается первое вхождение слова.
+    """
+    unique_words = []
+    index_map = []
+    positions = {}
+    for word in words:
+        text = normalize_word(word)
+        dedup_key = text.casefold()
+        if dedup_key not in positions:
+            positions[dedup_key] = len(unique_words)
+            unique_words.append(text)
+        index_map.append(positions[dedup_key])
+    return unique_words, index_map
+
+def expand_audio(unique_audio, index_map):
+    """Раздает аудио уникальных слов всем их вхождениям в исходном списке"""
+    return [unique_audio[i] for i in index_map]
+
+def print_deduplication_report(words, unique_words, index_map, cache=None, language='ru', slow=False):
+    """Показывает, сколько обращений к синтезу сэкономила дедупликация"""
+    duplicates = len(words) - len(unique_words)
+    if not duplicates:
+        return
+    
+    occurrences = [0] * len(unique_words)
+    for i in index_map:
+        occurrences[i] += 1
+    saved_synthesis = sum(
+        count - 1 for word, count in zip(unique_words, occurrences)
+        if count > 1 and not (cache and cache.contains(word, language, slow))
+    )
+    print(f"🧮 Уникальных слов: {len(unique_words)} из {len(words)}, "
+          f"повторов: {duplicates}, сэкономлено запросов синтеза: {saved_synthesis}")
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pronunciation_words.cache import AudioCache
+
+@pytest.fixture
+def make_cache(tmp_path):
+    """Создает AudioCache во временном каталоге"""
+    def make(name='audio_cache.seg', **options):
+        options.setdefault('provenance', 'fake:mp3')
+        return AudioCache(str(tmp_path / name), legacy_file=str(tmp_path / 'audio_cache.pkl'), **options)
+    return make
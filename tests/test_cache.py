@@ -0,0 +1,121 @@
+import os
+import pickle
+
+from pronunciation_words.cache import AudioCache, make_cache_key
+from pronunciation_words.synthesis import FakeSynthesizer
+
+MP3 = FakeSynthesizer().make_mp3(0.5)
+WAV = FakeSynthesizer(audio_format='wav').make_wav('кот')
+
+def test_round_trip(make_cache):
+    cache = make_cache()
+    cache.put('кот', MP3)
+    cache.put('кот', MP3, language='uk')
+    cache.put('дом', WAV)
+    cache.save_cache()
+    assert not cache.pending
+    
+    reopened = make_cache()
+    assert bytes(reopened.get('кот')) == MP3
+    assert bytes(reopened.get('кот', language='uk')) == MP3
+    assert bytes(reopened.get('дом')) == WAV
+    assert reopened.get('кот', slow=True) is None
+    # Одинаковое аудио хранится одним блобом, WAV - сжатым
+    assert len(reopened.index) == 3
+    assert len(reopened.blobs) == 2
+    wav_blob = reopened.blobs[reopened.content_digest(bytes.fromhex(make_cache_key('дом')))]
+    assert wav_blob[2] & AudioCache.FLAG_ZLIB
+    assert wav_blob[1] < len(WAV)
+
+def test_appends_only_new_entries(make_cache, tmp_path):
+    cache = make_cache()
+    cache.put('кот', MP3)
+    cache.save_cache()
+    size = os.path.getsize(tmp_path / 'audio_cache.seg')
+    cache.put('кот', MP3, language='uk')
+    cache.save_cache()
+    assert os.path.getsize(tmp_path / 'audio_cache.seg') == size
+    
+    cache.put('дом', WAV)
+    cache.save_cache()
+    assert len(make_cache().index) == 3
+
+def test_other_synthesizer_entries_are_misses(make_cache):
+    cache = make_cache()
+    cache.put('кот', MP3)
+    cache.save_cache()
+    assert not make_cache(provenance='gtts').contains('кот')
+    assert make_cache(provenance=None).contains('кот')
+
+def test_pickle_migration(make_cache, tmp_path):
+    with open(tmp_path / 'audio_cache.pkl', 'wb') as f:
+        pickle.dump({make_cache_key('кот'): MP3, make_cache_key('дом'): WAV}, f)
+    
+    cache = make_cache(provenance='gtts')
+    assert bytes(cache.get('кот')) == MP3
+    # WAV мог сделать только синтезатор-имитация: его происхождение неизвестно
+    assert not cache.contains('дом')
+    assert make_cache(provenance=None).contains('дом')
+    # Запущенный при миграции синтезатор не присваивает записи себе
+    assert not make_cache(provenance='fake:mp3').contains('кот')
+
+def test_v1_migration(make_cache, tmp_path):
+    segment = bytearray(AudioCache.V1_SEGMENT_MAGIC)
+    index = bytearray(AudioCache.V1_INDEX_MAGIC)
+    for word, audio in (('кот', MP3), ('дом', WAV)):
+        index += AudioCache.V1_INDEX_RECORD.pack(bytes.fromhex(make_cache_key(word)), len(segment), len(audio))
+        segment += audio
+    # Неполная запись прерванного сохранения отбрасывается
+    index += b'\x01' * 5
+    (tmp_path / 'audio_cache.seg').write_bytes(segment)
+    (tmp_path / 'audio_cache.idx').write_bytes(index)
+    
+    cache = make_cache(provenance=None)
+    assert bytes(cache.get('кот')) == MP3
+    assert bytes(cache.get('дом')) == WAV
+    assert not os.path.exists(tmp_path / 'audio_cache.seg.v1')
+    assert (tmp_path / 'audio_cache.idx').read_bytes().startswith(AudioCache.INDEX_MAGIC)
+    assert make_cache(provenance='gtts').contains('кот')
+
+def test_corrupt_entry_is_quarantined(make_cache, tmp_path):
+    cache = make_cache()
+    cache.put('кот', MP3)
+    cache.put('кит', MP3, language='uk')
+    cache.put('дом', FakeSynthesizer().make_mp3(0.3))
+    cache.save_cache()
+    
+    reopened = make_cache()
+    offset, length, _ = reopened.blobs[reopened.content_digest(bytes.fromhex(make_cache_key('кот')))]
+    with open(tmp_path / 'audio_cache.seg', 'r+b') as f:
+        f.seek(offset + length // 2)
+        f.write(b'\x55')
+    
+    damaged = make_cache()
+    assert damaged.get('кот') is None
+    # Карантин снимает все ключи поврежденного блоба
+    assert damaged.quarantined == 2
+    assert not damaged.contains('кит', language='uk')
+    assert damaged.get('дом') is not None
+    
+    # Карантин записан в индекс и переживает перезапуск
+    restarted = make_cache()
+    assert not restarted.contains('кот')
+    assert restarted.contains('дом')
+    restarted.put('кот', MP3)
+    restarted.save_cache()
+    assert bytes(make_cache().get('кот')) == MP3
+
+def test_eviction_keeps_hot_entries(make_cache):
+    cache = make_cache(max_entries=10)
+    for i in range(10):
+        cache.put(f"слово{i}", FakeSynthesizer().make_mp3(0.1 + i / 100))
+    cache.save_cache()
+    for _ in range(3):
+        cache.get('слово0')
+    cache.put('новое', MP3)
+    cache.save_cache()
+    
+    reopened = make_cache()
+    assert len(reopened.index) <= 9
+    assert reopened.contains('слово0')
+    assert reopened.contains('новое')
@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+from pronunciation_words import generation
+from pronunciation_words.generation import (AdaptiveConcurrency, GenerationStats, generate_audio_adaptive,
+                                            generate_audio_phrases)
+from pronunciation_words.synthesis import FakeSynthesizer
+
+WORDS = [f"слово{i}" for i in range(40)]
+
+def test_phrase_latency_is_measured_per_request(make_cache):
+    stats = GenerationStats()
+    synthesizer = FakeSynthesizer(latency=0.1, audio_format='wav')
+    start = time.perf_counter()
+    audio_data = generate_audio_phrases(WORDS, phrase_size=10, max_workers=1, cache=make_cache(),
+                                        synthesizer=synthesizer, stats=stats)
+    wall_time = time.perf_counter() - start
+    assert all(audio is not None for audio in audio_data)
+    assert len(synthesizer.attempts) == 4
+    # Четыре фразы идут одна за другой, но задержка слова - это время его фразы
+    assert stats.percentile(99) < wall_time / 2
+
+def test_failed_run_releases_claimed_words(make_cache, monkeypatch):
+    cache = make_cache()
+    waiters = []
+    
+    def broken_group_phrases(indices, words, phrase_size):
+        # Пока слова заявлены, их же ждет другой поток
+        waiters.append(cache.claim(words[0])[2])
+        raise RuntimeError("сбой группировки")
+    
+    monkeypatch.setattr(generation, 'group_phrases', broken_group_phrases)
+    with pytest.raises(RuntimeError):
+        generate_audio_phrases(WORDS[:5], cache=cache, synthesizer=FakeSynthesizer(latency=0))
+    assert not cache.in_flight
+    assert isinstance(waiters[0].exception(timeout=1), RuntimeError)
+
+def finish_window(controller, latency, success=True):
+    """Проводит через регулятор одно полное окно запросов с заданной задержкой"""
+    epochs = [controller.acquire() for _ in range(controller.limit)]
+    for epoch in epochs:
+        controller.release(epoch, latency, success)
+
+def test_adaptive_limit_grows_under_low_latency():
+    # Запас по задержке, чтобы планировщик потоков не выдавал себя за перегрузку
+    controller = AdaptiveConcurrency(initial=2, maximum=8, latency_tolerance=3)
+    audio_data = generate_audio_adaptive(WORDS, controller=controller,
+                                         synthesizer=FakeSynthesizer(latency=0.05, audio_format='wav'))
+    assert all(audio is not None for audio in audio_data)
+    assert controller.limit == 8
+    assert not controller.ceilings
+
+def test_adaptive_limit_halves_on_errors():
+    controller = AdaptiveConcurrency(initial=16, maximum=32)
+    audio_data = generate_audio_adaptive(WORDS, controller=controller,
+                                         synthesizer=FakeSynthesizer(latency=0.01, failure_rate=1.0))
+    assert all(audio is None for audio in audio_data)
+    assert controller.ceilings[:2] == [16, 8]
+    assert controller.limit <= 4
+
+def test_adaptive_limit_halves_on_latency_growth():
+    controller = AdaptiveConcurrency(initial=4, maximum=32)
+    finish_window(controller, 0.1)
+    assert controller.limit == 8
+    # Рост в пределах latency_tolerance перегрузкой не считается
+    finish_window(controller, 0.14)
+    assert controller.limit == 16
+    finish_window(controller, 0.2)
+    assert controller.limit == 8
+    assert controller.ceilings == [16]
+    # После первого снижения лимит растет по одному
+    finish_window(controller, 0.1)
+    assert controller.limit == 9
+
+def test_adaptive_limit_backs_off_when_service_is_overloaded():
+    controller = AdaptiveConcurrency(initial=16, maximum=32)
+    generate_audio_adaptive(WORDS * 2, controller=controller,
+                            synthesizer=FakeSynthesizer(latency=0.02, audio_format='wav', capacity=4))
+    assert controller.ceilings[0] == 16
+    assert controller.limit < 16
+    assert controller.optimum() < 16
@@ -0,0 +1,20 @@
+from pronunciation_words.lazy import LazySession
+from pronunciation_words.synthesis import FakeSynthesizer
+
+def test_each_word_is_counted_once(make_cache):
+    cache = make_cache()
+    words = [f"слово{i}" for i in range(10)]
+    session = LazySession(words, cache, synthesizer=FakeSynthesizer(latency=0), save_every=4)
+    assert (cache.hits, cache.misses) == (0, 0)
+    assert not cache.usage
+    
+    assert all(session.load(position) is not None for position in range(len(session)))
+    assert (cache.hits, cache.misses) == (0, 10)
+    cache.save_cache()
+    
+    # Второй проход читает записи по ссылкам на сегмент
+    session = LazySession(words, cache, synthesizer=FakeSynthesizer(latency=0))
+    assert session.cached == 10
+    assert all(session.load(position) is not None for position in range(len(session)))
+    assert (cache.hits, cache.misses) == (10, 10)
+    assert session.generated == 0
@@ -0,0 +1,24 @@
+from pronunciation_words.pack import AudioPack
+from pronunciation_words.synthesis import FakeSynthesizer
+
+def test_pack_round_trip(tmp_path):
+    fake = FakeSynthesizer(latency=0, audio_format='wav')
+    words = ['кот', 'дом', 'кот', 'лес']
+    audio_data = [fake.synthesize(word) for word in words[:3]] + [None]
+    filename = str(tmp_path / 'words.pack')
+    
+    original_bytes, pack_bytes, levels = AudioPack.write(filename, words, audio_data)
+    assert original_bytes == sum(len(audio) for audio in audio_data[:3])
+    assert pack_bytes < original_bytes
+    assert len(levels) == 3
+    
+    pack = AudioPack(filename)
+    try:
+        # Тишина по краям обрезана, одинаковые клипы хранятся один раз
+        assert bytes(pack.get('кот'))[:4] == b'RIFF'
+        assert len(pack.get('кот')) < len(audio_data[0])
+        assert len(pack.entries) == 2
+        assert pack.get('лес') is None
+        assert pack.get('кот', language='uk') is None
+    finally:
+        pack.close()
@@ -0,0 +1,52 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+pygame = pytest.importorskip('pygame')
+
+from concurrent.futures import ThreadPoolExecutor
+
+from pronunciation_words import playback
+from pronunciation_words.playback import SoundBank, time_stretch
+
+SAMPLE_RATE = 24000
+
+def dominant_frequency(samples):
+    spectrum = np.abs(np.fft.rfft(samples[:, 0] * np.hanning(len(samples))))
+    return np.fft.rfftfreq(len(samples), 1 / SAMPLE_RATE)[np.argmax(spectrum)]
+
+@pytest.mark.parametrize('speed', [0.85, 1.2, 2.0])
+def test_time_stretch_keeps_pitch(speed):
+    time_axis = np.arange(SAMPLE_RATE) / SAMPLE_RATE
+    tone = (10000 * np.sin(2 * np.pi * 440 * time_axis)).astype(np.int16)
+    samples = np.stack([tone, tone], axis=1)
+    
+    stretched = time_stretch(samples, speed)
+    assert stretched.dtype == np.int16
+    assert stretched.shape[1] == 2
+    assert len(stretched) == pytest.approx(len(samples) / speed, rel=0.05)
+    assert dominant_frequency(stretched) == pytest.approx(440, abs=5)
+
+def test_time_stretch_at_normal_speed_returns_input():
+    samples = np.zeros((100, 1), dtype=np.int16)
+    assert time_stretch(samples, 1.0) is samples
+
+def test_temp_file_fallback_uses_unique_names(monkeypatch):
+    def unsupported(audio_buffer):
+        raise pygame.error("формат не поддерживается")
+    
+    indices = []
+    
+    def load_sound(audio_buffer, temp_dir, index):
+        indices.append(index)
+        return object()
+    
+    monkeypatch.setattr(playback, 'decode_sound', unsupported)
+    monkeypatch.setattr(playback, 'load_sound', load_sound)
+    sound_bank = SoundBank()
+    try:
+        # Параллельные загрузки до того, как звуки попадут в банк
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda i: sound_bank.get_sound(f"слово{i}", b'audio'), range(32)))
+    finally:
+        sound_bank.close()
+    assert sorted(indices) == list(range(32))
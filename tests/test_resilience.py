@@ -0,0 +1,118 @@
+import asyncio
+import time
+
+import pytest
+
+from pronunciation_words.synthesis import CircuitBreaker, FakeSynthesizer, ResilientSynthesizer, Synthesizer
+
+def attempts_of(fake, word):
+    return fake.attempts.get(f"{word}_ru_False", 0)
+
+def test_retries_until_success():
+    fake = FakeSynthesizer(latency=0, failure_rate=0.5, seed=1)
+    synthesizer = ResilientSynthesizer(fake, attempts=10, base_delay=0, retry_budget=100,
+                                       breaker_threshold=100)
+    
+    words = [f"слово{i}" for i in range(20)]
+    for word in words:
+        assert synthesizer.synthesize(word)
+    assert synthesizer.retries > 0
+    assert synthesizer.retries == sum(attempts_of(fake, word) - 1 for word in words)
+
+def test_retry_budget_is_shared_by_all_requests():
+    fake = FakeSynthesizer(latency=0, failure_rate=1.0)
+    synthesizer = ResilientSynthesizer(fake, attempts=3, base_delay=0, retry_budget=2,
+                                       breaker_threshold=100)
+    
+    with pytest.raises(ConnectionError):
+        synthesizer.synthesize('первое')
+    assert attempts_of(fake, 'первое') == 3
+    assert synthesizer.retries_left == 0
+    
+    # Бюджет исчерпан: следующее слово не повторяется
+    with pytest.raises(ConnectionError):
+        synthesizer.synthesize('второе')
+    assert attempts_of(fake, 'второе') == 1
+    assert synthesizer.retries == 2
+
+def test_request_errors_are_not_retried():
+    class BrokenSynthesizer(Synthesizer):
+        calls = 0
+        
+        def synthesize(self, text, language='ru', slow=False):
+            self.calls += 1
+            raise ValueError("неподдерживаемый язык")
+    
+    broken = BrokenSynthesizer()
+    synthesizer = ResilientSynthesizer(broken, attempts=5, base_delay=0)
+    with pytest.raises(ValueError):
+        synthesizer.synthesize('слово')
+    assert broken.calls == 1
+    assert synthesizer.retries == 0
+    assert synthesizer.breaker.state == CircuitBreaker.CLOSED
+
+def test_async_retry_budget():
+    fake = FakeSynthesizer(latency=0, failure_rate=1.0)
+    synthesizer = ResilientSynthesizer(fake, attempts=4, base_delay=0, retry_budget=3,
+                                       breaker_threshold=100)
+    
+    async def run():
+        for word in ('раз', 'два'):
+            with pytest.raises(ConnectionError):
+                await synthesizer.synthesize_async(word)
+    
+    asyncio.run(run())
+    assert attempts_of(fake, 'раз') == 4
+    assert attempts_of(fake, 'два') == 1
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=0.05)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.wait_time() == 0
+    
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.trips == 1
+    assert 0 < breaker.wait_time() <= 0.05
+
+def test_breaker_half_open_probe():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    
+    # После паузы пропускается один пробный запрос, остальные ждут
+    assert breaker.wait_time() == 0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.wait_time() == CircuitBreaker.PROBE_POLL
+    
+    # Неудачная проба снова размыкает цепь
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.trips == 2
+    assert breaker.wait_time() > 0
+    
+    time.sleep(0.06)
+    assert breaker.wait_time() == 0
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.wait_time() == 0
+
+def test_breaker_pauses_requests_after_failures():
+    fake = FakeSynthesizer(latency=0, failure_rate=1.0)
+    synthesizer = ResilientSynthesizer(fake, attempts=1, retry_budget=0, breaker_threshold=2,
+                                       breaker_cooldown=0.2)
+    for word in ('раз', 'два'):
+        with pytest.raises(ConnectionError):
+            synthesizer.synthesize(word)
+    assert synthesizer.breaker.state == CircuitBreaker.OPEN
+    
+    fake.failure_rate = 0.0
+    start = time.monotonic()
+    assert synthesizer.synthesize('три')
+    assert time.monotonic() - start >= 0.15
+    assert synthesizer.breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,60 @@
+from pronunciation_words.review import MIN_EASE, QUALITY_GOOD, QUALITY_HARD, ReviewStore
+
+DAY = 740000
+
+def test_intervals_grow_by_sm2(tmp_path):
+    store = ReviewStore(str(tmp_path / 'review_state.json'))
+    day = DAY
+    intervals = []
+    for _ in range(4):
+        intervals.append(store.record('кот', QUALITY_GOOD, day=day))
+        day += intervals[-1]
+    assert intervals == [1, 6, 15, 38]
+    assert store.get_entry('кот') == [4, 250, 38, day, 0]
+
+def test_lapse_resets_interval(tmp_path):
+    store = ReviewStore(str(tmp_path / 'review_state.json'))
+    for day in (DAY, DAY + 1, DAY + 7):
+        store.record('кот', QUALITY_GOOD, day=day)
+    assert store.record('кот', QUALITY_HARD, day=DAY + 22) == 1
+    assert store.get_entry('кот') == [0, 218, 1, DAY + 23, 1]
+    # После забывания цепочка интервалов идет сначала, но с меньшей легкостью
+    assert store.record('кот', QUALITY_GOOD, day=DAY + 23) == 1
+    assert store.record('кот', QUALITY_GOOD, day=DAY + 24) == 6
+    assert store.record('кот', QUALITY_GOOD, day=DAY + 30) == 13
+
+def test_ease_updates(tmp_path):
+    store = ReviewStore(str(tmp_path / 'review_state.json'))
+    store.record('легко', 5, day=DAY)
+    store.record('трудно', 3, day=DAY)
+    assert store.get_entry('легко')[1] == 260
+    assert store.get_entry('трудно')[1] == 236
+    for _ in range(20):
+        store.record('забыто', 0, day=DAY)
+    assert store.get_entry('забыто')[1] == round(MIN_EASE * 100)
+    assert store.get_entry('забыто')[4] == 20
+
+def test_session_queue(tmp_path):
+    store = ReviewStore(str(tmp_path / 'review_state.json'))
+    store.record('дом', QUALITY_GOOD, day=DAY - 5)
+    store.record('кот', QUALITY_GOOD, day=DAY - 2)
+    store.record('лес', QUALITY_GOOD, day=DAY)
+    words = ['лес', 'кот', 'новое1', 'дом', 'новое2', 'кот', 'новое3']
+    # Самые просроченные первыми, слова не в срок пропускаются, повторы - один раз
+    assert store.split_words(words, day=DAY) == (['дом', 'кот'], ['новое1', 'новое2', 'новое3'])
+    assert store.plan_session(words, new_limit=2, day=DAY) == ['дом', 'кот', 'новое1', 'новое2']
+    assert store.plan_session(words, language='en', new_limit=1, day=DAY) == ['лес']
+
+def test_save_and_load(tmp_path):
+    store_file = str(tmp_path / 'review_state.json')
+    store = ReviewStore(store_file)
+    store.record_session(['кот', 'дом', 'кот'], hard_words=['дом'], day=DAY)
+    store.save()
+    
+    loaded = ReviewStore(store_file)
+    assert loaded.entries == store.entries
+    assert loaded.get_entry('дом')[4] == 1
+    assert loaded.get_entry('кот')[4] == 0
+    
+    (tmp_path / 'review_state.json').write_text('{"version": 99, "words": {}}', encoding='utf-8')
+    assert ReviewStore(store_file).entries == {}
@@ -0,0 +1,131 @@
+import asyncio
+import urllib.parse
+
+import pytest
+
+from pronunciation_words.server import PronunciationServer
+from pronunciation_words.synthesis import FakeSynthesizer
+
+async def request(port, word, headers=None):
+    """GET /audio?word=...; возвращает (код, заголовки, тело)"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    lines = [f"GET /audio?word={urllib.parse.quote(word)} HTTP/1.1", "Host: localhost", "Connection: close"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+    data = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    
+    head, _, body = data.partition(b'\r\n\r\n')
+    status_line, *header_lines = head.decode('latin-1').split('\r\n')
+    response_headers = {}
+    for line in header_lines:
+        name, _, value = line.partition(':')
+        response_headers[name.strip().lower()] = value.strip()
+    return int(status_line.split()[1]), response_headers, body
+
+@pytest.fixture
+def serve(make_cache):
+    """Запускает сервер на свободном порту и выполняет в нем сценарий scenario(port, server)"""
+    def run(scenario, synthesizer=None):
+        server = PronunciationServer(make_cache(), synthesizer or FakeSynthesizer(latency=0),
+                                     port=0, save_interval=3600, quiet=True)
+        
+        async def main():
+            task = asyncio.create_task(server.serve())
+            while server.server is None or not server.server.sockets:
+                await asyncio.sleep(0.01)
+            try:
+                return await scenario(server.server.sockets[0].getsockname()[1], server)
+            finally:
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+        
+        return asyncio.run(main())
+    return run
+
+def test_etag_and_not_modified(serve):
+    async def scenario(port, server):
+        status, headers, audio = await request(port, 'кошка')
+        assert status == 200
+        assert headers['x-audio-source'] == 'generated'
+        assert headers['content-type'] == 'audio/mpeg'
+        assert int(headers['content-length']) == len(audio) > 0
+        etag = headers['etag']
+        
+        status, headers, body = await request(port, 'кошка', {'If-None-Match': etag})
+        assert status == 304
+        assert body == b''
+        
+        status, headers, body = await request(port, 'кошка')
+        assert status == 200
+        assert headers['x-audio-source'] == 'cache'
+        assert headers['etag'] == etag
+        assert body == audio
+    
+    serve(scenario)
+
+def test_range_requests(serve):
+    async def scenario(port, server):
+        _, _, audio = await request(port, 'собака')
+        size = len(audio)
+        
+        status, headers, body = await request(port, 'собака', {'Range': 'bytes=0-9'})
+        assert status == 206
+        assert body == audio[:10]
+        assert headers['content-range'] == f"bytes 0-9/{size}"
+        
+        status, headers, body = await request(port, 'собака', {'Range': 'bytes=-5'})
+        assert status == 206
+        assert body == audio[-5:]
+        
+        status, headers, body = await request(port, 'собака', {'Range': f"bytes={size - 3}-"})
+        assert status == 206
+        assert body == audio[-3:]
+        
+        status, headers, _ = await request(port, 'собака', {'Range': f"bytes={size}-"})
+        assert status == 416
+        assert headers['content-range'] == f"bytes */{size}"
+        
+        # Конец раньше начала - неверный заголовок, он игнорируется
+        status, headers, body = await request(port, 'собака', {'Range': 'bytes=9-0'})
+        assert status == 200
+        assert body == audio
+        
+        # Конец за пределами файла обрезается по размеру
+        status, headers, body = await request(port, 'собака', {'Range': f"bytes={size - 2}-{size + 100}"})
+        assert status == 206
+        assert body == audio[-2:]
+        
+        # Устаревший If-Range: отдается весь файл
+        status, _, body = await request(port, 'собака', {'Range': 'bytes=0-9', 'If-Range': '"old"'})
+        assert status == 200
+        assert body == audio
+    
+    serve(scenario)
+
+def test_concurrent_misses_are_coalesced(serve):
+    fake = FakeSynthesizer(latency=0.2)
+    
+    async def scenario(port, server):
+        responses = await asyncio.gather(*(request(port, 'лиса') for _ in range(5)))
+        assert [status for status, _, _ in responses] == [200] * 5
+        assert sorted(headers['x-audio-source'] for _, headers, _ in responses) == (
+            ['coalesced'] * 4 + ['generated']
+        )
+        assert len({body for _, _, body in responses}) == 1
+        assert fake.attempts == {'лиса_ru_False': 1}
+    
+    serve(scenario, fake)
+
+def test_failed_synthesis_is_reported_to_all_waiters(serve):
+    fake = FakeSynthesizer(latency=0.1, failure_rate=1.0)
+    
+    async def scenario(port, server):
+        responses = await asyncio.gather(*(request(port, 'волк') for _ in range(3)))
+        assert [status for status, _, _ in responses] == [502] * 3
+        assert fake.attempts == {'волк_ru_False': 1}
+        assert not server.cache.in_flight
+    
+    serve(scenario, fake)
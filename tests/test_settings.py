@@ -0,0 +1,16 @@
+import json
+
+from pronunciation_words.settings import SettingsManager
+
+def test_old_auto_mode_is_announced_once(tmp_path, capsys):
+    settings_file = tmp_path / 'tts_settings.json'
+    settings_file.write_text(json.dumps({'generation_mode': 3, 'max_workers': 6}), encoding='utf-8')
+    
+    settings_manager = SettingsManager(str(settings_file))
+    assert 'заменен адаптивным' in capsys.readouterr().out
+    assert settings_manager.get('generation_mode') == 3
+    assert settings_manager.get('max_workers') == 6
+    
+    SettingsManager(str(settings_file))
+    assert 'заменен адаптивным' not in capsys.readouterr().out
+    assert json.loads(settings_file.read_text(encoding='utf-8'))['settings_version'] == SettingsManager.SETTINGS_VERSION
@@ -0,0 +1,93 @@
+import json
+import os
+
+import pytest
+
+from pronunciation_words import warm
+from pronunciation_words.cache import make_cache_key
+from pronunciation_words.warm import warm_cache, warm_shard
+
+WORDS = [f"слово{i}" for i in range(12)]
+
+def write_words(tmp_path, words):
+    word_file = tmp_path / 'words.txt'
+    word_file.write_text('\n'.join(words) + '\n', encoding='utf-8')
+    return str(word_file)
+
+def run_warm(tmp_path, cache, processes=2, **options):
+    options.setdefault('synthesizer_options', {'latency': 0})
+    options.setdefault('resilience', {'attempts': 1, 'breaker_threshold': 1000})
+    return warm_cache([write_words(tmp_path, WORDS)], ['ru', 'uk'], processes=processes, threads=2,
+                      synthesizer_name='fake', cache=cache,
+                      checkpoint_file=str(tmp_path / 'warm_checkpoint.json'),
+                      shard_dir=str(tmp_path / 'warm_shards'), save_every=4, **options)
+
+def write_checkpoint(tmp_path, **fields):
+    checkpoint = {'shards': 2, 'files': [str(tmp_path / 'words.txt')], 'languages': ['ru', 'uk'],
+                  'slow': False, 'started': '2026-01-01T00:00:00'}
+    checkpoint.update(fields)
+    (tmp_path / 'warm_checkpoint.json').write_text(json.dumps(checkpoint), encoding='utf-8')
+
+def test_shards_are_merged_into_cache(make_cache, tmp_path):
+    cache = make_cache()
+    cache.put(WORDS[0], b'ID3 already cached')
+    
+    assert run_warm(tmp_path, cache) == []
+    assert all(cache.contains(word, language) for word in WORDS for language in ('ru', 'uk'))
+    assert bytes(cache.get(WORDS[0])) == b'ID3 already cached'
+    assert not os.path.exists(tmp_path / 'warm_shards')
+    assert not os.path.exists(tmp_path / 'warm_checkpoint.json')
+    
+    reopened = make_cache()
+    assert len(reopened.index) == len(WORDS) * 2
+
+def test_interrupted_warm_resumes_from_shards(make_cache, tmp_path):
+    # Прерванный запуск: точка восстановления на 2 шарда и один заполненный шард
+    write_checkpoint(tmp_path, shards=2)
+    os.makedirs(tmp_path / 'warm_shards')
+    tasks = [(word, language) for language in ('ru', 'uk') for word in WORDS]
+    done = [task for task in tasks if int(make_cache_key(task[0], task[1]), 16) % 2 == 0]
+    warm_shard(str(tmp_path / 'warm_shards' / 'shard_0.seg'), done, False, 'fake', {'latency': 0},
+               {}, 2, 50)
+    
+    # Синтез теперь всегда падает: в кэш попадает только готовое до прерывания
+    cache = make_cache()
+    failed = run_warm(tmp_path, cache, processes=3, synthesizer_options={'latency': 0, 'failure_rate': 1.0})
+    assert sorted(failed) == sorted(set(tasks) - set(done))
+    assert all(cache.contains(word, language) for word, language in done)
+    assert not any(cache.contains(word, language) for word, language in failed)
+
+def test_dead_worker_does_not_block_warm(make_cache, tmp_path, monkeypatch):
+    real_warm_shard = warm.warm_shard
+    
+    def crashing_warm_shard(shard_file, *args):
+        if shard_file.endswith('shard_0.seg'):
+            os._exit(9)  # как процесс, убитый системой
+        return real_warm_shard(shard_file, *args)
+    
+    monkeypatch.setattr(warm, 'warm_shard', crashing_warm_shard)
+    monkeypatch.setattr(warm, 'RESULT_POLL', 0.1)
+    cache = make_cache()
+    failed = run_warm(tmp_path, cache)
+    tasks = [(word, language) for language in ('ru', 'uk') for word in WORDS]
+    lost = [task for task in tasks if int(make_cache_key(task[0], task[1]), 16) % 2 == 0]
+    assert sorted(failed) == sorted(lost)
+    assert all(cache.contains(word, language) for word, language in set(tasks) - set(lost))
+    # Точка восстановления остается, и следующий запуск догоняет упавший шард
+    assert os.path.exists(tmp_path / 'warm_checkpoint.json')
+    
+    monkeypatch.setattr(warm, 'warm_shard', real_warm_shard)
+    assert run_warm(tmp_path, cache) == []
+    assert all(cache.contains(word, language) for word, language in tasks)
+    assert not os.path.exists(tmp_path / 'warm_checkpoint.json')
+
+@pytest.mark.parametrize('fields', [{'languages': ['ru']}, {'files': ['other.txt']}, {'slow': True}])
+def test_checkpoint_of_other_warm_is_not_resumed(make_cache, tmp_path, fields):
+    write_checkpoint(tmp_path, **fields)
+    cache = make_cache()
+    with pytest.raises(ValueError):
+        run_warm(tmp_path, cache)
+    assert not cache.index and not cache.pending
+    assert json.loads((tmp_path / 'warm_checkpoint.json').read_text(encoding='utf-8'))['started'] == (
+        '2026-01-01T00:00:00'
+    )
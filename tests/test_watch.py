@@ -0,0 +1,34 @@
+from pronunciation_words.settings import SettingsManager
+from pronunciation_words.watch import WatchSession, WordManifest, make_manifest_signature
+
+def make_session(tmp_path, cache, word_file):
+    settings_manager = SettingsManager(str(tmp_path / 'tts_settings.json'))
+    settings_manager.set('synthesizer', 'fake')
+    settings_manager.set('synthesizer_options', {'latency': 0})
+    manifest = WordManifest(str(tmp_path / 'watch_manifest.json'),
+                            make_manifest_signature(settings_manager, cache))
+    return WatchSession([str(word_file)], settings_manager, cache, manifest)
+
+def test_only_changes_are_generated(make_cache, tmp_path):
+    word_file = tmp_path / 'words.txt'
+    word_file.write_text('кот\nдом\n', encoding='utf-8')
+    cache = make_cache()
+    session = make_session(tmp_path, cache, word_file)
+    assert session.sync() == (['кот', 'дом'], [])
+    assert session.sync() == ([], [])
+    
+    word_file.write_text('кот\nлес\nлес\n', encoding='utf-8')
+    assert session.sync() == (['лес'], ['дом'])
+    assert make_session(tmp_path, cache, word_file).sync() == ([], [])
+
+def test_words_missing_from_cache_are_regenerated(make_cache, tmp_path):
+    word_file = tmp_path / 'words.txt'
+    word_file.write_text('кот\nдом\n', encoding='utf-8')
+    make_session(tmp_path, make_cache(), word_file).sync()
+    
+    # Кэш очищен, а файл слов и манифест остались прежними
+    for path in tmp_path.glob('audio_cache.*'):
+        path.unlink()
+    cache = make_cache()
+    assert make_session(tmp_path, cache, word_file).sync() == (['кот', 'дом'], [])
+    assert cache.contains('кот') and cache.contains('дом')